@@ -1,10 +1,11 @@
 """
 Content Validator - Enhanced with AI
 """
-from typing import Dict, Tuple
+from typing import Dict, Optional
 from openai import AsyncOpenAI
 from config.settings import settings
 from loguru import logger
+from agent.tools.tiered_validator import KeywordMatcher, TieredValidator, normalize_prompt, register_validator, top_category
 
 client = AsyncOpenAI(api_key=settings.openai_api_key)
 
@@ -52,6 +53,12 @@ BANNED_KEYWORDS = [
     "pump", "dump", "rug pull", "scam token"
 ]
 
+# Compiled once: banned terms + category keywords in a single scan
+KEYWORD_MATCHER = KeywordMatcher(
+    BANNED_KEYWORDS,
+    {category: data["keywords"] for category, data in APPROVED_CATEGORIES.items()}
+)
+
 
 class ContentValidator:
     """
@@ -61,65 +68,69 @@ class ContentValidator:
     
     async def validate(self, prompt: str) -> Dict:
         """
-        Main validation method
+        Main validation method (cache -> keywords -> GPT-4, see tiered_validator)
         Returns: {
             "approved": bool,
             "category": str,
             "reason": str,
             "suggestions": list,
-            "confidence": float
+            "confidence": float,
+            "tier": str
         }
         """
-        prompt_lower = prompt.lower()
-        
-        # Step 1: Check banned keywords (fast rejection)
-        for banned in BANNED_KEYWORDS:
-            if banned in prompt_lower:
-                return {
-                    "approved": False,
-                    "category": None,
-                    "reason": f"Contains prohibited content: '{banned}'",
-                    "suggestions": [
-                        "Focus on DeFi education or Uniswap features",
-                        "Avoid price predictions and gambling themes",
-                        "Highlight user stories or cultural elements"
-                    ],
-                    "confidence": 1.0
-                }
-        
-        # Step 2: Category detection (keyword-based)
-        detected_category = self._detect_category_keywords(prompt_lower)
-        
-        # Step 3: AI-powered semantic validation
-        ai_validation = await self._ai_validate(prompt, detected_category)
-        
+        return await _tiered_validator.validate(prompt)
+
+    def _fast_validate(self, scan: Dict) -> Optional[Dict]:
+        """Decide from keywords alone, or None when the prompt needs the AI check"""
+        # Banned keywords: fast rejection
+        if scan["banned"]:
+            return {
+                "approved": False,
+                "category": None,
+                "reason": f"Contains prohibited content: '{scan['banned'][0]}'",
+                "suggestions": [
+                    "Focus on DeFi education or Uniswap features",
+                    "Avoid price predictions and gambling themes",
+                    "Highlight user stories or cultural elements"
+                ],
+                "confidence": 1.0
+            }
+
+        # Clearly on-topic: enough category keywords to approve without GPT-4
+        if sum(scan["categories"].values()) >= settings.validation_fast_approve_hits:
+            return {
+                "approved": True,
+                "category": top_category(scan),
+                "reason": "Content meets guidelines",
+                "duration": 15,  # Default duration
+                "confidence": 0.9,
+                "enhancement_suggestions": []
+            }
+
+        return None
+
+    async def _ai_check(self, prompt: str, scan: Dict) -> Dict:
+        """AI-powered semantic validation for prompts the keywords can't decide"""
+        ai_validation = await self._ai_validate(prompt, top_category(scan))
+
         # Combine keyword and AI validation
         if ai_validation["approved"]:
             return {
                 "approved": True,
-                "category": ai_validation.get("category", detected_category),
+                "category": ai_validation.get("category") or top_category(scan),
                 "reason": "Content meets guidelines",
                 "duration": 15,  # Default duration
                 "confidence": ai_validation.get("confidence", 0.8),
-                "enhancement_suggestions": ai_validation.get("suggestions", [])
+                "enhancement_suggestions": ai_validation.get("suggestions", []),
+                "tier": ai_validation.get("tier", "llm")
             }
         else:
             return ai_validation
-    
+
     def _detect_category_keywords(self, prompt_lower: str) -> str:
         """Detect category based on keywords"""
-        category_scores = {}
-        
-        for category, data in APPROVED_CATEGORIES.items():
-            score = sum(1 for keyword in data["keywords"] if keyword in prompt_lower)
-            category_scores[category] = score
-        
-        # Return category with highest score, default to defi_education
-        if max(category_scores.values()) > 0:
-            return max(category_scores, key=category_scores.get)
-        
-        return "defi_education"
-    
+        return top_category(KEYWORD_MATCHER.scan(normalize_prompt(prompt_lower)))
+
     async def _ai_validate(self, prompt: str, suggested_category: str) -> Dict:
         """
         Use GPT-4 to semantically validate content
@@ -176,7 +187,8 @@ Be strict but constructive."""
                 "approved": True,
                 "category": suggested_category,
                 "reason": "Passed keyword validation",
-                "confidence": 0.6
+                "confidence": 0.6,
+                "tier": "fallback"
             }
     
     def get_example_prompts(self, category: str) -> list:
@@ -215,3 +227,9 @@ Be strict but constructive."""
         }
         
         return examples.get(category, [])
+
+
+_validator = ContentValidator()
+_tiered_validator = register_validator(
+    TieredValidator("campaign", KEYWORD_MATCHER, _validator._fast_validate, _validator._ai_check)
+)
@@ -0,0 +1,212 @@
+"""
+Sora generation governor
+Every Sora job in this process holds a governor slot from submission
+until the video is ready:
+    - global cap: at most SORA_MAX_CONCURRENT jobs in flight
+    - fairness: waiting jobs are granted in weighted fair order (virtual
+      finish tags, i.e. weighted round-robin between requesters); this only
+      reorders jobs this process already holds - across the durable queue,
+      claim_generation_job hands out jobs round-robin between creators
+    - spend rate: each new job is charged SORA_COST_PER_VIDEO; with
+      SORA_HOURLY_BUDGET_USD set, jobs wait once the last hour's spend
+      would exceed the budget (resumed jobs are not charged again)
+
+Usage:
+    governor = get_generation_governor()
+    async with governor.slot(tg_user_id, on_wait=callback):
+        ...  # create the Sora job and poll it
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+from loguru import logger
+from config.settings import settings
+
+SPEND_WINDOW_SECONDS = 3600
+
+
+@dataclass(order=True)
+class Ticket:
+    tag: float
+    seq: int
+    requester: Hashable = field(compare=False)
+    cost: float = field(compare=False)
+    granted: asyncio.Future = field(compare=False)
+    start: float = field(compare=False, default=0.0)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+    abandoned: bool = field(compare=False, default=False)
+
+
+class GenerationGovernor:
+    """Global concurrency cap + weighted fair queueing + spend-rate limit"""
+
+    def __init__(self, max_concurrent: int = 4, cost_per_video: float = 4.0, hourly_budget: float = 0.0):
+        if 0 < hourly_budget < cost_per_video:
+            # No charged job could ever start; the budget retry would spin forever
+            raise ValueError(
+                f"SORA_HOURLY_BUDGET_USD (${hourly_budget:.2f}) is below SORA_COST_PER_VIDEO (${cost_per_video:.2f})"
+            )
+        self.max_concurrent = max_concurrent
+        self.cost_per_video = cost_per_video
+        self.hourly_budget = hourly_budget
+        self._waiting: List[Ticket] = []
+        self._running: Dict[Hashable, int] = {}
+        self._vtime = 0.0
+        self._last_tag: Dict[Hashable, float] = {}
+        self._seq = itertools.count()
+        self._spend = deque()
+        self._budget_timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"granted": 0, "waited": 0, "wait_seconds": 0.0, "spent_usd": 0.0, "budget_stalls": 0}
+
+    # ==================== PUBLIC API ====================
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        requester: Hashable,
+        weight: float = 1.0,
+        charge: bool = True,
+        on_wait: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold a generation slot for the duration of the block
+        on_wait is awaited with the 1-based queue position if the job has to wait
+        """
+        ticket = self._enqueue(requester, weight, self.cost_per_video if charge else 0.0)
+        self._dispatch()
+
+        if not ticket.granted.done():
+            self.stats["waited"] += 1
+            position = self.position(ticket)
+            logger.info(f"🚦 Generation for {requester} waiting for a slot (position {position})")
+            if on_wait:
+                try:
+                    await on_wait(position)
+                except Exception as e:
+                    logger.warning(f"Queue position callback failed: {e}")
+
+        try:
+            await ticket.granted
+        except asyncio.CancelledError:
+            if ticket.granted.done() and not ticket.granted.cancelled():
+                self._release(requester)
+            else:
+                ticket.abandoned = True
+            raise
+
+        self.stats["wait_seconds"] += time.monotonic() - ticket.enqueued_at
+        try:
+            yield
+        finally:
+            self._release(requester)
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based position of a waiting ticket in grant order (0 if not waiting)"""
+        order = sorted(t for t in self._waiting if not t.abandoned)
+        for i, t in enumerate(order):
+            if t is ticket:
+                return i + 1
+        return 0
+
+    def spent_last_hour(self) -> float:
+        self._expire_spend(time.monotonic())
+        return sum(cost for _, cost in self._spend)
+
+    def snapshot(self) -> Dict:
+        waiting = [t for t in self._waiting if not t.abandoned]
+        return {
+            **self.stats,
+            "wait_seconds": round(self.stats["wait_seconds"], 1),
+            "running": sum(self._running.values()),
+            "waiting": len(waiting),
+            "max_concurrent": self.max_concurrent,
+            "spent_last_hour_usd": round(self.spent_last_hour(), 2),
+            "hourly_budget_usd": self.hourly_budget or None
+        }
+
+    # ==================== SCHEDULING ====================
+
+    def _enqueue(self, requester: Hashable, weight: float, cost: float) -> Ticket:
+        # Virtual finish tag: a requester's jobs are spaced 1/weight apart in
+        # virtual time, interleaving requesters round-robin by weight
+        start = max(self._vtime, self._last_tag.get(requester, 0.0))
+        tag = start + 1.0 / max(weight, 0.01)
+        self._last_tag[requester] = tag
+        ticket = Ticket(tag, next(self._seq), requester, cost, asyncio.get_running_loop().create_future(), start)
+        heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _dispatch(self) -> None:
+        while self._waiting and sum(self._running.values()) < self.max_concurrent:
+            ticket = self._waiting[0]
+            if ticket.abandoned or ticket.granted.done():
+                heapq.heappop(self._waiting)
+                continue
+
+            if ticket.cost and not self._budget_allows(ticket.cost):
+                return
+
+            heapq.heappop(self._waiting)
+            self._vtime = max(self._vtime, ticket.start)
+            self._running[ticket.requester] = self._running.get(ticket.requester, 0) + 1
+            if ticket.cost:
+                self._spend.append((time.monotonic(), ticket.cost))
+                self.stats["spent_usd"] += ticket.cost
+            self.stats["granted"] += 1
+            ticket.granted.set_result(None)
+
+        # Nobody waiting: forget idle requesters' tags so they don't pile up
+        if not self._waiting:
+            self._last_tag = {r: t for r, t in self._last_tag.items() if self._running.get(r)}
+
+    def _release(self, requester: Hashable) -> None:
+        self._running[requester] -= 1
+        if not self._running[requester]:
+            del self._running[requester]
+        self._dispatch()
+
+    # ==================== BUDGET ====================
+
+    def _expire_spend(self, now: float) -> None:
+        while self._spend and now - self._spend[0][0] >= SPEND_WINDOW_SECONDS:
+            self._spend.popleft()
+
+    def _budget_allows(self, cost: float) -> bool:
+        if not self.hourly_budget:
+            return True
+        now = time.monotonic()
+        self._expire_spend(now)
+        if sum(c for _, c in self._spend) + cost <= self.hourly_budget:
+            return True
+
+        # Over budget: retry when the oldest charge leaves the window
+        self.stats["budget_stalls"] += 1
+        if self._budget_timer is None or self._budget_timer.cancelled():
+            delay = SPEND_WINDOW_SECONDS - (now - self._spend[0][0]) if self._spend else 1.0
+            logger.warning(f"💸 Sora hourly budget (${self.hourly_budget:.0f}) reached; next job in {delay:.0f}s")
+            self._budget_timer = asyncio.get_running_loop().call_later(max(delay, 0.1), self._budget_retry)
+        return False
+
+    def _budget_retry(self) -> None:
+        self._budget_timer = None
+        self._dispatch()
+
+
+# Singleton instance
+_governor = None
+
+def get_generation_governor() -> GenerationGovernor:
+    """Get or create generation governor singleton"""
+    global _governor
+    if _governor is None:
+        _governor = GenerationGovernor(
+            max_concurrent=settings.sora_max_concurrent,
+            cost_per_video=settings.sora_cost_per_video,
+            hourly_budget=settings.sora_hourly_budget_usd
+        )
+    return _governor
@@ -0,0 +1,126 @@
+"""
+Gallery previews for generated videos
+After generation, three small assets are cut from the stored MP4 with
+FFmpeg (on the shared FFmpeg pool) and put in the content store next to
+the video:
+    - poster:  one JPEG frame (thumbnail_url)
+    - preview: a short, muted, low-res looping MP4 (preview_url)
+    - sprite:  a JPEG grid of evenly spaced frames for hover scrubbing
+               (sprite_url + sprite_meta with the grid layout)
+so the gallery can paint cards without downloading full videos.
+"""
+import asyncio
+from typing import Dict, List, Tuple
+from loguru import logger
+from config.settings import settings
+from utils.content_store import get_content_store
+from utils.ffmpeg_pool import FRAGMENTED_MP4, get_ffmpeg_pool, input_args
+from agent.tools.watermark import SORA_FRAME_SIZE
+
+# Sprite sheet layout: SPRITE_COLUMNS x SPRITE_ROWS frames, SPRITE_WIDTH px each
+SPRITE_COLUMNS = 5
+SPRITE_ROWS = 4
+SPRITE_WIDTH = 160
+
+PREVIEW_WIDTH = 240
+PREVIEW_FPS = 12
+
+
+def _even(value: float) -> int:
+    """Nearest even pixel size (x264/yuv420p need even dimensions)"""
+    return max(int(round(value / 2)) * 2, 2)
+
+
+async def _render(args: List[str], content_type: str) -> Dict:
+    """Run ffmpeg with output on stdout, straight into the content store"""
+    store = get_content_store()
+    result = await get_ffmpeg_pool().run(
+        args + ["pipe:1"],
+        stdout_consumer=lambda chunks: store.put_stream(chunks, content_type=content_type),
+        timeout=settings.ffmpeg_timeout_seconds
+    )
+    return result["output"]
+
+
+async def render_poster(video_url: str, duration: float, frame_size: Tuple[int, int] = SORA_FRAME_SIZE) -> Dict:
+    """Poster JPEG from 1s in (Sora clips often open on a fade), earlier for very short clips"""
+    width = settings.preview_poster_width
+    return await _render(
+        input_args(video_url, start=min(1.0, duration / 3)) + [
+            "-frames:v", "1",
+            "-vf", f"scale={_even(width)}:{_even(width * frame_size[1] / frame_size[0])}",
+            "-q:v", "4", "-f", "image2", "-c:v", "mjpeg"
+        ],
+        "image/jpeg"
+    )
+
+
+async def render_preview(video_url: str, duration: float, frame_size: Tuple[int, int] = SORA_FRAME_SIZE) -> Dict:
+    """First few seconds, muted, low-res and low-fps: a lightweight autoplay loop"""
+    return await _render(
+        input_args(video_url, duration=min(settings.preview_clip_seconds, duration)) + [
+            "-an",
+            "-vf", f"fps={PREVIEW_FPS},scale={_even(PREVIEW_WIDTH)}:{_even(PREVIEW_WIDTH * frame_size[1] / frame_size[0])}",
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "30", "-pix_fmt", "yuv420p",
+            "-f", "mp4", "-movflags", FRAGMENTED_MP4
+        ],
+        "video/mp4"
+    )
+
+
+async def render_sprite(video_url: str, duration: float, frame_size: Tuple[int, int] = SORA_FRAME_SIZE) -> Tuple[Dict, Dict]:
+    """Evenly spaced frames tiled into one JPEG; returns (stored, layout)"""
+    frames = SPRITE_COLUMNS * SPRITE_ROWS
+    tile_height = _even(SPRITE_WIDTH * frame_size[1] / frame_size[0])
+    stored = await _render(
+        input_args(video_url) + [
+            "-an",
+            "-vf", f"fps={frames}/{duration:.3f},scale={SPRITE_WIDTH}:{tile_height},tile={SPRITE_COLUMNS}x{SPRITE_ROWS}",
+            "-frames:v", "1", "-q:v", "5", "-f", "image2", "-c:v", "mjpeg"
+        ],
+        "image/jpeg"
+    )
+    layout = {
+        "columns": SPRITE_COLUMNS,
+        "rows": SPRITE_ROWS,
+        "frames": frames,
+        "tile_width": SPRITE_WIDTH,
+        "tile_height": tile_height,
+        "interval_seconds": round(duration / frames, 3)
+    }
+    return stored, layout
+
+
+async def generate_previews(video_url: str, duration: float) -> Dict:
+    """
+    Poster, preview clip and sprite sheet for a stored video
+
+    Returns: videos-row fields for whatever could be rendered
+        {"thumbnail_url", "preview_url", "sprite_url", "sprite_meta"}
+    (empty when previews are disabled or every render failed)
+    """
+    if not settings.previews_enabled or not video_url:
+        return {}
+
+    poster, preview, sprite = await asyncio.gather(
+        render_poster(video_url, duration),
+        render_preview(video_url, duration),
+        render_sprite(video_url, duration),
+        return_exceptions=True
+    )
+
+    fields = {}
+    for name, outcome in (("poster", poster), ("preview", preview), ("sprite", sprite)):
+        if isinstance(outcome, Exception):
+            logger.warning(f"⚠️ {name} render failed for {video_url}: {outcome}")
+    if not isinstance(poster, Exception):
+        fields["thumbnail_url"] = poster["url"]
+    if not isinstance(preview, Exception):
+        fields["preview_url"] = preview["url"]
+    if not isinstance(sprite, Exception):
+        stored, layout = sprite
+        fields["sprite_url"] = stored["url"]
+        fields["sprite_meta"] = layout
+
+    logger.info(f"🖼️ Rendered {len(fields)} preview field(s) for {video_url}")
+    return fields
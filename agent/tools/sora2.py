@@ -3,17 +3,20 @@ Sora 2 Video Generator
 Real integration with OpenAI Sora 2 API
 """
 import asyncio
-from typing import Dict, Tuple
+import math
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
 from config.settings import settings
 from loguru import logger
-import httpx
-import aiohttp
-import os
-import uuid
+from utils.http_clients import get_http_client
+from agent.tools.sora_poller import ProgressCallback, get_sora_poller
+from agent.tools.generation_governor import get_generation_governor
 
 # Don't use OpenAI SDK - Sora 2 not supported yet
 # Instead, use direct HTTP calls like N8N does
 
+# Download -> upload pipe chunk size (bounds memory per in-flight video)
+STREAM_CHUNK_SIZE = 256 * 1024
+
 
 class Sora2Generator:
     """
@@ -25,7 +28,11 @@ class Sora2Generator:
         prompt: str,
         duration: int,
         category: str,
-        tg_user_id: int = None
+        tg_user_id: int = None,
+        job_id: str = None,
+        on_job_created: Callable[[str], Awaitable[None]] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        requester: Hashable = None
     ) -> Dict:
         """
         Generate video with Sora 2
@@ -35,6 +42,16 @@ class Sora2Generator:
             duration: Video duration in seconds (10-60)
             category: Content category
             tg_user_id: Telegram user ID (optional, for notifications)
+            job_id: Existing Sora job to resume instead of creating a new one
+                    (used by the generation worker after a crash/redeploy)
+            on_job_created: Optional callback awaited with the new Sora job ID
+                            before polling starts, so callers can persist it
+            on_progress: Optional callback awaited with progress/ETA updates
+                         while the job runs (see wait_for_job), including
+                         {"status": "queued", "position": n} while it waits
+                         for a governor slot
+            requester: Fairness key for the generation governor
+                       (defaults to tg_user_id)
 
         Returns:
             {
@@ -64,84 +81,52 @@ class Sora2Generator:
             start_time = asyncio.get_event_loop().time()
             
             # ==================== REAL SORA 2 API CALL ====================
-            # Note: Adjust based on actual Sora 2 API when available
-            # This is the expected format based on OpenAI patterns
             
             try:
-                # Official Sora 2 API - Direct HTTP call like N8N
-                # POST https://api.openai.com/v1/videos
-                async with httpx.AsyncClient(timeout=30.0) as http_client:
-                    response = await http_client.post(
-                        "https://api.openai.com/v1/videos",
-                        headers={
-                            "Authorization": f"Bearer {settings.openai_api_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": settings.sora2_model,
-                            "prompt": enhanced_prompt,
-                            "size": "720x1280",  # Vertical format for TikTok/Reels (Sora 2 supported sizes: 720x1280 or 1280x720)
-                            "seconds": str(duration)
-                        }
-                    )
-
-                    if response.status_code != 200:
-                        raise Exception(f"Sora 2 API error: {response.status_code} - {response.text}")
-
-                    result = response.json()
-                    job_id = result["id"]
-                    logger.info(f"Sora 2 job created: {job_id}, status: {result.get('status')}")
-
-                # Poll for completion (Sora takes 1-3 minutes)
-                max_attempts = 60  # 5 minutes max
-                attempt = 0
-
-                # Poll for completion
-                async with httpx.AsyncClient(timeout=30.0) as http_client:
-                    while attempt < max_attempts:
-                        await asyncio.sleep(5)  # Check every 5 seconds
-
-                        # Retrieve video status
-                        # GET https://api.openai.com/v1/videos/{video_id}
-                        status_response = await http_client.get(
-                            f"https://api.openai.com/v1/videos/{job_id}",
-                            headers={
-                                "Authorization": f"Bearer {settings.openai_api_key}"
-                            }
-                        )
-
-                        if status_response.status_code != 200:
-                            raise Exception(f"Status check error: {status_response.status_code} - {status_response.text}")
-
-                        video_status = status_response.json()
-                        status = video_status.get("status")
-                        progress = video_status.get("progress", 0)
-
-                        logger.info(f"Sora 2 progress: {progress}% - Status: {status}")
-
-                        if status == "completed":
-                            # Video is ready from OpenAI
-                            openai_video_url = f"https://api.openai.com/v1/videos/{job_id}/content"
-                            logger.info(f"Sora 2 video completed: {openai_video_url}")
-
-                            # 🔄 MIGRACIÓN AUTOMÁTICA A SUPABASE
-                            logger.info(f"📥 Downloading video from OpenAI...")
-                            video_url, thumbnail_url = await self._upload_to_supabase(
-                                openai_video_url,
-                                job_id,
-                                tg_user_id=self.tg_user_id
-                            )
-                            logger.info(f"✅ Video uploaded to Supabase: {video_url}")
-                            break
-
-                        elif status == "failed":
-                            error_msg = video_status.get("error", {}).get("message", "Unknown error")
-                            raise Exception(f"Sora 2 generation failed: {error_msg}")
-
-                        attempt += 1
-
+                governor = get_generation_governor()
+
+                async def report_queue_position(position: int):
+                    if on_progress:
+                        await on_progress({
+                            "job_id": job_id,
+                            "status": "queued",
+                            "position": position,
+                            "progress": 0,
+                            "eta_seconds": self.estimate_generation_time(duration) + self._queue_wait_estimate(position)
+                        })
+
+                # Global cap + fair ordering + spend accounting (resumed jobs were already paid for)
+                async with governor.slot(
+                    requester if requester is not None else tg_user_id,
+                    charge=not job_id,
+                    on_wait=report_queue_position
+                ):
+                    if job_id:
+                        # Job was already submitted (e.g. before a restart) - just keep polling it
+                        logger.info(f"Resuming Sora 2 job: {job_id}")
                     else:
-                        raise Exception("Sora 2 generation timed out after 5 minutes")
+                        job_id = await self.create_job(enhanced_prompt, duration)
+                        if on_job_created:
+                            await on_job_created(job_id)
+
+                    # Poll for completion (Sora takes 1-3 minutes)
+                    await self.wait_for_job(job_id, on_progress=on_progress)
+
+                if on_progress:
+                    await on_progress({"job_id": job_id, "status": "uploading", "progress": 100, "eta_seconds": None})
+
+                # Video is ready from OpenAI
+                openai_video_url = self._content_url(job_id)
+                logger.info(f"Sora 2 video completed: {openai_video_url}")
+
+                # 🔄 MIGRACIÓN AUTOMÁTICA A SUPABASE
+                logger.info(f"📥 Downloading video from OpenAI...")
+                video_url, thumbnail_url = await self._upload_to_supabase(
+                    openai_video_url,
+                    job_id,
+                    tg_user_id=self.tg_user_id
+                )
+                logger.info(f"✅ Video uploaded to Supabase: {video_url}")
                 
             except (AttributeError, Exception) as e:
                 # PRODUCTION: Do NOT use placeholder - fail immediately
@@ -172,8 +157,65 @@ class Sora2Generator:
             return {
                 "success": False,
                 "error": str(e),
+                "job_id": job_id,
                 "message": "Failed to generate video. Please try again."
             }
+
+    async def create_job(self, enhanced_prompt: str, duration: int) -> str:
+        """
+        Submit a generation job
+        POST {openai_base_url}/videos
+
+        Returns: Sora job ID
+        """
+        # Official Sora 2 API - Direct HTTP call like N8N
+        http_client = get_http_client("openai")
+        response = await http_client.post(
+            f"{settings.openai_base_url}/videos",
+            headers={
+                "Authorization": f"Bearer {settings.openai_api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": settings.sora2_model,
+                "prompt": enhanced_prompt,
+                "size": "720x1280",  # Vertical format for TikTok/Reels (Sora 2 supported sizes: 720x1280 or 1280x720)
+                "seconds": str(duration)
+            }
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Sora 2 API error: {response.status_code} - {response.text}")
+
+        result = response.json()
+        job_id = result["id"]
+        logger.info(f"Sora 2 job created: {job_id}, status: {result.get('status')}")
+
+        return job_id
+
+    async def wait_for_job(
+        self,
+        job_id: str,
+        on_progress: Optional[ProgressCallback] = None,
+        deadline_seconds: Optional[float] = None
+    ) -> Dict:
+        """
+        Wait for a Sora job to complete via the shared poller
+        (adaptive intervals, one loop for every in-flight job)
+
+        Args:
+            on_progress: Awaited with {"status", "progress", "eta_seconds", ...}
+                         after each status check
+            deadline_seconds: Give up after this long (default SORA_JOB_DEADLINE_SECONDS)
+
+        Returns: final job status payload
+        Raises: SoraJobError on failure, deadline or repeated status errors
+        """
+        return await get_sora_poller().wait(job_id, deadline_seconds=deadline_seconds, on_progress=on_progress)
+
+    def _content_url(self, job_id: str) -> str:
+        """Authenticated download URL for a completed job"""
+        return f"{settings.openai_base_url}/videos/{job_id}/content"
     
     def _enhance_prompt(self, prompt: str, category: str) -> str:
         """
@@ -211,44 +253,31 @@ class Sora2Generator:
         Returns: (public_video_url, thumbnail_url)
         """
         try:
-            # Download from OpenAI
-            logger.info(f"Downloading video from OpenAI: {openai_url}")
-            async with aiohttp.ClientSession() as session:
-                headers = {'Authorization': f'Bearer {settings.openai_api_key}'}
-                async with session.get(openai_url, headers=headers) as response:
-                    if response.status != 200:
-                        raise Exception(f"Download failed: {response.status} - {await response.text()}")
-                    video_data = await response.read()
-
-            logger.info(f"Video downloaded: {len(video_data)} bytes")
-
-            # Generate unique filename
-            filename = f"video_{uuid.uuid4().hex[:12]}.mp4"
-            temp_path = f"/tmp/{filename}"
-
-            # Save temporarily
-            with open(temp_path, 'wb') as f:
-                f.write(video_data)
-
-            logger.info(f"Uploading to Supabase Storage: {filename}")
-
-            # Upload to Supabase
-            from supabase import create_client
-            supabase = create_client(settings.supabase_url, settings.supabase_service_key)
-
-            with open(temp_path, 'rb') as f:
-                supabase.storage.from_('videos').upload(
-                    filename,
-                    f,
-                    file_options={"content-type": "video/mp4"}
-                )
-
-            # Get public URL
-            public_url = supabase.storage.from_('videos').get_public_url(filename)
+            from utils.content_store import get_content_store
+
+            # Stream OpenAI /content into the content-addressed store: the MP4 is
+            # hashed while it is spooled to disk (never held in memory) and only
+            # uploaded if those exact bytes aren't stored yet, so a retried job
+            # doesn't upload the same video twice
+            logger.info(f"Streaming video from OpenAI to storage: {openai_url}")
+            http_client = get_http_client("openai")
+            async with http_client.stream(
+                "GET",
+                openai_url,
+                headers={'Authorization': f'Bearer {settings.openai_api_key}'},
+                follow_redirects=True
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    raise Exception(f"Download failed: {response.status_code} - {response.text}")
 
-            # Clean up
-            os.remove(temp_path)
+                stored = await get_content_store().put_stream(
+                    response.aiter_bytes(STREAM_CHUNK_SIZE),
+                    content_type="video/mp4"
+                )
 
+            public_url = stored["url"]
+            logger.info(f"Video streamed: {stored['size']} bytes ({stored['bytes_sent']} uploaded)")
             logger.info(f"Video uploaded successfully: {public_url}")
 
             # 📱 Send Telegram notification to user
@@ -296,33 +325,33 @@ class Sora2Generator:
     async def get_generation_status(self, job_id: str) -> Dict:
         """
         Check status of async video generation
-        GET https://api.openai.com/v1/videos/{video_id}
+        GET {openai_base_url}/videos/{video_id}
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as http_client:
-                status_response = await http_client.get(
-                    f"https://api.openai.com/v1/videos/{job_id}",
-                    headers={
-                        "Authorization": f"Bearer {settings.openai_api_key}"
-                    }
-                )
+            http_client = get_http_client("openai")
+            status_response = await http_client.get(
+                f"{settings.openai_base_url}/videos/{job_id}",
+                headers={
+                    "Authorization": f"Bearer {settings.openai_api_key}"
+                }
+            )
 
-                if status_response.status_code != 200:
-                    raise Exception(f"Status check error: {status_response.status_code} - {status_response.text}")
+            if status_response.status_code != 200:
+                raise Exception(f"Status check error: {status_response.status_code} - {status_response.text}")
 
-                video_status = status_response.json()
+            video_status = status_response.json()
 
-                result = {
-                    "status": video_status.get("status"),
-                    "progress": video_status.get("progress", 0),
-                    "video_url": None
-                }
+            result = {
+                "status": video_status.get("status"),
+                "progress": video_status.get("progress", 0),
+                "video_url": None
+            }
 
-                if video_status.get("status") == "completed":
-                    # Video is ready - get download URL
-                    result["video_url"] = f"https://api.openai.com/v1/videos/{job_id}/content"
+            if video_status.get("status") == "completed":
+                # Video is ready - get download URL
+                result["video_url"] = self._content_url(job_id)
 
-                return result
+            return result
 
         except Exception as e:
             logger.error(f"Status check error: {e}")
@@ -336,7 +365,7 @@ class Sora2Generator:
     ) -> Dict:
         """
         Remix an existing video with a new prompt
-        POST https://api.openai.com/v1/videos/{video_id}/remix
+        POST {openai_base_url}/videos/{video_id}/remix
 
         Args:
             video_id: ID of the completed video to remix
@@ -352,67 +381,38 @@ class Sora2Generator:
             logger.info(f"Remixing video {video_id} with new prompt")
 
             # Create remix job - Direct HTTP call
-            async with httpx.AsyncClient(timeout=30.0) as http_client:
-                response = await http_client.post(
-                    f"https://api.openai.com/v1/videos/{video_id}/remix",
-                    headers={
-                        "Authorization": f"Bearer {settings.openai_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={"prompt": enhanced_prompt}
-                )
+            http_client = get_http_client("openai")
+            response = await http_client.post(
+                f"{settings.openai_base_url}/videos/{video_id}/remix",
+                headers={
+                    "Authorization": f"Bearer {settings.openai_api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={"prompt": enhanced_prompt}
+            )
 
-                if response.status_code != 200:
-                    raise Exception(f"Remix API error: {response.status_code} - {response.text}")
+            if response.status_code != 200:
+                raise Exception(f"Remix API error: {response.status_code} - {response.text}")
 
-                result = response.json()
-                remix_job_id = result["id"]
-                logger.info(f"Remix job created: {remix_job_id}, remixed from: {result.get('remixed_from_video_id')}")
+            result = response.json()
+            remix_job_id = result["id"]
+            logger.info(f"Remix job created: {remix_job_id}, remixed from: {result.get('remixed_from_video_id')}")
 
             # Poll for completion (same as regular generation)
-            max_attempts = 60
-            attempt = 0
+            video_status = await self.wait_for_job(remix_job_id)
 
-            async with httpx.AsyncClient(timeout=30.0) as http_client:
-                while attempt < max_attempts:
-                    await asyncio.sleep(5)
+            video_url = self._content_url(remix_job_id)
+            logger.info(f"Remix completed: {video_url}")
 
-                    status_response = await http_client.get(
-                        f"https://api.openai.com/v1/videos/{remix_job_id}",
-                        headers={"Authorization": f"Bearer {settings.openai_api_key}"}
-                    )
-
-                    if status_response.status_code != 200:
-                        raise Exception(f"Status check error: {status_response.status_code} - {status_response.text}")
-
-                    video_status = status_response.json()
-                    status = video_status.get("status")
-                    progress = video_status.get("progress", 0)
-
-                    logger.info(f"Remix progress: {progress}% - Status: {status}")
-
-                    if status == "completed":
-                        video_url = f"https://api.openai.com/v1/videos/{remix_job_id}/content"
-                        logger.info(f"Remix completed: {video_url}")
-
-                        return {
-                            "success": True,
-                            "video_url": video_url,
-                            "thumbnail_url": None,
-                            "duration": int(video_status.get("seconds", 0)),
-                            "enhanced_prompt": enhanced_prompt,
-                            "job_id": remix_job_id,
-                            "remixed_from": video_id
-                        }
-
-                    elif status == "failed":
-                        error_msg = video_status.get("error", {}).get("message", "Unknown error")
-                        raise Exception(f"Remix failed: {error_msg}")
-
-                    attempt += 1
-
-                else:
-                    raise Exception("Remix timed out after 5 minutes")
+            return {
+                "success": True,
+                "video_url": video_url,
+                "thumbnail_url": None,
+                "duration": int(video_status.get("seconds", 0)),
+                "enhanced_prompt": enhanced_prompt,
+                "job_id": remix_job_id,
+                "remixed_from": video_id
+            }
 
         except Exception as e:
             logger.error(f"Remix error: {e}")
@@ -427,15 +427,20 @@ class Sora2Generator:
         Estimate generation time based on duration
         Returns seconds
         """
-        # Rough estimate: ~10s per second of video
-        # So a 15s video takes ~150s (2.5 min)
-        base_time = duration * 10
-        
-        # Add buffer for processing
+        # Typical duration of recently completed jobs (learned by the poller)
+        base_time = get_sora_poller().typical_seconds
+
+        # Add buffer for download/upload
         buffer = 30
-        
-        return base_time + buffer
-    
+
+        return int(base_time) + buffer
+
+    def _queue_wait_estimate(self, position: int) -> int:
+        """Seconds until a job at `position` in the governor queue gets a slot"""
+        governor = get_generation_governor()
+        rounds = math.ceil(position / max(governor.max_concurrent, 1))
+        return int(rounds * get_sora_poller().typical_seconds)
+
     def validate_duration(self, duration: int) -> Tuple[bool, str]:
         """Validate video duration"""
         if duration < settings.min_video_duration:
@@ -467,34 +472,38 @@ class BatchSora2Generator:
     Useful for high-volume scenarios
     """
     
-    async def generate_batch(self, requests: list) -> list:
+    async def generate_batch(self, requests: list, window: int = 5) -> list:
         """
         Generate multiple videos concurrently
-        
+
+        Sliding window: at most `window` requests run at once and the next
+        one starts as soon as any finishes (no waiting for a whole batch).
+        Every generation still goes through the governor, so the global
+        Sora cap and per-user fairness apply across batches too.
+
         Args:
-            requests: List of {prompt, duration, category} dicts
-            
+            requests: List of {prompt, duration, category[, tg_user_id]} dicts
+            window: Max requests in flight from this batch
+
         Returns:
-            List of results
+            List of results, in request order (exceptions in place of failed results)
         """
-        tasks = []
-        generator = Sora2Generator()
-        
-        for req in requests:
-            task = generator.generate(
-                req["prompt"],
-                req["duration"],
-                req["category"]
-            )
-            tasks.append(task)
-        
-        # Run concurrently with limit
-        results = []
-        batch_size = 5  # Process 5 at a time to avoid rate limits
-        
-        for i in range(0, len(tasks), batch_size):
-            batch = tasks[i:i+batch_size]
-            batch_results = await asyncio.gather(*batch, return_exceptions=True)
-            results.extend(batch_results)
-        
+        results = [None] * len(requests)
+        pending = iter(enumerate(requests))
+
+        async def run_window_slot():
+            # Each slot pulls the next request from the shared iterator until it runs dry
+            for i, req in pending:
+                try:
+                    # One generator per request: generate() keeps per-call state on self
+                    results[i] = await Sora2Generator().generate(
+                        req["prompt"],
+                        req["duration"],
+                        req["category"],
+                        requester=req.get("tg_user_id", "batch")
+                    )
+                except Exception as e:
+                    results[i] = e
+
+        await asyncio.gather(*(run_window_slot() for _ in range(min(window, len(requests)))))
         return results
@@ -0,0 +1,270 @@
+"""
+Shared Sora job poller
+One background loop polls every in-flight Sora job instead of one
+5-second sleep loop per job. Each job is polled on its own adaptive
+schedule: about a third of its estimated remaining time, clamped to
+[SORA_POLL_MIN_INTERVAL, SORA_POLL_MAX_INTERVAL]. A job at 10% that needs
+two more minutes is checked every ~20s; one at 95% every couple of
+seconds, so completion is still noticed quickly.
+
+The ETA comes from the progress rate the API reports, falling back to the
+typical duration of recently completed jobs (seeded with
+SORA_EXPECTED_SECONDS) before the first progress arrives.
+
+Usage:
+    from agent.tools.sora_poller import get_sora_poller
+    payload = await get_sora_poller().wait(job_id, on_progress=callback)
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from loguru import logger
+from config.settings import settings
+from utils.http_clients import get_http_client
+from utils.rate_limit import backoff_delay
+
+ProgressCallback = Callable[[Dict], Awaitable[None]]
+
+# Smoothing for the learned typical job duration
+TYPICAL_EMA_WEIGHT = 0.2
+
+
+class SoraJobError(Exception):
+    """Job failed, timed out or its status could not be read"""
+
+
+@dataclass
+class PolledJob:
+    job_id: str
+    future: asyncio.Future
+    started: float
+    deadline: float
+    next_poll: float
+    waiters: int = 0
+    errors: int = 0
+    polls: int = 0
+    status: str = "queued"
+    progress: float = 0.0
+    eta: Optional[float] = None
+    # (monotonic time, progress) when last seen at 0% and at the latest progress report
+    first_sample: Optional[Tuple[float, float]] = None
+    last_sample: Optional[Tuple[float, float]] = None
+    callbacks: List[ProgressCallback] = field(default_factory=list)
+
+
+class SoraPoller:
+    """Multiplexed, progress-aware status polling for Sora jobs"""
+
+    def __init__(self, fetch_status: Callable[[str], Awaitable[Tuple[int, Dict]]] = None):
+        self._fetch_status = fetch_status or self._http_status
+        self._jobs: Dict[str, PolledJob] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._polls = set()
+        self.typical_seconds = settings.sora_expected_seconds
+        self.stats = {"polls": 0, "completed": 0, "failed": 0, "timed_out": 0, "errors": 0}
+
+    # ==================== PUBLIC API ====================
+
+    async def wait(
+        self,
+        job_id: str,
+        deadline_seconds: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        """
+        Wait for a job to complete
+        Returns: final job status payload
+        Raises: SoraJobError on failure, deadline or repeated status errors
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            now = time.monotonic()
+            job = PolledJob(
+                job_id=job_id,
+                future=asyncio.get_running_loop().create_future(),
+                started=now,
+                deadline=now + (deadline_seconds or settings.sora_job_deadline_seconds),
+                next_poll=now + self._interval(self.typical_seconds)
+            )
+            self._jobs[job_id] = job
+            self._ensure_running()
+
+        if on_progress:
+            job.callbacks.append(on_progress)
+        job.waiters += 1
+        try:
+            return await asyncio.shield(job.future)
+        finally:
+            job.waiters -= 1
+            if on_progress in job.callbacks:
+                job.callbacks.remove(on_progress)
+            if job.waiters == 0 and not job.future.done():
+                # Every waiter gave up (e.g. flow cancelled): stop polling this job
+                self._jobs.pop(job_id, None)
+                job.future.cancel()
+
+    def estimate(self, job_id: str) -> Optional[Dict]:
+        """Latest status/progress/ETA for an in-flight job"""
+        job = self._jobs.get(job_id)
+        return self._progress_event(job, time.monotonic()) if job else None
+
+    def snapshot(self) -> Dict:
+        return {**self.stats, "in_flight": len(self._jobs), "typical_seconds": round(self.typical_seconds, 1)}
+
+    # ==================== SCHEDULING ====================
+
+    def _interval(self, eta: Optional[float]) -> float:
+        if eta is None:
+            eta = self.typical_seconds
+        return min(max(eta / 3, settings.sora_poll_min_interval), settings.sora_poll_max_interval)
+
+    def _estimate_eta(self, job: PolledJob, now: float) -> float:
+        """Seconds until completion from the observed progress rate"""
+        if job.first_sample and job.last_sample and job.last_sample[0] > job.first_sample[0]:
+            (t0, p0), (t1, p1) = job.first_sample, job.last_sample
+            rate = (p1 - p0) / (t1 - t0)
+            return max((100 - p1) / rate - (now - t1), 0.0)
+        # No progress yet: assume a typical job
+        return max(self.typical_seconds - (now - job.started), 0.0)
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        """Start polls for whichever jobs are due, sleep until the next one is"""
+        while self._jobs:
+            now = time.monotonic()
+            for job in list(self._jobs.values()):
+                if job.next_poll <= now:
+                    # In flight: not due again until _poll reschedules it
+                    job.next_poll = float("inf")
+                    task = asyncio.create_task(self._poll(job))
+                    self._polls.add(task)
+                    task.add_done_callback(self._polls.discard)
+
+            next_poll = min((job.next_poll for job in self._jobs.values()), default=float("inf"))
+            self._wakeup.clear()
+            try:
+                timeout = None if next_poll == float("inf") else max(next_poll - now, 0)
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, job: PolledJob) -> None:
+        now = time.monotonic()
+        if now >= job.deadline:
+            self.stats["timed_out"] += 1
+            self._finish(job, SoraJobError(
+                f"Sora 2 generation timed out after {now - job.started:.0f}s ({job.progress:.0f}% done)"
+            ))
+            return
+
+        job.polls += 1
+        self.stats["polls"] += 1
+        try:
+            status_code, payload = await self._fetch_status(job.job_id)
+        except Exception as e:
+            status_code, payload = None, {"error": {"message": str(e)}}
+
+        now = time.monotonic()
+        if status_code != 200:
+            self.stats["errors"] += 1
+            job.errors += 1
+            retryable = status_code is None or status_code == 429 or status_code >= 500
+            if not retryable or job.errors >= settings.sora_poll_max_errors:
+                self._finish(job, SoraJobError(f"Status check error: {status_code} - {payload}"))
+                return
+            logger.warning(f"⚠️ Sora status check for {job.job_id} failed ({status_code}), retry {job.errors}")
+            self._schedule(job, now + max(backoff_delay(job.errors), settings.sora_poll_min_interval))
+            return
+
+        job.errors = 0
+        job.status = payload.get("status") or job.status
+        progress = float(payload.get("progress") or 0)
+        if progress <= 0:
+            # Rate is measured from the last time the job was seen at 0%
+            job.first_sample = (now, 0.0)
+        elif job.first_sample is None:
+            job.first_sample = (job.started, 0.0)
+        if progress > job.progress:
+            job.progress = progress
+            job.last_sample = (now, progress)
+        job.eta = self._estimate_eta(job, now)
+
+        logger.info(f"Sora 2 progress ({job.job_id}): {job.progress:.0f}% - Status: {job.status} - ETA {job.eta:.0f}s")
+
+        if job.status == "completed":
+            elapsed = now - job.started
+            self.typical_seconds += TYPICAL_EMA_WEIGHT * (elapsed - self.typical_seconds)
+            self.stats["completed"] += 1
+            self._finish(job, payload)
+        elif job.status == "failed":
+            self.stats["failed"] += 1
+            error_msg = (payload.get("error") or {}).get("message", "Unknown error")
+            self._finish(job, SoraJobError(f"Sora 2 generation failed: {error_msg}"))
+        else:
+            self._schedule(job, now + self._interval(job.eta))
+            await self._notify(job, now)
+
+    def _schedule(self, job: PolledJob, at: float) -> None:
+        # Never sleep past the deadline, so timeouts fire on time
+        job.next_poll = min(at, job.deadline)
+        self._wakeup.set()
+
+    def _finish(self, job: PolledJob, outcome) -> None:
+        self._jobs.pop(job.job_id, None)
+        self._wakeup.set()
+        if job.future.done():
+            return
+        if isinstance(outcome, Exception):
+            job.future.set_exception(outcome)
+        else:
+            job.future.set_result(outcome)
+
+    def _progress_event(self, job: PolledJob, now: float) -> Dict:
+        return {
+            "job_id": job.job_id,
+            "status": job.status,
+            "progress": job.progress,
+            "eta_seconds": round(job.eta if job.eta is not None else self._estimate_eta(job, now)),
+            "elapsed_seconds": round(now - job.started),
+            "polls": job.polls
+        }
+
+    async def _notify(self, job: PolledJob, now: float) -> None:
+        event = self._progress_event(job, now)
+        for callback in list(job.callbacks):
+            try:
+                await callback(event)
+            except Exception as e:
+                logger.warning(f"Sora progress callback failed for {job.job_id}: {e}")
+
+    # ==================== HTTP ====================
+
+    @staticmethod
+    async def _http_status(job_id: str) -> Tuple[int, Dict]:
+        """GET {openai_base_url}/videos/{video_id}"""
+        response = await get_http_client("openai").get(
+            f"{settings.openai_base_url}/videos/{job_id}",
+            headers={"Authorization": f"Bearer {settings.openai_api_key}"}
+        )
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {"error": {"message": response.text}}
+        return response.status_code, payload
+
+
+# Singleton instance
+_sora_poller = None
+
+def get_sora_poller() -> SoraPoller:
+    """Get or create Sora poller singleton"""
+    global _sora_poller
+    if _sora_poller is None:
+        _sora_poller = SoraPoller()
+    return _sora_poller
@@ -0,0 +1,179 @@
+"""
+Tiered content validation
+Cheapest answer first:
+    1. cache    - verdict for the same normalized prompt seen recently
+    2. keyword  - one Aho-Corasick keyword scan decides clear-cut prompts
+    3. llm      - GPT call only for prompts the keywords can't decide
+
+Each validator (simple flow, campaign ContentValidator) plugs in its own
+keyword lists, fast-path rule and LLM call; hit rates and per-tier
+latency are exposed through validation_stats() (see /health).
+"""
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from config.settings import settings
+from utils.aho_corasick import AhoCorasick
+
+TIERS = ("cache", "keyword", "llm", "fallback")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Cache key / scan text: lowercase, no accents, single spaces, no trailing punctuation"""
+    text = unicodedata.normalize("NFKD", prompt.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.split()).strip(" .!?¡¿,;:")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum()
+
+
+class KeywordMatcher:
+    """
+    Banned-term detection and per-category scoring in one Aho-Corasick pass
+    Every term must start a word (so "how" doesn't match "show"). Banned
+    terms are stems and match any inflection ("hack" hits "hackers",
+    "pump" hits "pumping"), erring towards the strict path; category terms
+    must end the word too, allowing a plural suffix ("swap" matches "swaps"
+    but "eth" doesn't match "ethics"). Overlapping terms all count: "to the
+    moon" also hits "moon", "first swap" also hits "swap".
+    """
+
+    PLURAL_SUFFIXES = ("", "s", "es")
+
+    def __init__(self, banned: Iterable[str], categories: Dict[str, Iterable[str]]):
+        self._labels: Dict[str, List[Tuple[str, str]]] = {}
+        for term in banned:
+            self._labels.setdefault(normalize_prompt(term), []).append(("banned", term))
+        for category, terms in categories.items():
+            for term in terms:
+                self._labels.setdefault(normalize_prompt(term), []).append(("category", category))
+        self._automaton = AhoCorasick(self._labels)
+
+    def __len__(self) -> int:
+        return len(self._automaton)
+
+    @classmethod
+    def _at_word_end(cls, text: str, end: int) -> bool:
+        for suffix in cls.PLURAL_SUFFIXES:
+            if text.startswith(suffix, end):
+                after = end + len(suffix)
+                if after == len(text) or not _is_word_char(text[after]):
+                    return True
+        return False
+
+    def scan(self, text: str) -> Dict:
+        """{"banned": [terms], "categories": {category: hits}} for normalized text"""
+        banned = []
+        categories: Dict[str, int] = {}
+        for start, end, term in self._automaton.find_all(text):
+            if start and _is_word_char(text[start - 1]):
+                continue
+            whole_word = self._at_word_end(text, end)
+            for kind, label in self._labels[term]:
+                if kind == "banned":
+                    banned.append(label)
+                elif whole_word:
+                    categories[label] = categories.get(label, 0) + 1
+        return {"banned": banned, "categories": categories}
+
+
+def top_category(scan: Dict, default: str = "defi_education") -> str:
+    """Category with the most keyword hits (first declared wins ties)"""
+    scores = scan["categories"]
+    return max(scores, key=scores.get) if scores else default
+
+
+class TieredValidator:
+    """Result cache + keyword fast path in front of an LLM validator"""
+
+    def __init__(
+        self,
+        name: str,
+        matcher: KeywordMatcher,
+        fast_path: Callable[[Dict], Optional[Dict]],
+        llm: Callable[[str, Dict], Awaitable[Dict]]
+    ):
+        self.name = name
+        self.matcher = matcher
+        self.fast_path = fast_path
+        self.llm = llm
+        self._cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self.stats = {tier: 0 for tier in TIERS}
+        self._latency = {tier: 0.0 for tier in TIERS}
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        stored_at, result = cached
+        if time.monotonic() - stored_at > settings.validation_cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: str, result: Dict) -> None:
+        self._cache[key] = (time.monotonic(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > settings.validation_cache_size:
+            self._cache.popitem(last=False)
+
+    def _record(self, tier: str, started: float) -> None:
+        self.stats[tier] += 1
+        self._latency[tier] += time.perf_counter() - started
+
+    async def validate(self, prompt: str) -> Dict:
+        """Validation result dict, with "tier" saying which tier answered"""
+        started = time.perf_counter()
+        key = normalize_prompt(prompt)
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._record("cache", started)
+            return {**cached, "tier": "cache"}
+
+        scan = self.matcher.scan(key)
+        result = self.fast_path(scan) if settings.validation_fast_path else None
+        if result is not None:
+            result["tier"] = "keyword"
+        else:
+            result = await self.llm(prompt, scan)
+            # LLM errors come back as tier "fallback" and are never cached
+            result.setdefault("tier", "llm")
+
+        if result["tier"] != "fallback":
+            self._cache_put(key, result)
+        self._record(result["tier"], started)
+        logger.debug(f"🛡️ [{self.name}] {result['tier']} verdict in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return dict(result)
+
+    def snapshot(self) -> Dict:
+        """Counters, hit rates and average latency per tier"""
+        total = sum(self.stats.values())
+        return {
+            "requests": total,
+            **self.stats,
+            "cache_hit_rate": round(self.stats["cache"] / total, 3) if total else 0.0,
+            "llm_avoided_rate": round((self.stats["cache"] + self.stats["keyword"]) / total, 3) if total else 0.0,
+            "avg_ms": {
+                tier: round(self._latency[tier] / self.stats[tier] * 1000, 2)
+                for tier in TIERS if self.stats[tier]
+            },
+            "cached_prompts": len(self._cache)
+        }
+
+
+# Every tiered validator, by name (for /health)
+_validators: Dict[str, TieredValidator] = {}
+
+def register_validator(validator: TieredValidator) -> TieredValidator:
+    _validators[validator.name] = validator
+    return validator
+
+
+def validation_stats() -> Dict:
+    return {name: validator.snapshot() for name, validator in _validators.items()}
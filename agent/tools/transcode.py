@@ -0,0 +1,179 @@
+"""
+Multi-rendition transcoding and HLS packaging for gallery playback
+Each generated video is encoded into a small bitrate ladder (TRANSCODE_RENDITIONS),
+one ffmpeg job per rendition on the shared FFmpeg pool, segmented as HLS.
+Segments and playlists go into the content store; since its keys are
+content hashes, playlists are rewritten to point at the stored URLs, and
+a master playlist ties the renditions together for adaptive playback.
+The TRANSCODE_FALLBACK_RENDITION segments are also remuxed (no re-encode)
+into a faststart MP4 for players without HLS support.
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+from config.settings import settings
+from utils.content_store import get_content_store
+from utils.ffmpeg_pool import get_ffmpeg_pool, input_args
+
+HLS_PLAYLIST_TYPE = "application/vnd.apple.mpegurl"
+HLS_SEGMENT_TYPE = "video/mp2t"
+
+# Bitrate ladder for Sora's 720x1280 portrait output. Capped CRF: quality-driven
+# encodes that never exceed maxrate, so simple clips come out well under the cap
+RENDITIONS = {
+    "720p": {"width": 720, "height": 1280, "maxrate": 2400, "audio": 128, "profile": "high", "level": "3.1", "codecs": "avc1.64001f,mp4a.40.2"},
+    "480p": {"width": 480, "height": 854, "maxrate": 1100, "audio": 96, "profile": "main", "level": "3.0", "codecs": "avc1.4d401e,mp4a.40.2"},
+    "360p": {"width": 360, "height": 640, "maxrate": 600, "audio": 64, "profile": "main", "level": "3.0", "codecs": "avc1.4d401e,mp4a.40.2"}
+}
+
+
+def _rendition_args(source: str, name: str, workdir: Path) -> List[str]:
+    spec = RENDITIONS[name]
+    segment = settings.hls_segment_seconds
+    return input_args(source) + [
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", f"scale={spec['width']}:{spec['height']}",
+        "-c:v", "libx264", "-preset", "faster", "-crf", "23",
+        "-maxrate", f"{spec['maxrate']}k", "-bufsize", f"{spec['maxrate'] * 2}k",
+        "-profile:v", spec["profile"], "-level", spec["level"], "-pix_fmt", "yuv420p",
+        # Keyframe at every segment boundary, aligned across renditions so players can switch
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment})", "-sc_threshold", "0",
+        "-c:a", "aac", "-b:a", f"{spec['audio']}k", "-ac", "2",
+        "-f", "hls", "-hls_time", str(segment), "-hls_playlist_type", "vod",
+        "-hls_segment_filename", str(workdir / f"{name}_%03d.ts"),
+        str(workdir / f"{name}.m3u8")
+    ]
+
+
+async def _store_playlist(workdir: Path, name: str) -> Dict:
+    """Store a rendition's segments, then its playlist rewritten to their URLs"""
+    store = get_content_store()
+    lines = (workdir / f"{name}.m3u8").read_text().splitlines()
+    segment_names = [line for line in lines if line and not line.startswith("#")]
+    stored = await asyncio.gather(*(store.put_file(str(workdir / Path(segment).name), HLS_SEGMENT_TYPE) for segment in segment_names))
+    urls = dict(zip(segment_names, (s["url"] for s in stored)))
+
+    # Peak and average bitrate from the real segments (master playlist BANDWIDTH / AVERAGE-BANDWIDTH)
+    durations = [float(line.split(":", 1)[1].rstrip(",").split(",")[0]) for line in lines if line.startswith("#EXTINF:")]
+    sizes = [s["size"] for s in stored]
+    total_seconds = sum(durations) or 1.0
+    peak = max((size * 8 / max(seconds, 0.001) for size, seconds in zip(sizes, durations)), default=0)
+
+    playlist = "\n".join(urls.get(line, line) for line in lines) + "\n"
+    stored_playlist = await store.put_bytes(playlist.encode(), HLS_PLAYLIST_TYPE)
+    return {
+        "playlist_url": stored_playlist["url"],
+        "bandwidth": int(peak),
+        "average_bandwidth": int(sum(sizes) * 8 / total_seconds),
+        "size": sum(sizes),
+        "segments": len(segment_names)
+    }
+
+
+async def _encode_rendition(source: str, name: str, workdir: Path) -> Dict:
+    spec = RENDITIONS[name]
+    result = await get_ffmpeg_pool().run(_rendition_args(source, name, workdir), timeout=settings.ffmpeg_timeout_seconds)
+    stored = await _store_playlist(workdir, name)
+    logger.info(
+        f"🎚️ {name}: {stored['size'] / 1e6:.2f} MB in {stored['segments']} segments, "
+        f"encoded in {result['seconds']:.1f}s (queued {result['queued_seconds']:.1f}s)"
+    )
+    return {
+        "name": name,
+        "width": spec["width"],
+        "height": spec["height"],
+        "codecs": spec["codecs"],
+        "encode_seconds": round(result["seconds"], 2),
+        **stored
+    }
+
+
+async def _store_fallback(workdir: Path, name: str) -> Dict:
+    """Remux one rendition's segments into a faststart MP4 (stream copy, no re-encode)"""
+    output = workdir / f"{name}.mp4"
+    result = await get_ffmpeg_pool().run(
+        ["-i", str(workdir / f"{name}.m3u8"), "-c", "copy", "-bsf:a", "aac_adtstoasc", "-movflags", "+faststart", str(output)],
+        timeout=settings.ffmpeg_timeout_seconds
+    )
+    stored = await get_content_store().put_file(str(output), "video/mp4")
+    return {"url": stored["url"], "size": stored["size"], "remux_seconds": round(result["seconds"], 2)}
+
+
+def _master_playlist(renditions: List[Dict]) -> str:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for rendition in sorted(renditions, key=lambda r: r["bandwidth"], reverse=True):
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={rendition['bandwidth']},AVERAGE-BANDWIDTH={rendition['average_bandwidth']},"
+            f"RESOLUTION={rendition['width']}x{rendition['height']},CODECS=\"{rendition['codecs']}\""
+        )
+        lines.append(rendition["playlist_url"])
+    return "\n".join(lines) + "\n"
+
+
+async def transcode_video(video_url: str, rendition_names: Optional[List[str]] = None) -> Dict:
+    """
+    Encode a stored video into HLS renditions plus a faststart MP4 fallback
+
+    Args:
+        video_url: Video to transcode (URL or local path)
+        rendition_names: Subset of RENDITIONS (default: TRANSCODE_RENDITIONS)
+
+    Returns:
+        {
+            "success": bool,
+            "hls_url": str,              # master playlist
+            "fallback_url": str | None,  # faststart MP4 of TRANSCODE_FALLBACK_RENDITION
+            "fallback": {"url", "size", "remux_seconds"} | None,
+            "renditions": [{"name", "width", "height", "bandwidth", "size", "playlist_url", "encode_seconds", ...}],
+            "seconds": float,
+            "error": str (optional)
+        }
+    """
+    names = rendition_names or [name.strip() for name in settings.transcode_renditions.split(",") if name.strip()]
+    unknown = [name for name in names if name not in RENDITIONS]
+    if unknown or not names:
+        return {"success": False, "error": f"Unknown renditions: {unknown or names}"}
+
+    started = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory(prefix="hls_") as tmp:
+            workdir = Path(tmp)
+            outcomes = await asyncio.gather(
+                *(_encode_rendition(video_url, name, workdir) for name in names),
+                return_exceptions=True
+            )
+            renditions = []
+            for name, outcome in zip(names, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.warning(f"⚠️ {name} rendition failed for {video_url}: {outcome}")
+                else:
+                    renditions.append(outcome)
+            if not renditions:
+                return {"success": False, "error": "Every rendition failed"}
+
+            fallback = None
+            fallback_name = settings.transcode_fallback_rendition
+            if any(r["name"] == fallback_name for r in renditions):
+                try:
+                    fallback = await _store_fallback(workdir, fallback_name)
+                except Exception as e:
+                    logger.warning(f"⚠️ Faststart fallback failed for {video_url}: {e}")
+
+        master = await get_content_store().put_bytes(_master_playlist(renditions).encode(), HLS_PLAYLIST_TYPE)
+        seconds = time.perf_counter() - started
+        logger.info(f"📺 HLS ready with {len(renditions)} rendition(s) in {seconds:.1f}s: {master['url']}")
+        return {
+            "success": True,
+            "hls_url": master["url"],
+            "fallback_url": fallback["url"] if fallback else None,
+            "fallback": fallback,
+            "renditions": renditions,
+            "seconds": round(seconds, 2)
+        }
+
+    except Exception as e:
+        logger.error(f"Transcoding error: {e}")
+        return {"success": False, "error": str(e)}
@@ -3,21 +3,42 @@ Video Watermarking with FFmpeg
 Adds Uniswap branding to generated videos
 """
 import asyncio
+import hashlib
 import os
-import tempfile
-from typing import Dict
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
 from pathlib import Path
-import httpx
 from loguru import logger
 from config.settings import settings
+from utils.ffmpeg_pool import FRAGMENTED_MP4, FFmpegError, FFmpegQueueFull, get_ffmpeg_pool
 
+# Sora 2 output size (see Sora2Generator.create_job)
+SORA_FRAME_SIZE = (720, 1280)
 
-async def add_watermark(video_url: str) -> Dict:
+# Watermark width as a fraction of the video width
+WATERMARK_WIDTH_RATIO = 0.15
+
+# x264 speed-vs-size profiles (WATERMARK_ENCODER_PRESET); threads come from FFMPEG_THREADS_PER_JOB
+ENCODER_PRESETS = {
+    "fast": ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23"],      # Quickest encode, largest files
+    "balanced": ["-c:v", "libx264", "-preset", "faster", "-crf", "23"],
+    "small": ["-c:v", "libx264", "-preset", "slow", "-crf", "25"]          # Smallest files, slowest encode
+}
+
+# Player-friendly output for every preset: 8-bit 4:2:0, keyframe every 2s (fragment boundaries)
+COMMON_ENCODER_ARGS = ["-pix_fmt", "yuv420p", "-profile:v", "high", "-force_key_frames", "expr:gte(t,n_forced*2)"]
+
+_overlay_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def add_watermark(video_url: str, frame_width: int = SORA_FRAME_SIZE[0], preset: Optional[str] = None) -> Dict:
     """
     Add Uniswap watermark to video using FFmpeg
 
     Args:
         video_url: URL of the video to watermark
+        frame_width: Video width the overlay is sized for (Sora output by default)
+        preset: Encoder preset name (default: WATERMARK_ENCODER_PRESET)
 
     Returns:
         {
@@ -45,43 +66,24 @@ async def add_watermark(video_url: str) -> Dict:
                 "message": "Watermark image not found, using original video"
             }
 
-        # Download video from URL
-        logger.info("Downloading video...")
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.get(video_url)
-            response.raise_for_status()
-            video_data = response.content
-
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as input_file:
-            input_path = input_file.name
-            input_file.write(video_data)
-
-        output_path = input_path.replace('.mp4', '_watermarked.mp4')
-
-        # Build FFmpeg command
-        ffmpeg_cmd = await _build_ffmpeg_command(
-            input_path,
-            output_path,
-            str(watermark_path)
-        )
-
-        # Execute FFmpeg
-        logger.info("Applying watermark with FFmpeg...")
-        process = await asyncio.create_subprocess_shell(
-            ffmpeg_cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-
-        stdout, stderr = await process.communicate()
+        overlay_path = await prepare_overlay(watermark_path, frame_width, settings.watermark_opacity)
 
-        if process.returncode != 0:
-            error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
-            logger.error(f"FFmpeg failed: {error_msg}")
+        # FFmpeg reads the URL itself (HTTP range requests, so MP4s with the
+        # moov atom at the end work) and writes fragmented MP4 to stdout,
+        # which is streamed into storage - no download buffer, no temp files
+        filename = f"watermarked_{uuid.uuid4().hex}.mp4"
+        ffmpeg_args = await _build_ffmpeg_command(video_url, "pipe:1", str(overlay_path), preset)
 
-            # Cleanup
-            _cleanup_temp_files(input_path, output_path)
+        logger.info("Applying watermark with FFmpeg...")
+        try:
+            result = await get_ffmpeg_pool().run(
+                ffmpeg_args,
+                stdout_consumer=lambda chunks: _upload_watermarked_video(chunks, filename),
+                timeout=settings.ffmpeg_timeout_seconds
+            )
+        except (FFmpegError, FFmpegQueueFull, asyncio.TimeoutError) as e:
+            # A partial upload may exist under `filename`; nothing references it
+            logger.error(f"FFmpeg failed: {e}")
 
             # Return original video on error
             return {
@@ -92,13 +94,8 @@ async def add_watermark(video_url: str) -> Dict:
                 "message": "Watermarking failed, using original video"
             }
 
-        # Upload watermarked video (you'll need to implement upload logic)
-        # For now, we'll return a placeholder URL
-        # In production, upload to S3/Supabase Storage/CDN
-        watermarked_url = await _upload_watermarked_video(output_path)
-
-        # Cleanup temporary files
-        _cleanup_temp_files(input_path, output_path)
+        watermarked_url = result["output"]
+        logger.info(f"Encode took {result['seconds']:.1f}s (queued {result['queued_seconds']:.1f}s)")
 
         logger.info(f"Watermark applied successfully: {watermarked_url}")
 
@@ -120,13 +117,50 @@ async def add_watermark(video_url: str) -> Dict:
         }
 
 
+async def prepare_overlay(watermark_path: Path, frame_width: int, opacity: float) -> Path:
+    """
+    Watermark PNG pre-scaled to WATERMARK_WIDTH_RATIO of the frame width
+    with the opacity baked in, rendered once per (image, width, opacity)
+    and cached on disk, so encodes only composite it
+    """
+    stat = watermark_path.stat()
+    key = hashlib.sha1(
+        f"{watermark_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{frame_width}:{opacity}".encode()
+    ).hexdigest()[:16]
+    overlay_path = Path(settings.watermark_cache_dir) / f"overlay_{frame_width}w_{key}.png"
+    if overlay_path.exists():
+        return overlay_path
+
+    async with _overlay_locks.setdefault(key, asyncio.Lock()):
+        if overlay_path.exists():
+            return overlay_path
+
+        overlay_path.parent.mkdir(parents=True, exist_ok=True)
+        width = max(round(frame_width * WATERMARK_WIDTH_RATIO / 2) * 2, 2)
+        tmp_path = overlay_path.with_name(f"{overlay_path.stem}.{uuid.uuid4().hex[:6]}.png")
+        await get_ffmpeg_pool().run([
+            "-i", str(watermark_path),
+            "-vf", f"scale={width}:-1:flags=lanczos,format=rgba,colorchannelmixer=aa={opacity}",
+            "-frames:v", "1",
+            str(tmp_path)
+        ])
+        # Atomic: other processes never see a half-written overlay
+        os.replace(tmp_path, overlay_path)
+        logger.info(f"🖼️ Cached {width}px watermark overlay (opacity {opacity}): {overlay_path}")
+
+    return overlay_path
+
+
 async def _build_ffmpeg_command(
     input_path: str,
     output_path: str,
-    watermark_path: str
-) -> str:
+    overlay_path: str,
+    preset: Optional[str] = None
+) -> List[str]:
     """
-    Build FFmpeg command for watermarking
+    Build FFmpeg arguments for watermarking (run through the FFmpeg pool)
+    input_path may be a URL; output_path "pipe:1" streams fragmented MP4;
+    overlay_path is a prepared overlay (see prepare_overlay)
 
     Position options:
     - bottom-right: main_w-overlay_w-10:main_h-overlay_h-10
@@ -150,88 +184,54 @@ async def _build_ffmpeg_command(
         "main_w-overlay_w-20:main_h-overlay_h-20"  # Default: bottom-right
     )
 
-    # Opacity (0.0 to 1.0)
-    opacity = settings.watermark_opacity
+    preset = preset or settings.watermark_encoder_preset
+    if preset not in ENCODER_PRESETS:
+        logger.warning(f"Unknown encoder preset '{preset}', using 'balanced'")
+        preset = "balanced"
 
-    # FFmpeg command with overlay filter
-    # Scale watermark to 15% of video width
-    cmd = (
-        f'ffmpeg -i "{input_path}" -i "{watermark_path}" '
-        f'-filter_complex "[1:v]scale=iw*0.15:-1,format=rgba,colorchannelmixer=aa={opacity}[wm];'
-        f'[0:v][wm]overlay={position}" '
-        f'-c:a copy -y "{output_path}"'
-    )
+    # Overlay is already scaled and faded: the filter only composites it
+    args = [
+        "-i", input_path,
+        "-i", overlay_path,
+        "-filter_complex", f"[0:v][1:v]overlay={position}",
+        *ENCODER_PRESETS[preset],
+        *COMMON_ENCODER_ARGS,
+        "-c:a", "copy"
+    ]
 
-    return cmd
+    if output_path.startswith("pipe:"):
+        # Pipes can't seek back to write the moov atom: use fragmented MP4
+        args += ["-f", "mp4", "-movflags", FRAGMENTED_MP4]
 
+    return args + [output_path]
 
-async def _upload_watermarked_video(video_path: str) -> str:
-    """
-    Upload watermarked video to storage
-
-    TODO: Implement actual upload to:
-    - Supabase Storage
-    - AWS S3
-    - Cloudinary
-    - or any CDN
 
-    For MVP, we'll just return a placeholder URL
+async def _upload_watermarked_video(chunks: AsyncIterator[bytes], filename: str) -> str:
     """
+    Stream the watermarked video from FFmpeg's stdout into Supabase Storage
+    Returns: public URL
+    """
+    from utils.storage import stream_to_supabase
 
-    # Option 1: Upload to Supabase Storage
-    try:
-        from db.client import db
-
-        with open(video_path, 'rb') as f:
-            video_data = f.read()
-
-        # Generate unique filename
-        import uuid
-        filename = f"watermarked_{uuid.uuid4().hex}.mp4"
-
-        # Upload to Supabase Storage
-        # Assuming you have a 'videos' bucket
-        result = db.client.storage.from_('videos').upload(
-            path=filename,
-            file=video_data,
-            file_options={"content-type": "video/mp4"}
-        )
-
-        # Get public URL
-        public_url = db.client.storage.from_('videos').get_public_url(filename)
-
-        logger.info(f"Video uploaded to Supabase: {public_url}")
-        return public_url
-
-    except Exception as e:
-        logger.warning(f"Upload to Supabase failed: {e}")
-
-        # Fallback: Return placeholder
-        # In production, handle this properly
-        import hashlib
-        hash_id = hashlib.md5(open(video_path, 'rb').read()).hexdigest()[:12]
-        placeholder_url = f"https://storage.uniswap.com/watermarked/{hash_id}.mp4"
+    transferred = {"bytes": 0}
 
-        logger.info(f"Using placeholder URL: {placeholder_url}")
-        return placeholder_url
+    async def counted():
+        async for chunk in chunks:
+            transferred["bytes"] += len(chunk)
+            yield chunk
 
+    # Assuming you have a 'videos' bucket
+    public_url = await stream_to_supabase(counted(), filename)
 
-def _cleanup_temp_files(*file_paths):
-    """Remove temporary files"""
-    for path in file_paths:
-        try:
-            if path and os.path.exists(path):
-                os.unlink(path)
-                logger.debug(f"Cleaned up temp file: {path}")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup {path}: {e}")
+    logger.info(f"Video uploaded to Supabase: {public_url} ({transferred['bytes']} bytes)")
+    return public_url
 
 
 async def check_ffmpeg_installed() -> bool:
     """Check if FFmpeg is installed"""
     try:
-        process = await asyncio.create_subprocess_shell(
-            "ffmpeg -version",
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-version",
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
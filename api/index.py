@@ -5,6 +5,9 @@ No complex imports, just FastAPI + Supabase
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from typing import Optional
+import base64
+import json
 import os
 
 # Create app
@@ -39,9 +42,26 @@ async def health():
     }
 
 
+def _encode_cursor(row: dict) -> str:
+    """Opaque cursor for the row a page ended on (same format as utils/pagination.py)"""
+    raw = json.dumps({"c": row["created_at"], "i": row["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        data = json.loads(base64.urlsafe_b64decode((cursor + "=" * (-len(cursor) % 4)).encode()))
+        return str(data["c"]), int(data["i"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
 @app.get("/api/videos")
-async def get_videos(limit: int = 20, offset: int = 0):
-    """Get public videos - import Supabase only when needed"""
+async def get_videos(limit: int = 20, offset: int = 0, cursor: Optional[str] = None):
+    """
+    Get public videos - import Supabase only when needed
+    Keyset-paginated on (created_at, id): pass `next_cursor` back as `cursor`
+    """
     try:
         from supabase import create_client
 
@@ -52,17 +72,30 @@ async def get_videos(limit: int = 20, offset: int = 0):
             return {"success": False, "error": "Database not configured", "videos": []}
 
         supabase = create_client(supabase_url, supabase_key)
+        limit = min(max(limit, 1), 100)
 
-        result = supabase.table("videos") \
-            .select("id, prompt, category, caption, hashtags, video_url, watermarked_url, thumbnail_url, created_at, duration_seconds, creators(username)") \
+        query = supabase.table("videos") \
+            .select("id, prompt, category, caption, hashtags, public_url, thumbnail_url, preview_url, sprite_url, sprite_meta, hls_url, fallback_url, created_at, duration_seconds, creators(username)") \
             .eq("status", "ready") \
-            .order("created_at", desc=True) \
-            .range(offset, offset + limit - 1) \
-            .execute()
+            .not_.is_("public_url", "null")
+
+        if cursor:
+            created_at, row_id = _decode_cursor(cursor)
+            query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})')
+
+        query = query.order("created_at", desc=True).order("id", desc=True)
+
+        # One extra row tells us whether there is a next page
+        if cursor or not offset:
+            result = query.limit(limit + 1).execute()
+        else:
+            result = query.range(offset, offset + limit).execute()
+
+        rows = result.data[:limit]
+        next_cursor = _encode_cursor(rows[-1]) if len(result.data) > limit else None
 
         videos = []
-        for video in result.data:
-            video_url = video.get("watermarked_url") or video.get("video_url", "")
+        for video in rows:
             creator_username = None
             if video.get("creators") and isinstance(video["creators"], dict):
                 creator_username = video["creators"].get("username")
@@ -73,8 +106,13 @@ async def get_videos(limit: int = 20, offset: int = 0):
                 "category": video.get("category", "unknown"),
                 "caption": video.get("caption", ""),
                 "hashtags": video.get("hashtags", ""),
-                "video_url": video_url,
+                "video_url": video["public_url"],
                 "thumbnail_url": video.get("thumbnail_url", ""),
+                "preview_url": video.get("preview_url"),
+                "sprite_url": video.get("sprite_url"),
+                "sprite_meta": video.get("sprite_meta"),
+                "hls_url": video.get("hls_url"),
+                "fallback_url": video.get("fallback_url"),
                 "created_at": video.get("created_at", ""),
                 "duration_seconds": video.get("duration_seconds", 12),
                 "creator_username": creator_username
@@ -83,7 +121,9 @@ async def get_videos(limit: int = 20, offset: int = 0):
         return {
             "success": True,
             "videos": videos,
-            "total": len(videos)
+            "total": len(videos),
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
         }
 
     except Exception as e:
@@ -108,13 +148,13 @@ async def get_stats():
 
         supabase = create_client(supabase_url, supabase_key)
 
-        videos_result = supabase.table("videos").select("id", count="exact").eq("status", "ready").execute()
-        creators_result = supabase.table("creators").select("id", count="exact").execute()
-        posts_result = supabase.table("posts").select("id").execute()
+        # Single trigger-maintained row (migrations/add_campaign_counters.sql)
+        result = supabase.table("campaign_counters").select("*").eq("id", 1).execute()
+        counters = result.data[0] if result.data else {}
 
-        total_videos = videos_result.count or 0
-        total_creators = creators_result.count or 0
-        total_posts = len(posts_result.data) if posts_result.data else 0
+        total_videos = counters.get("total_videos", 0)
+        total_creators = counters.get("total_creators", 0)
+        total_posts = counters.get("total_posts", 0)
 
         return {
             "success": True,
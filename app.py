@@ -6,7 +6,7 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import asyncio
+from typing import Optional
 from loguru import logger
 
 from telegram import Update
@@ -22,8 +22,19 @@ from telegram.ext import (
 from config.settings import settings
 from agent.agent import agent
 from db.client import db
+from db.leaderboard import get_leaderboard
+from db.epochs import get_epoch_rankings, finalize_previous_epoch
+from db.prompt_index import get_prompt_index
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from scheduler.metrics_updater import get_metrics_updater
+from scheduler.generation_worker import start_generation_workers, stop_generation_workers
+from utils.http_clients import close_http_clients
+from utils.response_cache import get_response_cache
+from agent.tools.tiered_validator import validation_stats
+from agent.tools.sora_poller import get_sora_poller
+from agent.tools.generation_governor import get_generation_governor
+from utils.ffmpeg_pool import get_ffmpeg_pool
+from utils.status_updates import get_status_editor
 
 # Initialize APScheduler
 scheduler = AsyncIOScheduler()
@@ -41,24 +52,62 @@ async def lifespan(app: FastAPI):
     await tg_app.initialize()
     logger.info("✅ Telegram bot initialized")
 
-    # Start metrics auto-updater (every 6 hours)
+    # Start metrics auto-updater (refreshes only posts that are due)
     metrics_updater = get_metrics_updater()
     scheduler.add_job(
-        metrics_updater.update_all_metrics,
+        metrics_updater.update_due_metrics,
         'interval',
-        hours=6,
+        minutes=settings.metrics_tick_minutes,
         id='metrics_updater',
         name='Update social media metrics',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    scheduler.add_job(
+        get_leaderboard().snapshot,
+        'interval',
+        hours=settings.leaderboard_snapshot_hours,
+        id='leaderboard_snapshot',
+        name='Persist leaderboard snapshot',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    scheduler.add_job(
+        finalize_previous_epoch,
+        'cron',
+        day_of_week='mon',
+        hour=0,
+        minute=15,
+        timezone='UTC',
+        id='epoch_finalizer',
+        name='Freeze last epoch ranking',
+        replace_existing=True
+    )
+    # Warm the near-duplicate prompt index in the background (first /create shouldn't pay for it)
+    scheduler.add_job(
+        get_prompt_index().ensure_loaded,
+        'date',
+        id='prompt_index_warmup',
+        name='Load prompt dedup index',
         replace_existing=True
     )
     scheduler.start()
-    logger.info("✅ Metrics auto-updater scheduled (every 6 hours)")
+    logger.info(f"✅ Metrics auto-updater scheduled (due posts every {settings.metrics_tick_minutes} min)")
+
+    # Start Sora 2 generation queue workers
+    generation_workers = start_generation_workers(settings.generation_workers)
+    logger.info(f"✅ {len(generation_workers)} generation worker(s) started")
 
     yield
     # Shutdown
     logger.info("👋 Shutting down")
+    await stop_generation_workers(generation_workers)
     scheduler.shutdown()
     await tg_app.shutdown()
+    await close_http_clients()
+    db.close()
 
 
 app = FastAPI(title="ETH Creators Bot", lifespan=lifespan)
@@ -135,12 +184,16 @@ async def create_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     import random
     folio = f"VID-{int(time.time())}-{random.randint(1000, 9999)}"
 
+    # ETA from recently completed Sora jobs (shared poller)
+    from agent.tools.sora2 import Sora2Generator
+    eta_minutes = max(1, round(Sora2Generator().estimate_generation_time(12) / 60))
+
     # Send initial processing message
     processing_msg = await update.message.reply_text(
         f"🎬 **Generando tu video con IA...**\n\n"
         f"📋 **Folio:** `{folio}`\n"
         f"📝 **Tu Prompt:** _{prompt}_\n\n"
-        f"⏳ **Tiempo estimado:** 2-5 minutos\n"
+        f"⏳ **Tiempo estimado:** ~{eta_minutes} minutos\n"
         f"🤖 **Tecnología:** OpenAI Sora 2 (generación de video con IA)\n"
         f"💰 **Costo:** ~$4 USD por video de 12 segundos\n\n"
         f"✅ **Validando tu prompt...**\n"
@@ -149,304 +202,103 @@ async def create_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode="Markdown"
     )
 
-    # Create countdown updater task
-    import asyncio
-    countdown_active = {"active": True}
-
-    async def update_countdown():
-        """Update message every minute with countdown"""
-        countdown_messages = [
-            ("⏳", "5 minutos restantes", "🎨 La IA está pintando tu visión..."),
-            ("⏳", "4 minutos restantes", "🎬 Sora 2 está haciendo su magia..."),
-            ("⏳", "3 minutos restantes", "🤖 Renderizando frames..."),
-            ("⏱️", "2 minutos restantes", "✨ ¡Casi listo! Puliendo detalles finales..."),
-            ("⏱️", "1 minuto restante", "🎉 ¡Toques finales! Tu video casi está listo..."),
-            ("🎊", "¡30 segundos!", "🚀 Preparando tu obra maestra...")
-        ]
-
-        for i, (emoji, time_text, status_text) in enumerate(countdown_messages):
-            if not countdown_active["active"]:
-                break
-
-            # Wait before updating (first update after 60s, then every 60s, last one at 30s)
-            if i < 5:
-                await asyncio.sleep(60)
-            else:
-                await asyncio.sleep(30)
-
-            if not countdown_active["active"]:
-                break
-
-            try:
-                await processing_msg.edit_text(
-                    f"🎬 **Generando tu video con IA...**\n\n"
-                    f"📋 **Folio:** `{folio}`\n"
-                    f"📝 **Tu Prompt:** _{prompt}_\n\n"
-                    f"{emoji} **{time_text}**\n"
-                    f"🤖 **Tecnología:** OpenAI Sora 2 (generación de video con IA)\n"
-                    f"💰 **Costo:** ~$4 USD por video de 12 segundos\n\n"
-                    f"{status_text}\n\n"
-                    f"💡 **Consejo:** Cada video es costoso, ¡hazlo valer!",
-                    parse_mode="Markdown"
-                )
-            except Exception as e:
-                logger.warning(f"Could not update countdown message: {e}")
-                break
-
-    # Start countdown in background
-    countdown_task = asyncio.create_task(update_countdown())
-
-    # Call simplified flow (direct Sora 2, no Assistant API)
-    from simple_flow import create_video_simple
-    logger.info(f"🎬 [{folio}] Creating video for @{username}: '{prompt[:50]}...'")
+    # Validate and enqueue - a generation worker picks it up and delivers the video
+    from simple_flow import enqueue_video_simple
+    logger.info(f"🎬 [{folio}] Queueing video for @{username}: '{prompt[:50]}...'")
 
-    try:
-        result = await create_video_simple(user_id, username, prompt)
-    finally:
-        # Stop countdown and delete message
-        countdown_active["active"] = False
-        countdown_task.cancel()
-        try:
-            await countdown_task
-        except asyncio.CancelledError:
-            pass
+    result = await enqueue_video_simple(
+        user_id,
+        username,
+        prompt,
+        chat_id=update.effective_chat.id,
+        status_message_id=processing_msg.message_id
+    )
 
+    if result.get("success"):
         try:
-            await processing_msg.delete()
+            ahead = await db.count_queued_before(result["video_id"])
         except Exception as e:
-            logger.warning(f"Could not delete processing message: {e}")
-    
-    if result.get("success") or result.get("approved"):
-        # Video generated successfully
-        video_url = result.get("video_url")
-        caption = result.get("caption", "")
-        hashtags = result.get("hashtags", "")
-
-        # Check if we have a video URL
-        is_openai_url = video_url and video_url.startswith("https://api.openai.com/v1/videos/")
-        is_public_url = video_url and (video_url.startswith("https://oqdwjrhcdlflfebujnkq.supabase.co/") or video_url.startswith("http"))
-
-        if is_openai_url:
-            # Real Sora 2 video - download first, then send to Telegram
-            import httpx
-            from config.settings import settings
-
-            try:
-                # Download video from authenticated Sora 2 endpoint
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    response = await client.get(
-                        video_url,
-                        headers={"Authorization": f"Bearer {settings.openai_api_key}"},
-                        follow_redirects=True
-                    )
-
-                    if response.status_code == 200:
-                        video_bytes = response.content
-
-                        # Upload to public storage WHILE we have the bytes
-                        try:
-                            from utils.storage import get_storage
-
-                            storage = get_storage()
-                            public_video_url, public_thumbnail_url = await storage.upload_video(
-                                video_bytes,
-                                filename=f"{result.get('job_id', 'video')}.mp4"
-                            )
-
-                            # Update database with public URL if video_id exists
-                            if result.get('video_id'):
-                                await db.update_video_by_id(
-                                    result['video_id'],
-                                    {
-                                        "video_url": public_video_url,
-                                        "thumbnail_url": public_thumbnail_url
-                                    }
-                                )
-                                logger.info(f"✅ Uploaded to public storage: {public_video_url}")
-                            else:
-                                logger.warning("No video_id in result, skipping database update")
-                        except Exception as upload_error:
-                            logger.error(f"❌ CRITICAL: Failed to upload to storage: {upload_error}")
-                            logger.error(f"Video ID: {result.get('video_id')}, Job ID: {result.get('job_id')}")
-                            import traceback
-                            logger.error(traceback.format_exc())
-
-                            # Send alert to user about storage failure
-                            await update.message.reply_text(
-                                "⚠️ **Storage Upload Failed**\n\n"
-                                "Your video was generated but couldn't be uploaded to public storage.\n"
-                                "The video will still be sent to you, but it won't be visible on the website.\n\n"
-                                f"Video ID: {result.get('video_id')}\n\n"
-                                "The admins have been notified.",
-                                parse_mode="Markdown"
-                            )
-                            # Continue anyway - we still have the video bytes for Telegram
-
-                        # Send video bytes to Telegram
-                        video_caption = f"✅ **¡Video Listo!**\n\n"
-                        video_caption += f"📋 Folio: `{folio}`\n"
-                        video_caption += f"🆔 Video ID: #{result.get('video_id')}\n\n"
-                        video_caption += f"{caption}\n\n{hashtags}"
-
-                        await update.message.reply_video(
-                            video=video_bytes,
-                            caption=video_caption,
-                            parse_mode="Markdown"
-                        )
-                    else:
-                        # Fallback to URL if download fails
-                        await update.message.reply_text(
-                            f"✅ **Video generated!**\n\n"
-                            f"{caption}\n\n{hashtags}\n\n"
-                            f"📥 Download: {video_url}",
-                            parse_mode="Markdown"
-                        )
-            except Exception as e:
-                logger.error(f"Error downloading video: {e}")
-                await update.message.reply_text(
-                    f"✅ **Video generated!**\n\n"
-                    f"{caption}\n\n{hashtags}\n\n"
-                    f"⚠️ Could not upload to Telegram. Download link: {video_url}",
-                    parse_mode="Markdown"
-                )
-
-            await update.message.reply_text(
-                "✅ **¡Video listo!**\n\n"
-                "📤 **Siguientes pasos:**\n"
-                "1. Descarga el video de arriba\n"
-                "2. Publícalo en TikTok/X/Instagram\n"
-                "3. Usa `/posted [url]` para comenzar el seguimiento\n\n"
-                "💡 Consejo: ¡Publica en horas pico (6-8 PM) para máximo alcance!\n\n"
-                "🌐 **Ver todos los videos:** www.ethcreators.app",
+            logger.warning(f"Could not read queue position: {e}")
+            ahead = 0
+        try:
+            await processing_msg.edit_text(
+                f"🎬 **¡Tu video está en la cola!**\n\n"
+                f"📋 **Folio:** `{folio}`\n"
+                f"🆔 **Video ID:** #{result.get('video_id')}\n"
+                f"📝 **Tu Prompt:** _{prompt}_\n\n"
+                + (f"🚦 **Posición en la cola:** {ahead + 1}\n" if ahead else "")
+                + f"⏳ **Tiempo estimado:** ~{eta_minutes} minutos\n"
+                f"🤖 **Tecnología:** OpenAI Sora 2 (generación de video con IA)\n\n"
+                f"📬 Te enviaremos el video aquí en cuanto esté listo.\n"
+                f"_Puedes seguir usando el bot mientras tanto._",
                 parse_mode="Markdown"
             )
-        elif is_public_url:
-            # Video already has public URL (from Supabase Storage)
-            # Download and send to Telegram
-            try:
-                import httpx
-
-                logger.info(f"Downloading video from public URL: {video_url[:80]}...")
-
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    response = await client.get(video_url, follow_redirects=True)
-
-                    if response.status_code == 200:
-                        video_bytes = response.content
-                        logger.info(f"Downloaded {len(video_bytes)} bytes")
-
-                        # Send to Telegram
-                        video_caption = f"✅ **¡Video Listo!**\n\n"
-                        video_caption += f"📋 Folio: `{folio}`\n"
-                        video_caption += f"🆔 Video ID: #{result.get('video_id')}\n\n"
-                        video_caption += f"{caption}\n\n{hashtags}" if caption or hashtags else "¡Mira este increíble video con IA!"
-
-                        await update.message.reply_video(
-                            video=video_bytes,
-                            caption=video_caption,
-                            parse_mode="Markdown"
-                        )
-
-                        await update.message.reply_text(
-                            "✅ **¡Video listo!**\n\n"
-                            "📤 **Siguientes pasos:**\n"
-                            "1. Descarga el video de arriba\n"
-                            "2. Publícalo en TikTok/X/Instagram\n"
-                            "3. Usa `/posted [url]` para comenzar el seguimiento\n\n"
-                            "💡 Consejo: ¡Publica en horas pico (6-8 PM) para máximo alcance!\n\n"
-                            "🌐 **Ver todos los videos:** www.ethcreators.app",
-                            parse_mode="Markdown"
-                        )
-                        logger.info(f"✅ [{folio}] Video sent to Telegram successfully (Video ID: {result.get('video_id')})")
-                    else:
-                        # Send URL if download fails
-                        await update.message.reply_text(
-                            f"✅ **Video generated!**\n\n"
-                            f"{caption}\n\n{hashtags}\n\n"
-                            f"📥 Watch online: {video_url}",
-                            parse_mode="Markdown"
-                        )
-
-            except Exception as e:
-                logger.error(f"Error sending public video: {e}")
-                await update.message.reply_text(
-                    f"✅ **Video generated!**\n\n"
-                    f"{caption}\n\n{hashtags}\n\n"
-                    f"📥 Watch online: {video_url}\n\n"
-                    f"⚠️ Could not send to Telegram directly.",
-                    parse_mode="Markdown"
-                )
+        except Exception as e:
+            logger.warning(f"Could not update processing message: {e}")
+        return
+
+    try:
+        await processing_msg.delete()
+    except Exception as e:
+        logger.warning(f"Could not delete processing message: {e}")
+
+    # Content rejected or error
+    reason = result.get("reason", "Unknown error")
+    suggestions = result.get("suggestions", [])
+
+    # Check if it's a duplicate prompt
+    if result.get("duplicate") or result.get("error") == "duplicate_prompt":
+        message = f"⚠️ **¡Video Duplicado Detectado!**\n\n"
+        message += f"📋 **Folio:** `{folio}` _(bloqueado)_\n"
+        message += f"📝 **Tu Prompt:** _{prompt}_\n\n"
+        if result.get("reuse_video_id"):
+            message += f"Ya existe un video muy similar a tu prompt.\n\n"
+        elif result.get("similarity"):
+            message += f"Ya creaste un video muy similar recientemente ({result['similarity']:.0%} de coincidencia).\n\n"
         else:
-            # No real video URL - inform user
-            await update.message.reply_text(
-                f"✅ **Video generated!**\n\n"
-                f"{caption}\n\n{hashtags}\n\n"
-                f"⚠️ Video processing in progress. You'll receive it soon!",
-                parse_mode="Markdown"
-            )
-    else:
-        # Content rejected or error
-        reason = result.get("reason", "Unknown error")
-        suggestions = result.get("suggestions", [])
-
-        # Check if it's a duplicate prompt
-        if result.get("duplicate") or result.get("error") == "duplicate_prompt":
-            message = f"⚠️ **¡Video Duplicado Detectado!**\n\n"
-            message += f"📋 **Folio:** `{folio}` _(bloqueado)_\n"
-            message += f"📝 **Tu Prompt:** _{prompt}_\n\n"
             message += f"Ya creaste un video con este prompt exacto recientemente.\n\n"
-            message += f"**Razón:** {reason}\n\n"
-            message += "💰 **Por qué bloqueamos duplicados:**\n"
-            message += "• Cada video cuesta ~$4 USD generar\n"
-            message += "• Los videos duplicados desperdician recursos\n"
-            message += "• ¡Prueba un ángulo creativo diferente!\n\n"
-            message += "💡 **Qué puedes hacer:**\n"
-            message += "1. Modifica tu prompt ligeramente\n"
-            message += "2. Prueba una idea completamente diferente\n"
-            message += "3. Usa `/myvideos` para ver tus videos existentes\n\n"
-            if result.get("existing_video_id"):
-                message += f"📹 Tu video existente: ID #{result.get('existing_video_id')}\n\n"
-            message += "🌐 **Ver tus videos:** www.ethcreators.app"
-        # Check if it's the "no credits" error
-        elif "NO_CREDITS_AVAILABLE" in reason or "NO_CREDITS_AVAILABLE" in result.get("error", ""):
-            message = "🎬💸 **¡Ups! Nos quedamos sin créditos de IA!** 💸🎬\n\n"
-            message += "🤖 *El robot de videos se quedó sin combustible...*\n\n"
-            message += "😅 Generar videos con Sora 2 cuesta ~$4 USD por video,\n"
-            message += "¡y parece que gastamos todo el presupuesto del mes! 🫠\n\n"
-            message += "📢 **¡Pero no te preocupes!**\n"
-            message += "Los admins ya están recargando la cuenta. 🔋⚡\n\n"
-            message += "⏰ **Vuelve en unas horas** y podrás crear tu video.\n\n"
-            message += "🌐 Mientras tanto, mira los videos existentes en:\n"
-            message += "www.ethcreators.app\n\n"
-            message += "💡 *Consejo:* ¡Síguenos en @ETHCreators para saber cuándo volvemos! 🚀"
-        else:
-            message = "❌ **Tu prompt no fue aprobado**\n\n"
-            message += f"**Razón:** {reason}\n\n"
-
-            message += "📋 **Criterios de aprobación:**\n"
-            message += "✅ Educación sobre DeFi y Web3\n"
-            message += "✅ Ethereum y tecnología blockchain\n"
-            message += "✅ Layer 2s (Scroll, Arbitrum)\n"
-            message += "✅ Historias de adopción\n\n"
-
-            message += "❌ **No permitido:**\n"
-            message += "• Predicciones de precios\n"
-            message += "• Menciones a competidores\n"
-            message += "• Contenido de apuestas\n"
-            message += "• Promesas de \"hacerse rico rápido\"\n\n"
-
-            if suggestions:
-                message += "💡 **Ejemplos de prompts aprobados:**\n"
-                for i, s in enumerate(suggestions, 1):
-                    message += f"{i}. _{s}_\n"
-                message += "\n"
-
-        message += "🎨 Usa `/examples` para más inspiración\n"
-        message += "📜 Ve `/rules` para más detalles\n\n"
-        message += "💰 **Recuerda:** Cada video cuesta ~$4 USD, ¡hazlo valer!\n\n"
-        message += "🌐 **Ver galería:** www.ethcreators.app"
+        message += f"**Razón:** {reason}\n\n"
+        message += "💰 **Por qué bloqueamos duplicados:**\n"
+        message += "• Cada video cuesta ~$4 USD generar\n"
+        message += "• Los videos duplicados desperdician recursos\n"
+        message += "• ¡Prueba un ángulo creativo diferente!\n\n"
+        message += "💡 **Qué puedes hacer:**\n"
+        message += "1. Cambia el enfoque de tu prompt (reformularlo no basta)\n"
+        message += "2. Prueba una idea completamente diferente\n"
+        message += "3. Usa `/myvideos` para ver tus videos existentes\n\n"
+        if result.get("existing_video_id"):
+            message += f"📹 Tu video existente: ID #{result.get('existing_video_id')}\n\n"
+        if result.get("reuse_video_url"):
+            message += f"📹 Video similar listo: {result.get('reuse_video_url')}\n\n"
+        message += "🌐 **Ver tus videos:** www.ethcreators.app"
+    else:
+        message = "❌ **Tu prompt no fue aprobado**\n\n"
+        message += f"**Razón:** {reason}\n\n"
+
+        message += "📋 **Criterios de aprobación:**\n"
+        message += "✅ Educación sobre DeFi y Web3\n"
+        message += "✅ Ethereum y tecnología blockchain\n"
+        message += "✅ Layer 2s (Scroll, Arbitrum)\n"
+        message += "✅ Historias de adopción\n\n"
+
+        message += "❌ **No permitido:**\n"
+        message += "• Predicciones de precios\n"
+        message += "• Menciones a competidores\n"
+        message += "• Contenido de apuestas\n"
+        message += "• Promesas de \"hacerse rico rápido\"\n\n"
+
+        if suggestions:
+            message += "💡 **Ejemplos de prompts aprobados:**\n"
+            for i, s in enumerate(suggestions, 1):
+                message += f"{i}. _{s}_\n"
+            message += "\n"
+
+    message += "🎨 Usa `/examples` para más inspiración\n"
+    message += "📜 Ve `/rules` para más detalles\n\n"
+    message += "💰 **Recuerda:** Cada video cuesta ~$4 USD, ¡hazlo valer!\n\n"
+    message += "🌐 **Ver galería:** www.ethcreators.app"
 
-        await update.message.reply_text(message, parse_mode="Markdown")
+    await update.message.reply_text(message, parse_mode="Markdown")
 
 
 async def posted_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -489,13 +341,14 @@ async def posted_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Get user's videos without posts
-    user_videos_result = db.client.table("videos") \
-        .select("id, prompt, created_at") \
-        .eq("tg_user_id", user_id) \
-        .eq("status", "ready") \
-        .order("created_at", desc=True) \
-        .limit(10) \
-        .execute()
+    user_videos_result = await db.execute(
+        db.client.table("videos")
+        .select("id, prompt, created_at")
+        .eq("tg_user_id", user_id)
+        .eq("status", "ready")
+        .order("created_at", desc=True)
+        .limit(10)
+    )
 
     if not user_videos_result.data:
         await update.message.reply_text(
@@ -510,11 +363,12 @@ async def posted_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     videos_without_url = []
     for video in user_videos_result.data:
         # Check if this video already has a post with this URL
-        existing = db.client.table("posts") \
-            .select("id") \
-            .eq("video_id", video["id"]) \
-            .eq("post_url", url) \
-            .execute()
+        existing = await db.execute(
+            db.client.table("posts")
+            .select("id")
+            .eq("video_id", video["id"])
+            .eq("post_url", url)
+        )
 
         if not existing.data:
             videos_without_url.append(video)
@@ -617,8 +471,9 @@ async def posted_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"See your stats: `/stats`"
             )
 
-            # Update creator stats
+            # Update creator stats and their leaderboard position
             await db.recalculate_creator_stats(user_id)
+            await get_leaderboard().refresh([user_id])
         else:
             # Scraping failed, suggest manual entry
             message = (
@@ -648,7 +503,8 @@ async def posted_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show leaderboard"""
-    top_creators = await db.get_leaderboard(limit=10)
+    leaderboard = get_leaderboard()
+    top_creators = await leaderboard.top(10)
 
     if not top_creators:
         await update.message.reply_text("🏆 La tabla está vacía. ¡Sé el primero!")
@@ -667,7 +523,7 @@ async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         message += f"{medal} @{username} — {views:,} vistas\n"
 
     # Add user's rank if not in top 10
-    user_rank = await db.get_user_rank(update.effective_user.id)
+    user_rank = await leaderboard.get(update.effective_user.id)
     if user_rank and user_rank["rank"] > 10:
         message += f"\n...\n\n"
         message += f"**Tu posición:** #{user_rank['rank']} — {user_rank['total_views']:,} vistas"
@@ -681,7 +537,7 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Get user data
     creator = await db.get_creator(user_id)
-    user_rank = await db.get_user_rank(user_id)
+    user_rank = await get_leaderboard().get(user_id)
     videos = await db.get_user_videos(user_id, limit=5)
 
     if not creator:
@@ -801,12 +657,13 @@ async def update_metrics_command(update: Update, context: ContextTypes.DEFAULT_T
         shares = int(context.args[3]) if len(context.args) > 3 else 0
 
         # Get user's most recent post
-        posts_result = db.client.table("posts") \
-            .select("*") \
-            .eq("tg_user_id", user_id) \
-            .order("created_at", desc=True) \
-            .limit(1) \
-            .execute()
+        posts_result = await db.execute(
+            db.client.table("posts")
+            .select("*")
+            .eq("tg_user_id", user_id)
+            .order("created_at", desc=True)
+            .limit(1)
+        )
 
         if not posts_result.data:
             await update.message.reply_text(
@@ -828,6 +685,7 @@ async def update_metrics_command(update: Update, context: ContextTypes.DEFAULT_T
 
         await db.update_post_metrics(post["id"], metrics)
         await db.recalculate_creator_stats(user_id)
+        await get_leaderboard().refresh([user_id])
 
         await update.message.reply_text(
             f"✅ **Metrics updated!**\n\n"
@@ -863,12 +721,13 @@ async def myvideos_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
 
     # Get user's videos
-    videos_result = db.client.table("videos") \
-        .select("id, prompt, created_at, status") \
-        .eq("tg_user_id", user_id) \
-        .order("created_at", desc=True) \
-        .limit(10) \
-        .execute()
+    videos_result = await db.execute(
+        db.client.table("videos")
+        .select("id, prompt, created_at, status")
+        .eq("tg_user_id", user_id)
+        .order("created_at", desc=True)
+        .limit(10)
+    )
 
     if not videos_result.data:
         await update.message.reply_text(
@@ -889,10 +748,11 @@ async def myvideos_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         message += f"📅 {video['created_at'][:10]}\n"
 
         # Get posts for this video
-        posts_result = db.client.table("posts") \
-            .select("platform, post_url, views, likes") \
-            .eq("video_id", video["id"]) \
-            .execute()
+        posts_result = await db.execute(
+            db.client.table("posts")
+            .select("platform, post_url, views, likes")
+            .eq("video_id", video["id"])
+        )
 
         if posts_result.data:
             message += f"📱 **Posted on:**\n"
@@ -955,7 +815,13 @@ async def health_check():
     return {
         "status": "healthy",
         "agent_ready": agent.assistant_id is not None,
-        "version": "2.0.0"
+        "version": "2.0.0",
+        "response_cache": get_response_cache().stats,
+        "validation": validation_stats(),
+        "sora_poller": get_sora_poller().snapshot(),
+        "generation_governor": get_generation_governor().snapshot(),
+        "ffmpeg_pool": get_ffmpeg_pool().snapshot(),
+        "status_edits": get_status_editor().snapshot()
     }
 
 
@@ -979,59 +845,54 @@ async def campaign_stats():
 # ==================== PUBLIC API FOR LANDING PAGE ====================
 
 @app.get("/api/videos")
-async def get_public_videos(limit: int = 20, offset: int = 0):
+async def get_public_videos(request: Request, limit: int = 20, offset: int = 0, cursor: Optional[str] = None):
     """
     Get public videos for landing page gallery
     Returns videos with their metadata including social metrics
+    Cached (see utils/response_cache.py); invalidated on video/post writes
 
-    NOTE: Filters out videos with OpenAI URLs (not publicly accessible)
-          Only returns videos with public Supabase Storage URLs
+    Pagination: pass the returned `next_cursor` as `cursor` for the next page
+    (keyset on created_at, id). `offset` still works for the first request of
+    older clients but gets slower on deep pages.
+
+    NOTE: Only videos with a public (non-OpenAI) URL are returned; the filter
+          runs in SQL on videos.public_url
     """
-    try:
-        # Get recent completed videos with creator info
-        # Note: Fetching more than requested to account for filtering
-        result = db.client.table("videos") \
-            .select("id, prompt, category, caption, hashtags, video_url, watermarked_url, thumbnail_url, created_at, duration_seconds, tg_user_id, creators(username)") \
-            .eq("status", "ready") \
-            .order("created_at", desc=True) \
-            .range(offset, offset + limit + 20 - 1) \
-            .execute()
+    return await get_response_cache().respond(
+        request, ("videos",), lambda: _build_public_videos(limit, offset, cursor)
+    )
 
-        videos = []
-        for video in result.data:
-            # Use watermarked_url if available, fallback to video_url
-            video_url = video.get("watermarked_url") or video.get("video_url", "")
 
-            # FILTER: Skip videos with OpenAI URLs (not publicly accessible)
-            if video_url and video_url.startswith("https://api.openai.com/"):
-                logger.warning(f"Skipping video {video['id']} - has OpenAI URL (not public)")
-                continue
+async def _build_public_videos(limit: int, offset: int, cursor: Optional[str]) -> dict:
+    """Uncached /api/videos payload"""
+    limit = min(max(limit, 1), 100)
+    try:
+        try:
+            page_videos, next_cursor = await db.get_gallery_videos(limit, cursor=cursor, offset=offset)
+        except ValueError as e:
+            return {"success": False, "error": str(e), "videos": []}
 
-            # FILTER: Skip videos without video URLs
-            if not video_url or not video_url.startswith("http"):
-                logger.warning(f"Skipping video {video['id']} - missing or invalid URL")
-                continue
+        # Get associated posts for the whole page in ONE query (avoids N+1 round trips)
+        posts_by_video = await db.get_posts_for_videos([video["id"] for video in page_videos])
 
+        videos = []
+        for video in page_videos:
             # Get creator username
             creator_username = None
             if video.get("creators") and isinstance(video["creators"], dict):
                 creator_username = video["creators"].get("username")
 
-            # Get associated posts with metrics
-            posts_result = db.client.table("posts") \
-                .select("platform, post_url, views, likes, comments_count, shares") \
-                .eq("video_id", video["id"]) \
-                .execute()
+            posts = posts_by_video.get(video["id"], [])
 
             # Aggregate metrics from all posts
-            total_views = sum(p.get("views", 0) for p in posts_result.data)
-            total_likes = sum(p.get("likes", 0) for p in posts_result.data)
-            total_comments = sum(p.get("comments_count", 0) for p in posts_result.data)
-            total_shares = sum(p.get("shares", 0) for p in posts_result.data)
+            total_views = sum(p.get("views", 0) for p in posts)
+            total_likes = sum(p.get("likes", 0) for p in posts)
+            total_comments = sum(p.get("comments_count", 0) for p in posts)
+            total_shares = sum(p.get("shares", 0) for p in posts)
 
             # Get platforms where posted with their URLs
             platform_posts = []
-            for p in posts_result.data:
+            for p in posts:
                 if p.get("platform") and p.get("post_url"):
                     platform_posts.append({
                         "platform": p.get("platform"),
@@ -1046,8 +907,13 @@ async def get_public_videos(limit: int = 20, offset: int = 0):
                 "category": video.get("category", "unknown"),
                 "caption": video.get("caption", ""),
                 "hashtags": video.get("hashtags", ""),
-                "video_url": video_url,
+                "video_url": video["public_url"],
                 "thumbnail_url": video.get("thumbnail_url", ""),
+                "preview_url": video.get("preview_url"),
+                "sprite_url": video.get("sprite_url"),
+                "sprite_meta": video.get("sprite_meta"),
+                "hls_url": video.get("hls_url"),
+                "fallback_url": video.get("fallback_url"),
                 "created_at": video.get("created_at", ""),
                 "duration_seconds": video.get("duration_seconds", 12),
                 "creator_username": creator_username,
@@ -1060,16 +926,14 @@ async def get_public_videos(limit: int = 20, offset: int = 0):
                 }
             })
 
-            # Stop if we have enough videos after filtering
-            if len(videos) >= limit:
-                break
-
         return {
             "success": True,
-            "videos": videos[:limit],  # Limit to requested amount
-            "total": len(videos[:limit]),
+            "videos": videos,
+            "total": len(videos),
             "offset": offset,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
         }
 
     except Exception as e:
@@ -1082,42 +946,25 @@ async def get_public_videos(limit: int = 20, offset: int = 0):
 
 
 @app.get("/api/stats")
-async def get_public_stats():
+async def get_public_stats(request: Request):
     """
     Get public statistics for landing page
     Shows total creators, videos, and engagement metrics
+    Cached (see utils/response_cache.py)
     """
-    try:
-        # Get total videos
-        videos_result = db.client.table("videos") \
-            .select("id", count="exact") \
-            .eq("status", "ready") \
-            .execute()
-
-        total_videos = videos_result.count or 0
-
-        # Get total creators (unique users)
-        creators_result = db.client.table("creators") \
-            .select("id", count="exact") \
-            .execute()
-
-        total_creators = creators_result.count or 0
+    return await get_response_cache().respond(request, ("stats",), _build_public_stats)
 
-        # Get top creator views directly from creators table
-        top_creator_result = db.client.table("creators") \
-            .select("total_views") \
-            .order("total_views", desc=True) \
-            .limit(1) \
-            .execute()
 
-        top_creator_views = top_creator_result.data[0].get("total_views", 0) if top_creator_result.data else 0
-
-        # Get total views from all posts
-        posts_result = db.client.table("posts") \
-            .select("id") \
-            .execute()
+async def _build_public_stats() -> dict:
+    """Uncached /api/stats payload"""
+    try:
+        # One row maintained by triggers (no COUNT(*) scans, no post id download)
+        counters = await db.get_campaign_counters()
 
-        total_posts = len(posts_result.data) if posts_result.data else 0
+        total_creators = counters.get("total_creators", 0)
+        total_videos = counters.get("total_videos", 0)
+        total_posts = counters.get("total_posts", 0)
+        top_creator_views = counters.get("top_creator_views", 0)
 
         return {
             "success": True,
@@ -1146,27 +993,32 @@ async def get_public_stats():
 
 
 @app.get("/api/leaderboard")
-async def get_public_leaderboard(limit: int = 10):
+async def get_public_leaderboard(request: Request, limit: int = 10):
     """
     Get public leaderboard for landing page
     Shows top creators by views/engagement
+    Cached (see utils/response_cache.py)
     """
+    return await get_response_cache().respond(
+        request, ("leaderboard",), lambda: _build_public_leaderboard(limit)
+    )
+
+
+async def _build_public_leaderboard(limit: int) -> dict:
+    """Uncached /api/leaderboard payload"""
     try:
-        # Get creators directly from creators table, ordered by views
-        result = db.client.table("creators") \
-            .select("username, total_views, total_videos, total_engagements") \
-            .order("total_views", desc=True) \
-            .limit(limit) \
-            .execute()
+        # Served from the in-process leaderboard (no ORDER BY per request)
+        entries = await get_leaderboard().top(min(max(limit, 1), 100))
 
         top_creators = []
-        for rank, entry in enumerate(result.data, start=1):
+        for entry in entries:
             top_creators.append({
-                "rank": rank,
-                "username": entry.get("username", "Anonymous"),
-                "total_views": entry.get("total_views", 0),
-                "total_videos": entry.get("total_videos", 0),
-                "total_engagements": entry.get("total_engagements", 0)
+                "rank": entry["rank"],
+                "rank_change": entry["rank_change"],
+                "username": entry.get("username") or "Anonymous",
+                "total_views": entry["total_views"],
+                "total_videos": entry["total_videos"],
+                "total_engagements": entry["total_engagements"]
             })
 
         return {
@@ -1189,48 +1041,41 @@ async def get_epoch_winners(epoch_id: int):
     Get top 3 creators for a specific epoch (week)
     Used by betting pool smart contract settlement
     Epoch format: YYYYWW (e.g., 202542 = Year 2025, Week 42)
+
+    Ranked by views gained during the ISO week (UTC). Closed epochs are
+    frozen on first request, so repeated settlement calls get the same answer.
     """
     try:
-        from datetime import datetime, timedelta
-
-        # Parse epoch_id to get year and week
-        year = epoch_id // 100
-        week = epoch_id % 100
-
-        # Calculate date range for this week
-        # ISO week starts on Monday
-        jan_4 = datetime(year, 1, 4)
-        week_1_start = jan_4 - timedelta(days=jan_4.weekday())
-        target_week_start = week_1_start + timedelta(weeks=week - 1)
-        target_week_end = target_week_start + timedelta(days=7)
-
-        logger.info(f"📊 Fetching winners for epoch {epoch_id} ({target_week_start.date()} to {target_week_end.date()})")
-
-        # Get top 3 creators by total_views (all-time ranking for now)
-        # TODO: Filter by time range when you add timestamp tracking
-        result = db.client.table("creators") \
-            .select("tg_user_id, username, total_views, total_videos, total_engagements") \
-            .order("total_views", desc=True) \
-            .limit(3) \
-            .execute()
-
-        if not result.data or len(result.data) < 3:
+        epoch = await get_epoch_rankings(epoch_id)
+        week_start, week_end = epoch["week_start"], epoch["week_end"]
+
+        logger.info(f"📊 Fetching winners for epoch {epoch_id} ({week_start.date()} to {week_end.date()})")
+
+        if len(epoch["rankings"]) < 3:
             return {
                 "success": False,
-                "error": "Not enough creators in database",
+                "error": "Not enough creators with views in this epoch",
                 "epoch_id": epoch_id,
+                "final": epoch["final"],
                 "winners": []
             }
 
+        top = epoch["rankings"][:3]
+        # All-time totals, kept next to the epoch figures for existing settlement clients
+        totals = {c["tg_user_id"]: c for c in await db.get_creators_for_ranking([e["tg_user_id"] for e in top])}
+
         winners = []
-        for rank, creator in enumerate(result.data, start=1):
+        for entry in top:
+            creator = totals.get(entry["tg_user_id"], {})
             winners.append({
-                "rank": rank,
-                "creator_id": creator["tg_user_id"],
-                "username": creator["username"],
-                "total_views": creator["total_views"],
-                "total_videos": creator["total_videos"],
-                "total_engagements": creator["total_engagements"]
+                "rank": entry["rank"],
+                "creator_id": entry["tg_user_id"],
+                "username": entry["username"],
+                "epoch_views": entry["views_gained"],
+                "posts_counted": entry["posts_counted"],
+                "total_views": creator.get("total_views", 0),
+                "total_videos": creator.get("total_videos", 0),
+                "total_engagements": creator.get("total_engagements", 0)
             })
 
         logger.info(f"✅ Top 3 for epoch {epoch_id}: {[w['username'] for w in winners]}")
@@ -1238,12 +1083,21 @@ async def get_epoch_winners(epoch_id: int):
         return {
             "success": True,
             "epoch_id": epoch_id,
-            "week_start": target_week_start.isoformat(),
-            "week_end": target_week_end.isoformat(),
+            "week_start": week_start.isoformat(),
+            "week_end": week_end.isoformat(),
+            "final": epoch["final"],  # False while the week is still running
             "winners": winners,
             "winner_ids": [w["creator_id"] for w in winners]  # For smart contract
         }
 
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": f"Invalid epoch_id: {e}",
+            "epoch_id": epoch_id,
+            "winners": []
+        }
+
     except Exception as e:
         logger.error(f"Error fetching epoch winners: {e}")
         return {
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Render gallery previews (poster, preview loop, sprite sheet) for videos
+that were generated before agent/tools/previews.py existed
+Needs ffmpeg on PATH; re-runs only pick up videos still missing a preview.
+
+Usage:
+    python backfill_previews.py [limit]
+"""
+import asyncio
+import sys
+from db.client import db
+from agent.tools.previews import generate_previews
+
+
+async def backfill_previews(limit: int):
+    result = await db.execute(
+        db.client.table("videos")
+        .select("id, public_url, duration_seconds")
+        .eq("status", "ready")
+        .not_.is_("public_url", "null")
+        .is_("preview_url", "null")
+        .order("created_at", desc=True)
+        .limit(limit)
+    )
+    videos = result.data
+    print(f"📊 Found {len(videos)} videos without previews\n")
+
+    rendered = 0
+    for i, video in enumerate(videos, 1):
+        fields = await generate_previews(video["public_url"], video.get("duration_seconds") or 12)
+        if fields:
+            await db.update_video_by_id(video["id"], fields)
+            rendered += 1
+        print(f"   {'✅' if fields else '❌'} {i}/{len(videos)} video #{video['id']}: {', '.join(fields) or 'nothing rendered'}")
+
+    print(f"\n🖼️ Previews rendered for {rendered}/{len(videos)} videos")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_previews(int(sys.argv[1]) if len(sys.argv) > 1 else 100))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Load test: public landing-page API with and without the response cache
+Runs the FastAPI app in-process (httpx ASGI transport, no lifespan, no
+Telegram) with Supabase replaced by a fake that sleeps like a PostgREST
+round trip. Needs the normal .env so config.settings loads.
+
+Usage:
+    python bench_api_cache.py [requests_per_endpoint] [concurrency] [db_latency_ms]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+import app as app_module
+from db.client import db
+
+DB_LATENCY = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.040
+ROWS = 60
+db_calls = 0
+
+
+class FakeResult:
+    def __init__(self, data, count):
+        self.data = data
+        self.count = count
+
+
+def _fake_row(i: int) -> dict:
+    """One row shape that satisfies every query the public endpoints make"""
+    return {
+        "id": i, "video_id": i, "tg_user_id": i, "rank": i, "rank_change": 0,
+        "username": f"creator{i}", "prompt": "Uniswap swap explained", "category": "defi_education",
+        "caption": "", "hashtags": "#Uniswap", "status": "ready",
+        "video_url": f"https://example.supabase.co/storage/v1/object/public/videos/{i}.mp4",
+        "watermarked_url": None, "thumbnail_url": "", "created_at": "2025-10-14T12:00:00+00:00",
+        "duration_seconds": 12, "creators": {"username": f"creator{i}"},
+        "platform": "tiktok", "post_url": f"https://www.tiktok.com/@c/video/{i}",
+        "views": 1000 * i, "likes": 10 * i, "comments_count": i, "shares": i,
+        "total_views": 1000 * i, "total_videos": 3, "total_engagements": 12 * i
+    }
+
+
+async def fake_execute(query):
+    global db_calls
+    db_calls += 1
+    await asyncio.sleep(DB_LATENCY)
+    return FakeResult([_fake_row(i) for i in range(1, ROWS + 1)], ROWS)
+
+
+async def run(client: httpx.AsyncClient, path: str, total: int, concurrency: int, bust_cache: bool) -> list:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            params = {"_bench": i} if bust_cache else None
+            started = time.perf_counter()
+            response = await client.get(path, params=params)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies, time.perf_counter() - started
+
+
+async def main():
+    global db_calls
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    db.execute = fake_execute
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"📊 {total} requests/endpoint, concurrency {concurrency}, fake DB latency {DB_LATENCY * 1000:.0f} ms\n")
+        print(f"{'endpoint':<22}{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'db calls':>10}")
+
+        for path in ("/api/videos", "/api/stats", "/api/leaderboard"):
+            for mode, bust in (("uncached", True), ("cached", False)):
+                db_calls = 0
+                latencies, elapsed = await run(client, path, total, concurrency, bust)
+                latencies.sort()
+                print(
+                    f"{path:<22}{mode:<10}{total / elapsed:>10.0f}"
+                    f"{statistics.median(latencies) * 1000:>10.1f}"
+                    f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>10.1f}{db_calls:>10}"
+                )
+
+        # Conditional request round trip
+        first = await client.get("/api/videos")
+        second = await client.get("/api/videos", headers={"If-None-Match": first.headers["ETag"]})
+        print(f"\nETag revalidation: {second.status_code} ({len(second.content)} bytes vs {len(first.content)})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
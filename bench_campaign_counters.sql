@@ -0,0 +1,68 @@
+-- Benchmark: /api/stats queries vs the campaign_counters row at 1M posts
+-- Run on a LOCAL Postgres from the repo root (never against production):
+--
+--   createdb bench && psql -d bench -f bench_campaign_counters.sql
+--
+-- "payload bytes" approximates the JSON PostgREST sends back for each query
+-- (the old posts query shipped every post id just to len() it in Python).
+
+\set ON_ERROR_STOP on
+\timing off
+
+DROP SCHEMA IF EXISTS bench_campaign_counters CASCADE;
+CREATE SCHEMA bench_campaign_counters;
+SET search_path = bench_campaign_counters;
+
+CREATE TABLE creators (
+    id BIGSERIAL PRIMARY KEY,
+    tg_user_id BIGINT UNIQUE NOT NULL,
+    total_views BIGINT DEFAULT 0
+);
+CREATE TABLE videos (
+    id BIGSERIAL PRIMARY KEY,
+    tg_user_id BIGINT NOT NULL REFERENCES creators(tg_user_id),
+    status TEXT DEFAULT 'queued'
+);
+CREATE TABLE posts (
+    id BIGSERIAL PRIMARY KEY,
+    video_id BIGINT NOT NULL REFERENCES videos(id)
+);
+
+INSERT INTO creators (tg_user_id, total_views)
+SELECT g, (random() * 5000000)::BIGINT FROM generate_series(1, 50000) g;
+INSERT INTO videos (tg_user_id, status)
+SELECT 1 + (random() * 49999)::INT, CASE WHEN random() < 0.9 THEN 'ready' ELSE 'failed' END
+FROM generate_series(1, 250000);
+INSERT INTO posts (video_id)
+SELECT 1 + (random() * 249999)::INT FROM generate_series(1, 1000000);
+ANALYZE;
+
+-- Counters table, triggers and seed
+\i migrations/add_campaign_counters.sql
+ANALYZE;
+
+\timing on
+
+\echo '--- old /api/stats: 4 queries ---'
+SELECT COUNT(*) FROM videos WHERE status = 'ready';
+SELECT COUNT(*) FROM creators;
+SELECT total_views FROM creators ORDER BY total_views DESC LIMIT 1;
+SELECT COUNT(*) AS rows_shipped,
+       pg_size_pretty(SUM(octet_length(json_build_object('id', id)::TEXT) + 1)) AS payload_bytes
+FROM posts;
+
+\echo '--- new /api/stats: 1 row ---'
+SELECT * FROM campaign_counters WHERE id = 1;
+SELECT pg_size_pretty(octet_length(row_to_json(c)::TEXT)::BIGINT) AS payload_bytes
+FROM campaign_counters c WHERE id = 1;
+
+\echo '--- write overhead: 10k post inserts with the counter trigger ---'
+INSERT INTO posts (video_id) SELECT 1 + (random() * 249999)::INT FROM generate_series(1, 10000);
+
+\echo '--- consistency check (counters vs recount) ---'
+SELECT (SELECT total_posts FROM campaign_counters) = (SELECT COUNT(*) FROM posts) AS posts_ok,
+       (SELECT total_videos FROM campaign_counters) = (SELECT COUNT(*) FROM videos WHERE status = 'ready') AS videos_ok;
+
+\timing off
+RESET search_path;
+DROP SCHEMA bench_campaign_counters CASCADE;
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes uploaded across interrupted and repeated reprocess runs
+Simulates reprocess_videos.py over synthetic videos (a few of them
+byte-identical, like a retried job) with the local content-store
+backend. Run 1 crashes partway through an upload, run 2 completes, run 3
+is an accidental re-run. Compared with the previous behaviour (random or
+per-job filenames, whole-file upload every time, no existence check).
+Needs the normal .env so config.settings loads.
+
+Usage:
+    python bench_content_store.py [videos] [mb_per_video]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from utils import content_store
+from utils.content_store import ContentStore, LocalBackend
+
+MB = 1024 * 1024
+
+
+class Crash(Exception):
+    """Simulated process death"""
+
+
+def make_videos(count: int, size: int) -> list:
+    unique = [os.urandom(size) for _ in range(count - count // 5)]
+    # Every fifth video is a byte-identical copy (a retried or re-run job)
+    return unique + unique[:count // 5]
+
+
+async def legacy_run(videos: list, crash_after: float = None) -> int:
+    """Whole-file upload per video; a crash loses the file in flight"""
+    sent = 0
+    for video in videos:
+        if crash_after is not None and sent + len(video) > crash_after:
+            return sent + int(crash_after - sent)
+        sent += len(video)
+    return sent
+
+
+async def cas_run(store: ContentStore, videos: list, crash_after: float = None) -> int:
+    """Bytes the backend read for uploading (every part goes through _read_range)"""
+    read_range = content_store._read_range
+    sent = {"bytes": 0}
+
+    def counted_read(path, offset, length):
+        if crash_after is not None and sent["bytes"] + length > crash_after:
+            raise Crash()
+        sent["bytes"] += length
+        return read_range(path, offset, length)
+
+    content_store._read_range = counted_read
+    try:
+        for video in videos:
+            await store.put_bytes(video)
+    except Crash:
+        # Parts finished before the crash stay uploaded (and checkpointed)
+        pass
+    finally:
+        content_store._read_range = read_range
+    return sent["bytes"]
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    size = int(float(sys.argv[2]) * MB) if len(sys.argv) > 2 else 20 * MB
+    videos = make_videos(count, size)
+    total = sum(map(len, videos))
+    crash_at = total * 0.45
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = ContentStore(LocalBackend(os.path.join(workdir, "objects")), os.path.join(workdir, "state"))
+
+        print(f"📦 {count} videos × {size / MB:.0f} MB ({count // 5} duplicates), run 1 crashes at {crash_at / MB:.0f} MB\n")
+        print(f"{'run':<18}{'previous MB':>13}{'content store MB':>18}")
+
+        grand = {"legacy": 0, "cas": 0}
+        for label, crash in (("1 (crash)", crash_at), ("2 (complete)", None), ("3 (re-run)", None)):
+            legacy = await legacy_run(videos, crash)
+            started = time.perf_counter()
+            cas = await cas_run(store, videos, crash)
+            elapsed = time.perf_counter() - started
+            grand["legacy"] += legacy
+            grand["cas"] += cas
+            print(f"{label:<18}{legacy / MB:>13.0f}{cas / MB:>18.0f}   ({elapsed:.1f}s incl. hashing)")
+
+        print(f"{'total':<18}{grand['legacy'] / MB:>13.0f}{grand['cas'] / MB:>18.0f}")
+        print(f"\n{store.snapshot()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency of the create flow with stubbed services
+Limits, GPT-4 validation/caption, Supabase writes and Sora are replaced by
+sleeps with production-like latencies (scaled down by `scale`), then the
+old strictly sequential order is compared with the DAG flow in
+simple_flow. Needs the normal .env so config.settings loads.
+
+Usage:
+    python bench_create_flow.py [runs] [scale]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import simple_flow
+from agent.tools.sora2 import Sora2Generator
+from db.client import db
+
+SCALE = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+
+# Seconds at scale 1.0
+LATENCY = {
+    "limits": 0.25,      # creator + count + duplicate queries + prompt index
+    "validation": 1.5,   # GPT-4 round trip (cache/keyword tiers bypassed)
+    "db_write": 0.06,    # one PostgREST insert/update
+    "sora": 120.0,       # submit + poll + download/upload
+    "caption": 2.0,      # GPT-4 round trip
+}
+
+
+async def fake(step: str, result):
+    await asyncio.sleep(LATENCY[step] * SCALE)
+    return result
+
+
+async def fake_limits(tg_user_id, prompt=None):
+    return await fake("limits", {"can_create": True, "remaining": 19})
+
+
+async def fake_validation(prompt):
+    return await fake("validation", {"approved": True, "category": "defi_education"})
+
+
+async def fake_caption(prompt, category):
+    return await fake("caption", {"caption": "gm", "hashtags": "#DeFi"})
+
+
+async def fake_create_video(data):
+    return await fake("db_write", {"id": 1, **data})
+
+
+async def fake_update_video(video_id, data):
+    return await fake("db_write", {"id": video_id, **data})
+
+
+async def fake_generate(self, prompt, duration, category, tg_user_id=None, job_id=None, on_job_created=None):
+    return await fake("sora", {"success": True, "video_url": "https://example.com/v.mp4", "job_id": "job_1", "duration": duration})
+
+
+async def sequential(prompt: str) -> None:
+    """The old order: every step waits for the previous one"""
+    await fake_limits(1, prompt)
+    validation = await fake_validation(prompt)
+    video = await fake_create_video({"prompt": prompt, "category": validation["category"]})
+    await fake_generate(None, prompt, 15, validation["category"])
+    caption = await fake_caption(prompt, validation["category"])
+    await fake_update_video(video["id"], caption)
+
+
+async def dag(prompt: str) -> dict:
+    prepared = await simple_flow.prepare_video_simple(1, "bench", prompt)
+    return await simple_flow.process_video_job(prepared["video"], notify_user=False)
+
+
+async def measure(label: str, fn, runs: int) -> float:
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await fn("Stablecoins as digital anchors in stormy crypto seas")
+        latencies.append(time.perf_counter() - started)
+    median = statistics.median(latencies)
+    print(f"{label:<12}{median / SCALE:>12.2f} s{median * 1000:>14.1f} ms")
+    return median
+
+
+async def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    simple_flow.check_user_limits_simple = fake_limits
+    simple_flow.validate_content_simple = fake_validation
+    simple_flow.generate_caption_simple = fake_caption
+    simple_flow.get_prompt_index().add = lambda video: None
+    db.create_video = fake_create_video
+    db.update_video_by_id = fake_update_video
+    Sora2Generator.generate = fake_generate
+
+    print(f"⏱️ {runs} runs each, latencies scaled by {SCALE}\n")
+    print(f"{'flow':<12}{'production':>14}{'measured':>16}")
+    before = await measure("sequential", sequential, runs)
+    after = await measure("dag", dag, runs)
+    print(f"\n🏁 {(before - after) / SCALE:.2f} s saved per video ({(1 - after / before):.1%})")
+
+    result = await dag("Layer 2 scaling as express lanes")
+    print("\nPer-step timings (ms, scaled):")
+    for step, timing in result["timings"].items():
+        print(f"  {step:<10}{timing['status']:<10} start {timing['start_ms']:>8.1f}  took {timing['ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
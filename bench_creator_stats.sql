@@ -0,0 +1,95 @@
+-- Benchmark: per-creator Python-style recompute vs recalculate_creator_stats()
+-- Seeds 10k creators / 100k posts / 30k videos in a scratch schema on a LOCAL
+-- Postgres (never run against Supabase production):
+--
+--   createdb bench && psql -d bench -f bench_creator_stats.sql
+--
+-- Compare the \timing output of the "per-creator loop" block (what the old
+-- Database.recalculate_creator_stats did: 1 posts SELECT + 1 videos COUNT +
+-- 1 UPDATE per creator, before network round trips) against the single
+-- set-based calls.
+
+\set ON_ERROR_STOP on
+\timing off
+
+DROP SCHEMA IF EXISTS bench_creator_stats CASCADE;
+CREATE SCHEMA bench_creator_stats;
+SET search_path = bench_creator_stats;
+
+CREATE TABLE creators (
+    tg_user_id BIGINT PRIMARY KEY,
+    total_videos INT DEFAULT 0,
+    total_views BIGINT DEFAULT 0,
+    total_engagements BIGINT DEFAULT 0,
+    total_shares INTEGER DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE videos (
+    id BIGSERIAL PRIMARY KEY,
+    tg_user_id BIGINT NOT NULL REFERENCES creators(tg_user_id)
+);
+
+CREATE TABLE posts (
+    id BIGSERIAL PRIMARY KEY,
+    tg_user_id BIGINT NOT NULL REFERENCES creators(tg_user_id),
+    views INTEGER DEFAULT 0,
+    likes INTEGER DEFAULT 0,
+    comments_count INTEGER DEFAULT 0,
+    shares INTEGER DEFAULT 0
+);
+
+INSERT INTO creators (tg_user_id) SELECT g FROM generate_series(1, 10000) g;
+INSERT INTO videos (tg_user_id) SELECT 1 + (random() * 9999)::INT FROM generate_series(1, 30000);
+INSERT INTO posts (tg_user_id, views, likes, comments_count, shares)
+SELECT 1 + (random() * 9999)::INT,
+       (random() * 100000)::INT, (random() * 5000)::INT,
+       (random() * 500)::INT, (random() * 200)::INT
+FROM generate_series(1, 100000);
+
+CREATE INDEX ON videos(tg_user_id);
+CREATE INDEX ON posts(tg_user_id);
+ANALYZE;
+
+-- Function under test (same body as migrations/add_creator_stats_function.sql)
+\i migrations/add_creator_stats_function.sql
+
+\timing on
+
+\echo '--- per-creator loop (old path, 10k creators) ---'
+DO $$
+DECLARE
+    uid BIGINT;
+    v BIGINT; e BIGINT; s BIGINT; n INT;
+BEGIN
+    FOR uid IN SELECT tg_user_id FROM creators LOOP
+        SELECT COALESCE(SUM(views), 0),
+               COALESCE(SUM(likes + comments_count + shares), 0),
+               COALESCE(SUM(shares), 0)
+        INTO v, e, s FROM posts WHERE tg_user_id = uid;
+        SELECT COUNT(*) INTO n FROM videos WHERE tg_user_id = uid;
+        UPDATE creators SET total_views = v, total_engagements = e,
+               total_shares = s, total_videos = n
+        WHERE tg_user_id = uid;
+    END LOOP;
+END $$;
+
+UPDATE creators SET total_views = 0, total_engagements = 0, total_shares = 0, total_videos = 0;
+
+\echo '--- set-based: all creators ---'
+SELECT recalculate_creator_stats();
+
+\echo '--- set-based: all creators again (no-op, nothing changed) ---'
+SELECT recalculate_creator_stats();
+
+UPDATE posts SET views = views + 1 WHERE tg_user_id <= 500;
+
+\echo '--- set-based: 500 touched creators (typical metrics tick) ---'
+SELECT recalculate_creator_stats(ARRAY(SELECT g::BIGINT FROM generate_series(1, 500) g));
+
+\echo '--- set-based: single creator ---'
+SELECT recalculate_creator_stats(ARRAY[42]::BIGINT[]);
+
+\timing off
+RESET search_path;
+DROP SCHEMA bench_creator_stats CASCADE;
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Load test: Supabase queries inline on the event loop vs offloaded by Database.execute
+Drives concurrent Database.get_video calls (what /api/videos, webhooks and
+Telegram handlers do) through a stub client whose .execute() blocks for a
+PostgREST round trip, like supabase-py's. Two modes:
+  - inline:    query.execute() on the event loop (before Database.execute)
+  - offloaded: Database.execute, on the DB_MAX_WORKERS thread pool
+Reports throughput, latency, and event-loop lag measured by a 10 ms ticker
+(how long everything else - Telegram updates, health checks - would stall).
+Needs the normal .env so config.settings loads.
+
+Usage:
+    python bench_db_offload.py [requests] [concurrency] [db_latency_ms]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from config.settings import settings
+from db.client import db
+
+DB_LATENCY = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.040
+TICK = 0.010
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class SlowQuery:
+    """Chainable query whose execute() blocks for one round trip"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(DB_LATENCY)
+        return FakeResult([{"id": 1, "status": "ready", "video_url": "https://example.com/1.mp4"}])
+
+
+class SlowClient:
+    def table(self, name: str) -> SlowQuery:
+        return SlowQuery()
+
+
+async def inline_execute(query):
+    return query.execute()
+
+
+async def loop_lag(stop: asyncio.Event) -> list:
+    """Lateness of a periodic TICK timer while the load runs"""
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+    return lags
+
+
+async def run(total: int, concurrency: int) -> tuple:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        # Every request arrives at `started` (a burst), so latency includes queueing
+        # behind a blocked loop or a busy thread pool
+        async with semaphore:
+            await db.get_video(i)
+        latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(loop_lag(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return latencies, elapsed, await ticker
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    db.client = SlowClient()
+    offloaded_execute = db.execute
+
+    print(f"📊 {total} queries, concurrency {concurrency}, stub round trip {DB_LATENCY * 1000:.0f} ms, "
+          f"DB_MAX_WORKERS={settings.db_max_workers}\n")
+    print(f"{'mode':<11}{'queries/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'loop lag p95 ms':>17}{'max ms':>10}")
+
+    for mode, execute in (("inline", inline_execute), ("offloaded", offloaded_execute)):
+        db.execute = execute
+        latencies, elapsed, lags = await run(total, concurrency)
+        latencies.sort()
+        lags.sort()
+        lag_p95 = lags[int(len(lags) * 0.95) - 1] if len(lags) > 1 else (lags[0] if lags else elapsed)
+        print(
+            f"{mode:<11}{total / elapsed:>11.0f}{statistics.median(latencies) * 1000:>10.1f}"
+            f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>10.1f}"
+            f"{lag_p95 * 1000:>17.1f}{(max(lags) if lags else elapsed) * 1000:>10.1f}"
+        )
+
+    db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
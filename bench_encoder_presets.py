@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: watermark encode wall time and output size per encoder preset
+Encodes one synthetic 720x1280 clip (test pattern + grain, roughly as hard
+to compress as Sora footage) with the previous inline-scaled watermark and
+default x264 settings, then with the cached pre-scaled overlay under each
+ENCODER_PRESETS profile. Each encode runs alone on the FFmpeg pool with
+FFMPEG_THREADS_PER_JOB threads. Needs ffmpeg on PATH and the normal .env so
+config.settings loads.
+
+Usage:
+    python bench_encoder_presets.py [clip_seconds] [repeats]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from config.settings import settings
+from agent.tools.watermark import ENCODER_PRESETS, SORA_FRAME_SIZE, _build_ffmpeg_command, prepare_overlay
+from utils.ffmpeg_pool import FRAGMENTED_MP4, FFmpegPool
+
+
+async def encode(pool: FFmpegPool, clip: str, args: list) -> tuple:
+    async def count(stdout):
+        size = 0
+        async for chunk in stdout:
+            size += len(chunk)
+        return size
+
+    result = await pool.run(args, stdout_consumer=count)
+    return result["seconds"], result["output"]
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 12
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    pool = FFmpegPool(workers=1, threads_per_job=settings.ffmpeg_threads_per_job)
+    width, height = SORA_FRAME_SIZE
+
+    with tempfile.TemporaryDirectory() as workdir:
+        settings.watermark_cache_dir = os.path.join(workdir, "overlays")
+        clip = os.path.join(workdir, "clip.mp4")
+        logo = Path(workdir) / "logo.png"
+        await pool.run(["-f", "lavfi", "-i", "color=c=white:s=512x512", "-frames:v", "1", str(logo)])
+        await pool.run([
+            "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=30:duration={seconds}",
+            "-f", "lavfi", "-i", f"sine=duration={seconds}",
+            "-vf", "noise=alls=12:allf=t", "-c:v", "libx264", "-crf", "16", "-c:a", "aac", clip
+        ])
+
+        started = time.perf_counter()
+        overlay = await prepare_overlay(logo, width, settings.watermark_opacity)
+        first = time.perf_counter() - started
+        started = time.perf_counter()
+        await prepare_overlay(logo, width, settings.watermark_opacity)
+        cached = time.perf_counter() - started
+
+        print(f"🎞️ {seconds:.0f}s {width}x{height} clip ({os.path.getsize(clip) / 1e6:.1f} MB), "
+              f"{settings.ffmpeg_threads_per_job} threads, best of {repeats}")
+        print(f"🖼️ Overlay render {first * 1000:.0f} ms, cached lookup {cached * 1000:.2f} ms\n")
+        print(f"{'variant':<22}{'encode s':>10}{'x realtime':>12}{'size MB':>10}")
+
+        inline = [
+            "-i", clip, "-i", str(logo),
+            "-filter_complex",
+            f"[1:v]scale={round(width * 0.15)}:-1,format=rgba,colorchannelmixer=aa={settings.watermark_opacity}[wm];"
+            "[0:v][wm]overlay=main_w-overlay_w-20:main_h-overlay_h-20",
+            "-c:a", "copy", "-f", "mp4", "-movflags", FRAGMENTED_MP4, "pipe:1"
+        ]
+        variants = [("inline (previous)", inline)]
+        for preset in ENCODER_PRESETS:
+            variants.append((f"overlay + {preset}", await _build_ffmpeg_command(clip, "pipe:1", str(overlay), preset)))
+
+        for label, args in variants:
+            runs = [await encode(pool, clip, args) for _ in range(repeats)]
+            wall = min(t for t, _ in runs)
+            size = statistics.mean(s for _, s in runs)
+            print(f"{label:<22}{wall:>10.2f}{seconds / wall:>12.1f}{size / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
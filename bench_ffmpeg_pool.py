@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: watermark throughput on synthetic clips
+Generates N 720x1280 test clips with FFmpeg, then watermarks all of them
+at once twice:
+  - unbounded: the previous add_watermark path (temp file in, one shell
+    ffmpeg per clip with no limit, output file read back into memory)
+  - pool: FFmpegPool sized to the cores, clip piped to stdin, fragmented
+    MP4 read from stdout
+Reports wall time, clips/minute and per-clip latency. Needs ffmpeg on
+PATH and the normal .env so config.settings loads.
+
+Usage:
+    python bench_ffmpeg_pool.py [clips] [seconds_per_clip] [threads_per_job]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from utils.ffmpeg_pool import FRAGMENTED_MP4, PIPE_CHUNK_SIZE, FFmpegPool
+
+# The watermark filter add_watermark used before overlays were pre-rendered
+INLINE_WATERMARK_FILTER = "scale=iw*0.15:-1,format=rgba,colorchannelmixer=aa=0.7"
+
+
+async def ffmpeg_bytes(*args: str) -> bytes:
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", *args,
+        stdout=asyncio.subprocess.PIPE
+    )
+    data, _ = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed generating fixtures: {args}")
+    return data
+
+
+async def make_clip(seconds: float, seed: int) -> bytes:
+    return await ffmpeg_bytes(
+        "-f", "lavfi", "-i", f"testsrc2=size=720x1280:rate=30:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency={220 + seed * 20}:duration={seconds}",
+        "-c:v", "libx264", "-preset", "veryfast", "-c:a", "aac",
+        "-f", "mp4", "-movflags", FRAGMENTED_MP4, "pipe:1"
+    )
+
+
+async def unbounded(clip: bytes, logo: str, workdir: str) -> int:
+    """The previous add_watermark: temp file -> shell ffmpeg -> read output back"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4", dir=workdir) as f:
+        f.write(clip)
+        input_path = f.name
+    output_path = input_path.replace(".mp4", "_watermarked.mp4")
+    cmd = (
+        f'ffmpeg -i "{input_path}" -i "{logo}" '
+        f'-filter_complex "[1:v]{INLINE_WATERMARK_FILTER}[wm];'
+        f'[0:v][wm]overlay=main_w-overlay_w-20:main_h-overlay_h-20" '
+        f'-c:a copy -y "{output_path}"'
+    )
+    process = await asyncio.create_subprocess_shell(cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    await process.communicate()
+    with open(output_path, "rb") as f:
+        size = len(f.read())
+    os.unlink(input_path)
+    os.unlink(output_path)
+    return size
+
+
+async def pooled(pool: FFmpegPool, clip: bytes, logo: str) -> int:
+    async def chunks():
+        for i in range(0, len(clip), PIPE_CHUNK_SIZE):
+            yield clip[i:i + PIPE_CHUNK_SIZE]
+
+    async def count(stdout):
+        size = 0
+        async for chunk in stdout:
+            size += len(chunk)
+        return size
+
+    # Same filter and encoder defaults as the unbounded path, so only the I/O and scheduling differ
+    args = [
+        "-i", "pipe:0", "-i", logo,
+        "-filter_complex", f"[1:v]{INLINE_WATERMARK_FILTER}[wm];[0:v][wm]overlay=main_w-overlay_w-20:main_h-overlay_h-20",
+        "-c:a", "copy", "-f", "mp4", "-movflags", FRAGMENTED_MP4, "pipe:1"
+    ]
+    result = await pool.run(args, stdin=chunks(), stdout_consumer=count)
+    return result["output"]
+
+
+async def measure(label: str, jobs) -> None:
+    latencies = []
+
+    async def timed(job):
+        started = time.perf_counter()
+        size = await job
+        latencies.append(time.perf_counter() - started)
+        return size
+
+    started = time.perf_counter()
+    sizes = await asyncio.gather(*(timed(job) for job in jobs))
+    wall = time.perf_counter() - started
+    print(
+        f"{label:<12}{wall:>9.1f}{len(sizes) / wall * 60:>12.1f}"
+        f"{statistics.mean(latencies):>11.1f}{max(latencies):>10.1f}{statistics.mean(sizes) / 1e6:>10.2f}"
+    )
+
+
+async def main():
+    clips = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    cores = os.cpu_count() or 1
+    workers = max(cores // threads, 1)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        logo = os.path.join(workdir, "logo.png")
+        with open(logo, "wb") as f:
+            f.write(await ffmpeg_bytes("-f", "lavfi", "-i", "color=c=white:s=400x400", "-frames:v", "1", "-f", "image2", "pipe:1"))
+        fixtures = [await make_clip(seconds, i) for i in range(clips)]
+
+        print(f"🎞️ {clips} clips of {seconds:.0f}s 720x1280 ({statistics.mean(map(len, fixtures)) / 1e6:.1f} MB), "
+              f"{cores} cores, pool {workers}×{threads} threads\n")
+        print(f"{'strategy':<12}{'wall s':>9}{'clips/min':>12}{'mean s':>11}{'max s':>10}{'out MB':>10}")
+
+        await measure("unbounded", [unbounded(clip, logo, workdir) for clip in fixtures])
+        pool = FFmpegPool(workers=workers, threads_per_job=threads, max_queue=clips)
+        await measure("pool", [pooled(pool, clip, logo) for clip in fixtures])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
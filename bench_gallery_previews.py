@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: gallery first-paint bytes with and without rendered previews
+Encodes one synthetic 720x1280 clip (test pattern + grain, roughly as hard
+to compress as Sora footage), renders its poster, preview loop and sprite
+sheet with agent/tools/previews.py into a temporary local content store,
+then compares what a gallery page of N cards downloads before it can paint:
+  - before: every card loads the MP4 (no thumbnail exists)
+  - after:  every card loads its poster; the preview loop / sprite sheet
+            only on hover
+Reports render time and size per asset and the page's time to first paint
+at a given bandwidth. Needs ffmpeg on PATH and the normal .env so
+config.settings loads.
+
+Usage:
+    python bench_gallery_previews.py [clip_seconds] [cards_per_page] [mbit_per_second]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from config.settings import settings
+from agent.tools.previews import render_poster, render_preview, render_sprite
+from agent.tools.watermark import SORA_FRAME_SIZE
+from utils.ffmpeg_pool import FFmpegPool
+import utils.content_store as content_store
+import utils.ffmpeg_pool as ffmpeg_pool
+
+
+async def timed(render) -> tuple:
+    started = time.perf_counter()
+    stored = await render
+    return time.perf_counter() - started, stored
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 12
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    mbit = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    width, height = SORA_FRAME_SIZE
+
+    with tempfile.TemporaryDirectory() as workdir:
+        settings.content_store_backend = "local"
+        settings.content_store_local_dir = os.path.join(workdir, "content")
+        settings.content_store_state_dir = os.path.join(workdir, "state")
+        content_store._content_store = None
+        ffmpeg_pool._ffmpeg_pool = FFmpegPool(workers=1, threads_per_job=settings.ffmpeg_threads_per_job)
+
+        clip = os.path.join(workdir, "clip.mp4")
+        await ffmpeg_pool._ffmpeg_pool.run([
+            "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=30:duration={seconds}",
+            "-f", "lavfi", "-i", f"sine=duration={seconds}",
+            "-vf", "noise=alls=12:allf=t", "-c:v", "libx264", "-crf", "23", "-c:a", "aac",
+            "-movflags", "+faststart", clip
+        ])
+        video_bytes = os.path.getsize(clip)
+
+        poster_s, poster = await timed(render_poster(clip, seconds))
+        preview_s, preview = await timed(render_preview(clip, seconds))
+        sprite_s, (sprite, layout) = await timed(render_sprite(clip, seconds))
+
+        print(f"🎞️ {seconds:.0f}s {width}x{height} clip, {settings.ffmpeg_threads_per_job} threads per render\n")
+        print(f"{'asset':<16}{'render s':>10}{'size KB':>10}")
+        print(f"{'video (MP4)':<16}{'-':>10}{video_bytes / 1024:>10.0f}")
+        for label, took, stored in (("poster", poster_s, poster), ("preview loop", preview_s, preview), ("sprite sheet", sprite_s, sprite)):
+            print(f"{label:<16}{took:>10.2f}{stored['size'] / 1024:>10.1f}")
+        print(f"  sprite: {layout['columns']}x{layout['rows']} tiles of {layout['tile_width']}x{layout['tile_height']}, "
+              f"one every {layout['interval_seconds']}s")
+
+        bytes_per_second = mbit * 1e6 / 8
+        before = cards * video_bytes
+        after = cards * poster["size"]
+        print(f"\n📄 Gallery page of {cards} cards at {mbit:.0f} Mbit/s")
+        print(f"{'strategy':<16}{'first paint MB':>16}{'est. paint s':>14}")
+        print(f"{'full MP4s':<16}{before / 1e6:>16.2f}{before / bytes_per_second:>14.1f}")
+        print(f"{'posters':<16}{after / 1e6:>16.2f}{after / bytes_per_second:>14.2f}")
+        print(f"\n🖱️ Hover adds {preview['size'] / 1024:.0f} KB (preview) or {sprite['size'] / 1024:.0f} KB (sprite) per card; "
+              f"first paint is {before / max(after, 1):.0f}x smaller")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
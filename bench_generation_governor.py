@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Sora generation scheduling with simulated job durations
+1. Batch makespan: the old generate_batch (gather in fixed groups of 5)
+   against the sliding-window rewrite, same random job durations.
+2. Fairness: one creator queues a burst of videos, a few others queue
+   two each shortly after; plain FIFO semaphore against the governor.
+Sora is simulated with sleeps (1 simulated second = SCALE real seconds),
+so no API calls are made. Needs the normal .env so config.settings loads.
+
+Usage:
+    python bench_generation_governor.py [jobs] [seed]
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from agent.tools import sora2
+from agent.tools.generation_governor import GenerationGovernor
+
+SCALE = 0.01
+WINDOW = 5
+
+
+def durations(n: int, rng: random.Random) -> list:
+    """Sora job durations in simulated seconds (median ~110s, long tail)"""
+    return [min(max(rng.lognormvariate(4.7, 0.35), 50), 400) for _ in range(n)]
+
+
+async def old_generate_batch(requests: list, generate) -> list:
+    """The previous implementation: fixed groups of 5, each waits for its slowest job"""
+    tasks = [generate(req) for req in requests]
+    results = []
+    for i in range(0, len(tasks), WINDOW):
+        results.extend(await asyncio.gather(*tasks[i:i + WINDOW], return_exceptions=True))
+    return results
+
+
+async def bench_batch(jobs: int, rng: random.Random) -> None:
+    times = durations(jobs, rng)
+    requests = [{"prompt": str(i), "duration": 12, "category": "defi_education", "seconds": s} for i, s in enumerate(times)]
+    by_prompt = {req["prompt"]: req["seconds"] for req in requests}
+
+    async def fake_generate(self, prompt, duration, category, **kwargs):
+        await asyncio.sleep(by_prompt[prompt] * SCALE)
+        return {"success": True, "job_id": prompt}
+
+    original = sora2.Sora2Generator.generate
+    sora2.Sora2Generator.generate = fake_generate
+    try:
+        print(f"📦 Batch of {jobs} jobs, window {WINDOW}, total work {sum(times):.0f}s "
+              f"(ideal makespan ≥ {max(sum(times) / WINDOW, max(times)):.0f}s)\n")
+        print(f"{'strategy':<16}{'makespan s':>12}{'in order':>10}")
+
+        started = time.perf_counter()
+        results = await old_generate_batch(requests, lambda req: fake_generate(None, req["prompt"], 12, ""))
+        elapsed = (time.perf_counter() - started) / SCALE
+        print(f"{'fixed groups':<16}{elapsed:>12.0f}{str([r['job_id'] for r in results] == list(by_prompt)):>10}")
+
+        started = time.perf_counter()
+        results = await sora2.BatchSora2Generator().generate_batch(requests, window=WINDOW)
+        elapsed = (time.perf_counter() - started) / SCALE
+        print(f"{'sliding window':<16}{elapsed:>12.0f}{str([r['job_id'] for r in results] == list(by_prompt)):>10}")
+    finally:
+        sora2.Sora2Generator.generate = original
+
+
+async def bench_fairness(heavy_jobs: int, rng: random.Random) -> None:
+    light_users, light_jobs, cap = 4, 2, 4
+    submissions = [("heavy", 0.0, s) for s in durations(heavy_jobs, rng)]
+    for u in range(light_users):
+        submissions += [(f"light{u}", 5.0 + u, s) for s in durations(light_jobs, rng)]
+
+    print(f"\n⚖️ 1 creator × {heavy_jobs} jobs at t=0, {light_users} creators × {light_jobs} jobs at t=5-8s, "
+          f"{cap} concurrent\n")
+    print(f"{'scheduler':<12}{'light mean':>12}{'light max':>11}{'heavy mean':>12}{'makespan':>10}{'spent $':>9}")
+
+    for label in ("fifo", "governor"):
+        semaphore = asyncio.Semaphore(cap)
+        governor = GenerationGovernor(max_concurrent=cap, cost_per_video=4.0)
+        latencies = {"heavy": [], "light": []}
+        started = time.perf_counter()
+
+        async def one(user: str, at: float, seconds: float):
+            await asyncio.sleep(at * SCALE)
+            submitted = time.perf_counter()
+            slot = semaphore if label == "fifo" else governor.slot(user)
+            async with slot:
+                await asyncio.sleep(seconds * SCALE)
+            latencies["heavy" if user == "heavy" else "light"].append((time.perf_counter() - submitted) / SCALE)
+
+        await asyncio.gather(*(one(*s) for s in submissions))
+        makespan = (time.perf_counter() - started) / SCALE
+        spent = governor.stats["spent_usd"] if label == "governor" else len(submissions) * 4.0
+        print(
+            f"{label:<12}{statistics.mean(latencies['light']):>12.0f}{max(latencies['light']):>11.0f}"
+            f"{statistics.mean(latencies['heavy']):>12.0f}{makespan:>10.0f}{spent:>9.0f}"
+        )
+
+
+async def main():
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    await bench_batch(jobs, random.Random(seed))
+    await bench_fairness(jobs // 2, random.Random(seed))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
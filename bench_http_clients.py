@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: new connections and per-call latency, per-call httpx clients vs get_http_client
+Runs a local keep-alive HTTP/1.1 server that counts accepted connections and
+requests. Each request costs one simulated round trip; each NEW connection
+first costs HANDSHAKE_RTTS more (TCP + TLS 1.2 to OpenAI/Telegram is about 3
+round trips; plain localhost has none, so it's simulated). The same calls
+are made two ways:
+  - per-call: `async with httpx.AsyncClient() as client` around every call
+    (what the Sora, Telegram, storage and scraper code did before)
+  - shared:   the pooled client from utils.http_clients.get_http_client
+both sequentially (a polling loop) and as concurrent bursts.
+Needs only httpx (utils.http_clients does not load settings).
+
+Usage:
+    python bench_http_clients.py [calls] [rtt_ms] [burst]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from utils.http_clients import close_http_clients, get_http_client
+
+RTT = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.030
+HANDSHAKE_RTTS = 3
+
+
+class CountingServer:
+    """Minimal keep-alive HTTP/1.1 server with connection/request counters"""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(RTT * HANDSHAKE_RTTS)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                self.requests += 1
+                await asyncio.sleep(RTT)
+                body = b'{"status":"in_progress","progress":42}'
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+                if b"connection: close" in head.lower():
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    def reset(self) -> None:
+        self.connections = 0
+        self.requests = 0
+
+
+async def per_call(url: str) -> None:
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        (await client.get(url)).raise_for_status()
+
+
+async def shared(url: str) -> None:
+    (await get_http_client("default").get(url)).raise_for_status()
+
+
+async def measure(server: CountingServer, label: str, call, url: str, calls: int, burst: int) -> None:
+    latencies = []
+
+    async def one():
+        started = time.perf_counter()
+        await call(url)
+        latencies.append(time.perf_counter() - started)
+
+    server.reset()
+    started = time.perf_counter()
+    for i in range(0, calls, burst):
+        await asyncio.gather(*(one() for _ in range(min(burst, calls - i))))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(
+        f"{label:<22}{server.connections:>8}{server.requests:>10}"
+        f"{statistics.median(latencies) * 1000:>10.1f}{latencies[int(len(latencies) * 0.95) - 1] * 1000:>10.1f}"
+        f"{calls / elapsed:>10.1f}"
+    )
+
+
+async def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    burst = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    server = CountingServer()
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{listener.sockets[0].getsockname()[1]}/v1/videos/video_bench"
+
+    print(f"📡 {calls} calls, simulated RTT {RTT * 1000:.0f} ms (+{HANDSHAKE_RTTS} RTT per new connection)\n")
+    print(f"{'client':<22}{'conns':>8}{'requests':>10}{'p50 ms':>10}{'p95 ms':>10}{'calls/s':>10}")
+    async with listener:
+        await measure(server, "per-call, sequential", per_call, url, calls, 1)
+        await measure(server, "shared, sequential", shared, url, calls, 1)
+        await measure(server, f"per-call, bursts of {burst}", per_call, url, calls, burst)
+        await measure(server, f"shared, bursts of {burst}", shared, url, calls, burst)
+        await close_http_clients()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
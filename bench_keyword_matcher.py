@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: keyword scan cost as the moderation lists grow
+Compares the old per-keyword `in` loop (banned check + nested category
+loop), one big regex alternation, and the Aho-Corasick KeywordMatcher
+on the same prompts. Needs the normal .env so config.settings loads.
+
+Usage:
+    python bench_keyword_matcher.py [prompts]
+"""
+import random
+import re
+import string
+import sys
+import time
+
+from agent.tools.content_validator import APPROVED_CATEGORIES, BANNED_KEYWORDS
+from agent.tools.tiered_validator import KeywordMatcher, normalize_prompt
+
+SIZES = (50, 500, 5_000, 20_000)
+
+
+def synthetic_terms(rng: random.Random, count: int) -> list:
+    """Real lists padded with made-up one/two-word terms"""
+    terms = list(BANNED_KEYWORDS)
+    while len(terms) < count:
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+                 for _ in range(rng.randint(1, 2))]
+        terms.append(" ".join(words))
+    return terms
+
+
+def naive_scan(prompt: str, banned: list, categories: dict) -> tuple:
+    """What ContentValidator did before: substring checks, one keyword at a time"""
+    prompt_lower = prompt.lower()
+    hits = [b for b in banned if b in prompt_lower]
+    scores = {c: sum(1 for k in data["keywords"] if k in prompt_lower) for c, data in categories.items()}
+    return hits, scores
+
+
+def timed(fn, prompts: list) -> float:
+    started = time.perf_counter()
+    for prompt in prompts:
+        fn(prompt)
+    return (time.perf_counter() - started) / len(prompts)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    rng = random.Random(42)
+
+    examples = [e for category in APPROVED_CATEGORIES for e in (
+        "Futuristic animation of gasless swaps as frictionless portals, cyberpunk aesthetic",
+        "Grandmother learning DeFi for the first time in a Mexican mercado, heartwarming",
+        "How a swap works: animated journey of tokens through layer 2 bridges, educational",
+        "ETH to the moon, 100x lambo casino night",
+    )]
+    prompts = [rng.choice(examples) for _ in range(total)]
+
+    print(f"🔤 {total} prompts (~{sum(map(len, prompts)) // total} chars each)\n")
+    print(f"{'keywords':>10}{'build ms':>10}{'naive µs':>12}{'regex µs':>12}{'aho µs':>12}{'speedup':>10}")
+
+    for size in SIZES:
+        banned = synthetic_terms(rng, size)
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher(banned, {c: d["keywords"] for c, d in APPROVED_CATEGORIES.items()})
+        build_ms = (time.perf_counter() - started) * 1000
+
+        alternatives = "|".join(re.escape(t) for t in sorted(set(banned), key=len, reverse=True))
+        regex = re.compile(rf"(?<![a-z0-9])(?:{alternatives})(?![a-z0-9])")
+
+        naive = timed(lambda p: naive_scan(p, banned, APPROVED_CATEGORIES), prompts)
+        alternation = timed(lambda p: regex.findall(normalize_prompt(p)), prompts)
+        aho = timed(lambda p: matcher.scan(normalize_prompt(p)), prompts)
+
+        print(
+            f"{size:>10,}{build_ms:>10.1f}{naive * 1e6:>12.1f}{alternation * 1e6:>12.1f}"
+            f"{aho * 1e6:>12.1f}{naive / aho:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: in-process RankIndex vs re-sorting on every request
+The re-sort stands in for today's `ORDER BY total_views DESC` (top-N) and
+"count creators with more views" (my rank) queries, minus the PostgREST
+round trip they also pay.
+
+Usage:
+    python bench_leaderboard.py [creators] [queries]
+"""
+import random
+import sys
+import time
+
+from utils.ranking import RankIndex
+
+
+def timed(label: str, fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{label:<42} {per_call * 1e6:>12.1f} µs/op")
+    return per_call
+
+
+def main():
+    creators = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+
+    random.seed(42)
+    scores = {uid: random.randint(0, 5_000_000) for uid in range(1, creators + 1)}
+    uids = list(scores)
+
+    print(f"📊 {creators:,} creators, {queries:,} queries per measurement\n")
+
+    started = time.perf_counter()
+    index = RankIndex()
+    index.load(scores)
+    print(f"{'RankIndex.load':<42} {(time.perf_counter() - started) * 1e3:>12.1f} ms\n")
+
+    # Baseline: what ORDER BY does for every request
+    base_queries = max(queries // 100, 5)
+    order_by_top = timed(
+        "top 10 via full sort (ORDER BY)",
+        lambda: sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:10],
+        base_queries
+    )
+
+    def rank_by_scan():
+        uid = random.choice(uids)
+        score = scores[uid]
+        return 1 + sum(1 for u, s in scores.items() if s > score or (s == score and u < uid))
+
+    order_by_rank = timed("my rank via full scan (COUNT(*) WHERE >)", rank_by_scan, base_queries)
+
+    print()
+    index_top = timed("top 10 via RankIndex", lambda: index.top(10), queries)
+    index_rank = timed("my rank via RankIndex", lambda: index.rank_of(random.choice(uids)), queries)
+
+    def bump():
+        uid = random.choice(uids)
+        scores[uid] += random.randint(0, 10_000)
+        index.update(uid, scores[uid])
+
+    index_update = timed("incremental update (views changed)", bump, queries)
+
+    # Sanity check: index agrees with a full sort
+    expected = [uid for uid, _ in sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:10]]
+    assert [uid for _, uid, _ in index.top(10)] == expected, "RankIndex order diverged"
+
+    print(f"\n🏆 top-N speedup:   {order_by_top / index_top:,.0f}x")
+    print(f"🏆 my-rank speedup: {order_by_rank / index_rank:,.0f}x")
+    print(f"🏆 update cost:     {index_update * 1e6:.1f} µs per changed creator")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: metrics refresh throughput (posts/minute), serial loop vs MetricsUpdater
+The shared "scrapers" HTTP client is pointed at fake_social_api in-process
+(httpx ASGI transport, no server), so the real scrapers parse real-shaped
+TikTok/Instagram pages and the fake's rate limit answers 429s. The same
+posts are refreshed twice:
+  - serial:     the previous update_all_metrics loop (scrape, recompute the
+                creator, sleep 2s, next post)
+  - concurrent: MetricsUpdater._refresh_posts (worker pool, per-platform
+                token buckets, 429 backoff, one creator recompute at the end)
+Database writes go to an in-memory stub that counts them. Reports posts
+updated/failed, 429s seen, creator recomputes, wall time and posts/minute.
+Needs the normal .env so config.settings loads.
+
+Usage:
+    FAKE_SOCIAL_RATE_TIKTOK=1.5 python bench_metrics_refresh.py [posts]
+"""
+import asyncio
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+import fake_social_api
+import utils.http_clients as http_clients
+from config.settings import settings
+from scheduler.metrics_updater import MetricsUpdater
+from utils.social_scrapers_v2 import scrape_social_metrics
+
+
+class NullQuery:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+class FakeDB:
+    """Stands in for db.client.Database: counts writes, stores nothing"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.client = self
+
+    def table(self, name: str) -> NullQuery:
+        return NullQuery()
+
+    async def execute(self, query):
+        self.calls["execute"] += 1
+
+    async def update_post_metrics(self, post_id, metrics):
+        self.calls["update_post_metrics"] += 1
+
+    async def update_post_tracking(self, post_id, next_metrics_at=None, views_per_hour=None):
+        self.calls["update_post_tracking"] += 1
+
+    async def recalculate_creator_stats(self, tg_user_id):
+        self.calls["creator_recomputes"] += 1
+
+    async def recalculate_creators_stats(self, tg_user_ids=None):
+        self.calls["creator_recomputes"] += 1
+        return len(tg_user_ids or [])
+
+
+def make_posts(count: int) -> list:
+    posts = []
+    for i in range(1, count + 1):
+        if i % 2:
+            platform, url = "tiktok", f"https://www.tiktok.com/@creator{i % 7}/video/{7100000000000000000 + i}"
+        else:
+            platform, url = "instagram", f"https://www.instagram.com/reel/Cbench{i:04d}/"
+        posts.append({
+            "id": i, "post_url": url, "platform": platform, "tg_user_id": 1000 + i % 7, "video_id": i,
+            "submitted_at": "2026-10-16T12:00:00+00:00", "views": 0, "last_metrics_sync": None
+        })
+    return posts
+
+
+async def serial_refresh(db: FakeDB, posts: list) -> dict:
+    """The previous update_all_metrics loop"""
+    stats = {"updated": 0, "failed": 0, "rate_limited": 0}
+    for post in posts:
+        metrics = await scrape_social_metrics(post["post_url"], post["platform"])
+        if metrics.get("success"):
+            await db.update_post_metrics(post["id"], metrics)
+            await db.recalculate_creator_stats(post["tg_user_id"])
+            stats["updated"] += 1
+        else:
+            await db.execute(db.client.table("posts").update({"metrics_fetch_error": metrics.get("error")}))
+            stats["failed"] += 1
+        await asyncio.sleep(2)
+    return stats
+
+
+def reset_fake() -> None:
+    for key in fake_social_api.stats:
+        fake_social_api.stats[key] = 0
+    for bucket in fake_social_api._buckets.values():
+        bucket[:] = [2.0, time.monotonic()]
+
+
+async def run(label: str, refresh, db: FakeDB, posts: list) -> None:
+    reset_fake()
+    started = time.perf_counter()
+    stats = await refresh(posts)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<12}{stats['updated']:>9}{stats['failed']:>8}{fake_social_api.stats['throttled']:>7}"
+        f"{db.calls['creator_recomputes']:>11}{elapsed:>9.1f}{stats['updated'] / elapsed * 60:>11.1f}"
+    )
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    posts = make_posts(count)
+    http_clients._clients["scrapers"] = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=fake_social_api.app),
+        follow_redirects=True,
+        timeout=30.0
+    )
+
+    print(
+        f"📈 {count} posts ({(count + 1) // 2} TikTok, {count // 2} Instagram), fake latency {fake_social_api.LATENCY * 1000:.0f} ms, "
+        f"fake limits {fake_social_api.RATES} req/s, client limits tiktok={settings.metrics_rate_tiktok} "
+        f"instagram={settings.metrics_rate_instagram} posts/s, concurrency {settings.metrics_concurrency}\n"
+    )
+    print(f"{'mode':<12}{'updated':>9}{'failed':>8}{'429s':>7}{'recomputes':>11}{'wall s':>9}{'posts/min':>11}")
+
+    serial_db = FakeDB()
+    await run("serial", lambda p: serial_refresh(serial_db, p), serial_db, posts)
+
+    updater = MetricsUpdater()
+    updater.db = FakeDB()
+    await run("concurrent", updater._refresh_posts, updater.db, posts)
+
+    await http_clients.close_http_clients()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
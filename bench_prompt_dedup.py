@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MinHash near-duplicate lookups over recent prompts
+Builds an index of synthetic video prompts, then measures lookup latency
+for fresh prompts (misses) and reworded copies of indexed ones (hits),
+and checks that the reworded copies are actually found. First runs
+check_user_limits_simple against a stubbed db and exits 1 unless a
+reworded prompt is blocked (needs the normal .env so config.settings loads).
+
+Usage:
+    python bench_prompt_dedup.py [prompts] [queries]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from utils.minhash import MinHashIndex
+
+# A creator's earlier prompt and their reworded resubmission; other creators
+# submitted the reworded text verbatim, so they outrank the creator's own copy
+OWN_PROMPT = "cinematic video of a cat explaining gas fees on the moon with dramatic lighting tonight"
+REWORDED_PROMPT = "Cinematic video of the cat explaining gas fees on the moon, dramatic lighting!!"
+CROWD = 30
+
+SUBJECTS = ["cat", "dog", "robot", "astronaut", "trader", "wizard", "llama", "panda", "dragon", "developer",
+            "gato", "perro", "abuela", "pirata", "ninja", "unicornio", "chef", "vaquero", "fantasma", "zorro"]
+ACTIONS = ["explaining", "swapping", "staking", "bridging", "minting", "lending", "borrowing", "farming",
+           "explicando", "comprando", "vendiendo", "construyendo", "aprendiendo", "defendiendo"]
+TOPICS = ["ETH", "gas fees", "layer 2 rollups", "liquidity pools", "impermanent loss", "smart contracts",
+          "wallets", "seed phrases", "NFTs", "stablecoins", "DAOs", "validators", "MEV", "restaking",
+          "account abstraction", "zk proofs", "oracles", "flash loans", "airdrops", "governance"]
+PLACES = ["on the moon", "in a neon city", "underwater", "in a medieval castle", "at a beach", "in space",
+          "en una cocina", "en el desierto", "en un tren", "en la selva", "in a cyberpunk alley", "at a concert"]
+STYLES = ["cinematic", "cartoon", "anime", "pixel art", "claymation", "noir", "vaporwave", "documentary"]
+EXTRAS = ["with dramatic lighting", "in slow motion", "with subtitles", "at sunset", "with a plot twist",
+          "happily", "angrily", "con musica epica", "de noche", "with confetti"]
+
+
+def make_prompt(rng: random.Random) -> str:
+    words = [
+        rng.choice(STYLES), "video of a", rng.choice(SUBJECTS), rng.choice(ACTIONS),
+        rng.choice(TOPICS), rng.choice(PLACES), rng.choice(EXTRAS), str(rng.randint(1, 10_000))
+    ]
+    return " ".join(words)
+
+
+def reword(prompt: str) -> str:
+    """Same video, different surface: case, punctuation, plural, filler word"""
+    return f"A {prompt.upper().replace(' OF A ', ' OF THE ')}s!!"
+
+
+def timed(label: str, fn, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    per_call = (time.perf_counter() - started) / len(items)
+    print(f"{label:<34} {per_call * 1e6:>10.1f} µs/op")
+    return per_call
+
+
+class NullQuery:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+class StubResult:
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data)
+
+
+class StubDatabase:
+    """Just enough of db.client.Database for check_user_limits_simple + PromptIndex"""
+
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+        self.client = self
+
+    def table(self, name):
+        return NullQuery()
+
+    async def execute(self, query):
+        # The exact-prompt lookup: no identical prompt, only a reworded one
+        return StubResult([])
+
+    async def get_creator(self, tg_user_id):
+        return {"tg_user_id": tg_user_id}
+
+    async def count_videos_today(self, tg_user_id):
+        return 1
+
+    async def get_recent_prompts(self, since):
+        return list(self.rows.values())
+
+    async def get_videos_by_ids(self, video_ids):
+        return [dict(self.rows[i]) for i in video_ids if i in self.rows]
+
+
+async def check_blocking() -> bool:
+    """Regression check: a reworded prompt is refused even behind a crowd of other creators' matches"""
+    import simple_flow
+    import db.prompt_index as prompt_index
+
+    now = time.time()
+    rows = [{"id": 1, "tg_user_id": 7, "prompt": OWN_PROMPT, "status": "ready", "created_at": now - 3600, "public_url": None}]
+    rows += [
+        {"id": 100 + i, "tg_user_id": 1000 + i, "prompt": REWORDED_PROMPT, "status": "failed", "created_at": now - 60, "public_url": None}
+        for i in range(CROWD)
+    ]
+    stub = StubDatabase(rows)
+    simple_flow.db = stub
+    prompt_index._prompt_index = prompt_index.PromptIndex(stub)
+
+    result = await simple_flow.check_user_limits_simple(7, REWORDED_PROMPT)
+    ok = not result["can_create"] and result.get("existing_video_id") == 1
+    print(f"{'✅' if ok else '❌'} reworded prompt behind {CROWD} other matches: {result}\n")
+    return ok
+
+
+def main():
+    if not asyncio.run(check_blocking()):
+        sys.exit(1)
+
+    prompts = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    rng = random.Random(42)
+    corpus = [make_prompt(rng) for _ in range(prompts)]
+
+    print(f"🔎 {prompts:,} indexed prompts, {queries:,} queries per measurement\n")
+
+    index = MinHashIndex(threshold=0.75)
+    started = time.perf_counter()
+    for i, prompt in enumerate(corpus):
+        index.add(i, prompt, tg_user_id=i % 5_000)
+    build = time.perf_counter() - started
+    print(f"{'build':<34} {build:>10.2f} s ({build / prompts * 1e6:.0f} µs/prompt)")
+
+    fresh = [make_prompt(rng) for _ in range(queries)]
+    picked = rng.sample(range(prompts), queries)
+    reworded = [(i, reword(corpus[i])) for i in picked]
+
+    print()
+    timed("query, new prompt (global)", lambda p: index.query(p), fresh)
+    timed("query, reworded copy (global)", lambda q: index.query(q[1]), reworded)
+    timed("query, reworded copy (per user)", lambda q: index.query(q[1], tg_user_id=q[0] % 5_000), reworded)
+
+    found = sum(1 for i, text in reworded if any(key == i for _, key, _ in index.query(text)))
+    print(f"\n✅ reworded copies detected: {found}/{queries} ({found / queries:.1%})")
+
+
+if __name__ == "__main__":
+    main()
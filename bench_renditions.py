@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HLS rendition ladder output size and encode time
+Encodes one synthetic 720x1280 clip (test pattern + grain, roughly as hard
+to compress as Sora footage) with agent/tools/transcode.py into a temporary
+local content store, one rendition at a time so each encode gets the same
+FFMPEG_THREADS_PER_JOB threads to itself, then remuxes the faststart MP4
+fallback. Reports per rendition: encode wall time, x realtime, size,
+average and peak bitrate, and bytes saved against the source MP4. Needs
+ffmpeg on PATH and the normal .env so config.settings loads.
+
+Usage:
+    python bench_renditions.py [clip_seconds]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+from config.settings import settings
+from agent.tools.transcode import RENDITIONS, transcode_video
+from agent.tools.watermark import SORA_FRAME_SIZE
+from utils.ffmpeg_pool import FFmpegPool
+import utils.content_store as content_store
+import utils.ffmpeg_pool as ffmpeg_pool
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 12
+    width, height = SORA_FRAME_SIZE
+
+    with tempfile.TemporaryDirectory() as workdir:
+        settings.content_store_backend = "local"
+        settings.content_store_local_dir = os.path.join(workdir, "content")
+        settings.content_store_state_dir = os.path.join(workdir, "state")
+        content_store._content_store = None
+        ffmpeg_pool._ffmpeg_pool = FFmpegPool(workers=1, threads_per_job=settings.ffmpeg_threads_per_job)
+
+        clip = os.path.join(workdir, "clip.mp4")
+        await ffmpeg_pool._ffmpeg_pool.run([
+            "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=30:duration={seconds}",
+            "-f", "lavfi", "-i", f"sine=duration={seconds}",
+            "-vf", "noise=alls=12:allf=t", "-c:v", "libx264", "-crf", "20", "-c:a", "aac", "-b:a", "128k",
+            "-movflags", "+faststart", clip
+        ])
+        source_bytes = os.path.getsize(clip)
+
+        result = await transcode_video(clip, list(RENDITIONS))
+        if not result["success"]:
+            print(f"❌ Transcoding failed: {result['error']}")
+            return
+
+        print(f"🎞️ {seconds:.0f}s {width}x{height} source: {source_bytes / 1e6:.2f} MB "
+              f"({source_bytes * 8 / seconds / 1000:.0f} kbit/s), {settings.ffmpeg_threads_per_job} threads per encode, "
+              f"{settings.hls_segment_seconds}s segments\n")
+        print(f"{'rendition':<11}{'encode s':>10}{'x realtime':>12}{'size MB':>10}{'avg kbit/s':>12}{'peak kbit/s':>13}{'vs source':>11}")
+        for rendition in result["renditions"]:
+            print(
+                f"{rendition['name']:<11}{rendition['encode_seconds']:>10.2f}{seconds / rendition['encode_seconds']:>12.1f}"
+                f"{rendition['size'] / 1e6:>10.2f}{rendition['average_bandwidth'] / 1000:>12.0f}"
+                f"{rendition['bandwidth'] / 1000:>13.0f}{rendition['size'] / source_bytes:>10.0%}"
+            )
+
+        total_encode = sum(r["encode_seconds"] for r in result["renditions"])
+        print(f"\n⏱️ Ladder: {total_encode:.1f}s encoding, {result['seconds']:.1f}s end to end (incl. storing segments)")
+        if result["fallback"]:
+            fallback = result["fallback"]
+            print(f"📼 {settings.transcode_fallback_rendition} faststart MP4: {fallback['size'] / 1e6:.2f} MB, "
+                  f"remuxed in {fallback['remux_seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Sora status polls per completed video
+Runs concurrent jobs against fake_sora_api (in-process, no HTTP server)
+twice: with the old fixed 5-second loop and with the shared adaptive
+poller. Reports status requests per video and how long after a job
+actually completed it was noticed. Needs the normal .env so
+config.settings loads.
+
+Usage:
+    FAKE_SORA_SECONDS=60 python bench_sora_polling.py [jobs] [stagger_seconds]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import fake_sora_api
+from agent.tools.sora_poller import SoraPoller
+
+
+async def fetch_status(job_id: str):
+    fake_sora_api.stats["status"] += 1
+    return 200, fake_sora_api._job_payload(job_id)
+
+
+async def fixed_loop(job_id: str) -> None:
+    """The previous wait_for_job: sleep 5s, check, up to 60 times"""
+    for _ in range(60):
+        await asyncio.sleep(5)
+        _, payload = await fetch_status(job_id)
+        if payload["status"] in ("completed", "failed"):
+            return
+    raise Exception("timed out")
+
+
+async def run(label: str, wait, jobs: int, stagger: float) -> None:
+    fake_sora_api.stats["status"] = 0
+    lags = []
+
+    async def one(i: int):
+        await asyncio.sleep(i * stagger)
+        job_id = fake_sora_api._new_job()
+        done_at = fake_sora_api.jobs[job_id]["created"] + fake_sora_api.JOB_SECONDS
+        await wait(job_id)
+        lags.append(time.time() - done_at)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(jobs)))
+    print(
+        f"{label:<10}{fake_sora_api.stats['status'] / jobs:>14.1f}"
+        f"{statistics.mean(lags):>12.1f}{max(lags):>10.1f}{time.perf_counter() - started:>10.0f}"
+    )
+
+
+async def main():
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    stagger = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    print(f"🎞️ {jobs} jobs of {fake_sora_api.JOB_SECONDS:.0f}s, started {stagger}s apart\n")
+    print(f"{'poller':<10}{'polls/video':>14}{'lag avg s':>12}{'lag max':>10}{'wall s':>10}")
+
+    await run("fixed 5s", fixed_loop, jobs, stagger)
+
+    poller = SoraPoller(fetch_status=fetch_status)
+    poller.typical_seconds = fake_sora_api.JOB_SECONDS
+    await run("adaptive", poller.wait, jobs, stagger)
+    print(f"\n{poller.snapshot()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak RSS while a finished Sora video is moved into storage
+Serves a FAKE_SORA_VIDEO_BYTES payload the way fake_sora_api's /content
+does (one reused 64 KB chunk, so the server itself holds no copy) from a
+local HTTP server, and moves it into the "local" content store in a
+temporary directory. Two modes, each in a fresh process since ru_maxrss
+only ever goes up:
+  - streamed: Sora2Generator._upload_to_supabase (chunks spooled to disk)
+  - buffered: the previous download: response.content, then upload
+Reports resource.getrusage maxrss before and after, and the growth.
+Needs the normal .env so config.settings loads.
+
+Usage:
+    FAKE_SORA_VIDEO_BYTES=268435456 python bench_upload_memory.py
+"""
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from config.settings import settings
+from agent.tools.sora2 import Sora2Generator
+from utils.http_clients import close_http_clients, get_http_client
+import utils.content_store as content_store
+
+VIDEO_BYTES = int(os.environ.get("FAKE_SORA_VIDEO_BYTES", str(256 * 1024 * 1024)))
+CHUNK = os.urandom(64 * 1024)
+
+
+def maxrss_mb() -> float:
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def serve_content(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Minimal /v1/videos/{id}/content: headers, then VIDEO_BYTES of video/mp4"""
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: video/mp4\r\nConnection: close\r\n"
+        b"Content-Length: " + str(VIDEO_BYTES).encode() + b"\r\n\r\n"
+    )
+    sent = 0
+    while sent < VIDEO_BYTES:
+        piece = CHUNK[:min(len(CHUNK), VIDEO_BYTES - sent)]
+        writer.write(piece)
+        sent += len(piece)
+        await writer.drain()
+    writer.close()
+
+
+async def buffered_upload(url: str) -> str:
+    """The previous path: whole body in memory, then uploaded"""
+    response = await get_http_client("openai").get(url, follow_redirects=True)
+    response.raise_for_status()
+    stored = await content_store.get_content_store().put_bytes(response.content, content_type="video/mp4")
+    return stored["url"]
+
+
+async def child(mode: str) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        settings.content_store_backend = "local"
+        settings.content_store_local_dir = os.path.join(workdir, "content")
+        settings.content_store_state_dir = os.path.join(workdir, "state")
+        content_store._content_store = None
+
+        listener = await asyncio.start_server(serve_content, "127.0.0.1", 0)
+        settings.openai_base_url = f"http://127.0.0.1:{listener.sockets[0].getsockname()[1]}/v1"
+        generator = Sora2Generator()
+        url = generator._content_url("video_bench")
+
+        async with listener:
+            before = maxrss_mb()
+            started = time.perf_counter()
+            if mode == "streamed":
+                stored_url, _ = await generator._upload_to_supabase(url, "video_bench")
+            else:
+                stored_url = await buffered_upload(url)
+            elapsed = time.perf_counter() - started
+            after = maxrss_mb()
+            await close_http_clients()
+
+        if stored_url == url:
+            raise SystemExit(f"{mode}: upload fell back to the source URL")
+        print(json.dumps({"mode": mode, "before": before, "after": after, "seconds": elapsed}))
+
+
+def main():
+    print(f"💾 {VIDEO_BYTES / 1e6:.0f} MB payload into the local content store\n")
+    print(f"{'mode':<10}{'maxrss before MB':>18}{'after MB':>10}{'growth MB':>11}{'seconds':>9}")
+    for mode in ("streamed", "buffered"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:<10}{result['before']:>18.1f}{result['after']:>10.1f}"
+            f"{result['after'] - result['before']:>11.1f}{result['seconds']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        asyncio.run(child(sys.argv[2]))
+    else:
+        main()
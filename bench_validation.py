@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tiered prompt validation vs one GPT-4 call per prompt
+Replays a /create-like prompt mix (popular ideas resubmitted with
+different casing/punctuation, on-topic prompts, off-topic and red-flag
+prompts) through simple_flow's validator with the GPT-4 call replaced by
+a fake that sleeps like the real round trip. First checks that inflected
+red-flag / banned words never take the keyword approve path (exits 1
+otherwise). Needs the normal .env so config.settings loads.
+
+Usage:
+    python bench_validation.py [prompts] [llm_latency_ms]
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+import simple_flow
+from agent.tools.content_validator import KEYWORD_MATCHER, ContentValidator
+from agent.tools.tiered_validator import TieredValidator, normalize_prompt
+
+LLM_LATENCY = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 1.5
+llm_calls = 0
+
+ON_TOPIC = [
+    "Ethereum validators as {who} guarding a {where}",
+    "How a Uniswap swap works explained by {who} in a {where}",
+    "{who} staking ETH for the first time in a {where}",
+    "Layer 2 rollups as express trains through a {where}, narrated by {who}",
+    "NFT gallery opening in a {where} hosted by {who}",
+]
+OFF_TOPIC = [
+    "{who} dancing in a {where}",
+    "Sunset timelapse over a {where} with {who}",
+]
+RED_FLAG = [
+    "{who} explaining how to spot a crypto scam in a {where}",
+]
+# Inflected forms the keyword tier must not approve (baseline sent them all to GPT-4 / rejected them)
+INFLECTED_RED_FLAGS = [
+    "eth bombing a city",
+    "ethereum hackers stealing wallets",
+    "ethereum scammers rugging users",
+    "crypto asesinando gente",
+    "defi robando billeteras y matando validadores",
+]
+INFLECTED_BANNED = ["uniswap swap pumping the token", "uniswap liquidity mooning tonight", "dumping eth on uniswap"]
+
+WHO = ["a grandmother", "robots", "mariachis", "astronauts", "a cat", "students", "pirates", "a chef"]
+WHERE = ["mercado", "neon city", "castle", "spaceship", "beach", "library", "stadium"]
+
+
+def make_prompt(rng: random.Random) -> str:
+    roll = rng.random()
+    templates = ON_TOPIC if roll < 0.7 else OFF_TOPIC if roll < 0.9 else RED_FLAG
+    return rng.choice(templates).format(who=rng.choice(WHO), where=rng.choice(WHERE))
+
+
+def resubmit(prompt: str, rng: random.Random) -> str:
+    """Same prompt as users retype it: casing, spacing, trailing punctuation"""
+    variants = [prompt, prompt.lower(), prompt.upper(), f"  {prompt}!!", f"{prompt}."]
+    return rng.choice(variants)
+
+
+async def fake_llm(prompt: str, scan: dict) -> dict:
+    global llm_calls
+    llm_calls += 1
+    await asyncio.sleep(LLM_LATENCY)
+    return {"approved": True, "category": "defi_education", "reason": "Approved", "suggestions": []}
+
+
+async def run(validator, prompts) -> list:
+    latencies = []
+
+    async def one(prompt):
+        started = time.perf_counter()
+        await validator(prompt)
+        latencies.append(time.perf_counter() - started)
+
+    # Sequential in batches of 20, like bursts of /create
+    for i in range(0, len(prompts), 20):
+        await asyncio.gather(*(one(p) for p in prompts[i:i + 20]))
+    return latencies
+
+
+def report(label: str, latencies: list, calls: int) -> None:
+    latencies = sorted(latencies)
+    print(
+        f"{label:<12}{statistics.median(latencies) * 1000:>10.2f}"
+        f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>10.1f}"
+        f"{statistics.mean(latencies) * 1000:>10.1f}{calls:>12}"
+    )
+
+
+def check_inflections() -> bool:
+    """Regression check: stems catch inflected red-flag and banned words"""
+    ok = True
+    for prompt in INFLECTED_RED_FLAGS:
+        verdict = simple_flow._fast_validate_simple(simple_flow._simple_matcher.scan(normalize_prompt(prompt)))
+        if verdict is not None:
+            print(f"❌ fast-approved red flag: {prompt!r}")
+            ok = False
+    for prompt in INFLECTED_BANNED:
+        verdict = ContentValidator()._fast_validate(KEYWORD_MATCHER.scan(normalize_prompt(prompt)))
+        if not verdict or verdict["approved"]:
+            print(f"❌ banned term not rejected: {prompt!r}")
+            ok = False
+    print(f"{'✅' if ok else '❌'} inflection check: {len(INFLECTED_RED_FLAGS)} red-flag, {len(INFLECTED_BANNED)} banned prompts\n")
+    return ok
+
+
+async def main():
+    global llm_calls
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    if not check_inflections():
+        sys.exit(1)
+
+    rng = random.Random(42)
+    ideas = [make_prompt(rng) for _ in range(total // 4)]
+    prompts = [resubmit(rng.choice(ideas), rng) for _ in range(total)]
+
+    print(f"🛡️ {total} prompts ({len(set(ideas))} distinct ideas), fake GPT-4 latency {LLM_LATENCY * 1000:.0f} ms\n")
+    print(f"{'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'llm calls':>12}")
+
+    llm_calls = 0
+    report("llm only", await run(lambda p: fake_llm(p, {}), prompts), llm_calls)
+
+    llm_calls = 0
+    tiered = TieredValidator("bench", simple_flow._simple_matcher, simple_flow._fast_validate_simple, fake_llm)
+    report("tiered", await run(tiered.validate, prompts), llm_calls)
+
+    print()
+    for key, value in tiered.snapshot().items():
+        print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/videos round trips and latency, per-video posts lookup vs one batched query
+Supabase is replaced by a PostgREST-shaped stub (same query-builder calls,
+blocking .execute() that sleeps one round trip and counts requests per
+table). The same page is built twice:
+  - per-video: the original handler (videos query, then one posts query
+    per video on the page)
+  - batched:   the current _build_public_videos (gallery page query + one
+    posts in_() query for the whole page)
+Both go through Database.execute, so only the number of round trips differs.
+Needs the normal .env so config.settings loads.
+
+Usage:
+    python bench_videos_posts.py [db_latency_ms] [repeats]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+
+import app as app_module
+from db.client import db
+
+DB_LATENCY = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.040
+VIDEOS = 200
+POSTS_PER_VIDEO = 2
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data)
+
+
+class FakeQuery:
+    """Chainable like postgrest-py's builders; execute() is one blocking round trip"""
+
+    def __init__(self, client: "FakePostgREST", table: str):
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.window = None
+
+    def __getattr__(self, name):
+        # select/order/or_/is_/... don't change what the stub returns
+        return lambda *args, **kwargs: self
+
+    @property
+    def not_(self):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, count):
+        self.window = (0, count)
+        return self
+
+    def execute(self):
+        self.client.requests[self.table] += 1
+        time.sleep(self.client.latency)
+        rows = [row for row in self.client.tables[self.table] if all(f(row) for f in self.filters)]
+        if self.window:
+            rows = rows[self.window[0]:self.window[1]]
+        return FakeResult(rows)
+
+
+class FakePostgREST:
+    """Stand-in for supabase.Client with videos/posts tables and a request counter"""
+
+    def __init__(self, latency: float, videos: int = VIDEOS, posts_per_video: int = POSTS_PER_VIDEO):
+        self.latency = latency
+        self.requests = Counter()
+        self.tables = {
+            "videos": [
+                {
+                    "id": i, "tg_user_id": i % 37, "prompt": "Uniswap swap explained", "category": "defi_education",
+                    "caption": "", "hashtags": "#Uniswap", "status": "ready",
+                    "video_url": f"https://example.supabase.co/storage/v1/object/public/videos/{i}.mp4",
+                    "public_url": f"https://example.supabase.co/storage/v1/object/public/videos/{i}.mp4",
+                    "watermarked_url": None, "thumbnail_url": "", "created_at": f"2025-10-14T12:{i // 60 % 60:02d}:{i % 60:02d}+00:00",
+                    "duration_seconds": 12, "creators": {"username": f"creator{i % 37}"}
+                }
+                for i in range(videos, 0, -1)
+            ],
+            "posts": [
+                {
+                    "id": i * 10 + p, "video_id": i, "platform": ("tiktok", "instagram")[p % 2],
+                    "post_url": f"https://www.tiktok.com/@c/video/{i}{p}", "views": 1000 * i, "likes": 10 * i,
+                    "comments_count": i, "shares": p
+                }
+                for i in range(1, videos + 1) for p in range(posts_per_video)
+            ]
+        }
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+
+async def per_video_page(limit: int, offset: int = 0) -> int:
+    """The original /api/videos: one posts query per video on the page"""
+    result = await db.execute(
+        db.client.table("videos")
+        .select("id, prompt, category, caption, hashtags, video_url, watermarked_url, thumbnail_url, created_at, duration_seconds, tg_user_id, creators(username)")
+        .eq("status", "ready")
+        .order("created_at", desc=True)
+        .range(offset, offset + limit + 20 - 1)
+    )
+    videos = []
+    for video in result.data:
+        video_url = video.get("watermarked_url") or video.get("video_url", "")
+        if not video_url.startswith("http") or video_url.startswith("https://api.openai.com/"):
+            continue
+        posts = await db.execute(
+            db.client.table("posts")
+            .select("platform, post_url, views, likes, comments_count, shares")
+            .eq("video_id", video["id"])
+        )
+        videos.append({"id": video["id"], "views": sum(p.get("views", 0) for p in posts.data)})
+        if len(videos) >= limit:
+            break
+    return len(videos)
+
+
+async def batched_page(limit: int) -> int:
+    """The current handler body (uncached)"""
+    payload = await app_module._build_public_videos(limit, 0, None)
+    assert payload["success"], payload
+    return len(payload["videos"])
+
+
+async def measure(label: str, limit: int, build, repeats: int) -> None:
+    stub = db.client
+    latencies = []
+    stub.requests.clear()
+    for _ in range(repeats):
+        started = time.perf_counter()
+        count = await build(limit)
+        latencies.append(time.perf_counter() - started)
+    assert count == limit, f"{label} returned {count} videos"
+    per_page = {table: n / repeats for table, n in stub.requests.items()}
+    print(
+        f"{limit:>6}  {label:<11}{sum(per_page.values()):>10.0f}{per_page.get('posts', 0):>12.0f}"
+        f"{statistics.median(latencies) * 1000:>12.1f}{max(latencies) * 1000:>10.1f}"
+    )
+
+
+async def main():
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    db.client = FakePostgREST(DB_LATENCY)
+
+    print(f"📊 {VIDEOS} videos × {POSTS_PER_VIDEO} posts, stub round trip {DB_LATENCY * 1000:.0f} ms, {repeats} pages each\n")
+    print(f"{'limit':>6}  {'handler':<11}{'requests':>10}{'posts reqs':>12}{'p50 ms':>12}{'max ms':>10}")
+    for limit in (10, 20, 50, 100):
+        await measure("per-video", limit, per_video_page, repeats)
+        await measure("batched", limit, batched_page, repeats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -14,6 +14,8 @@ from telegram.ext import (
 from config.settings import settings
 from agent.agent import agent
 from db.client import db
+from scheduler.generation_worker import start_generation_workers, stop_generation_workers
+from utils.http_clients import close_http_clients
 
 # Import all command handlers from app.py
 from app import (
@@ -75,14 +77,20 @@ async def main():
     logger.info("🔄 Starting polling mode...")
     await tg_app.updater.start_polling()
 
+    # Start Sora 2 generation queue workers
+    generation_workers = start_generation_workers(settings.generation_workers)
+    logger.info(f"✅ {len(generation_workers)} generation worker(s) started")
+
     # Keep running
     try:
         await asyncio.Event().wait()
     except KeyboardInterrupt:
         logger.info("👋 Shutting down bot...")
+        await stop_generation_workers(generation_workers)
         await tg_app.updater.stop()
         await tg_app.stop()
         await tg_app.shutdown()
+        await close_http_clients()
 
 
 if __name__ == "__main__":
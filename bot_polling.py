@@ -9,6 +9,8 @@ from loguru import logger
 from config.settings import settings
 from agent.agent import agent
 from db.client import db
+from scheduler.generation_worker import start_generation_workers, stop_generation_workers
+from utils.http_clients import close_http_clients
 
 # Import all command handlers from app.py
 import sys
@@ -59,14 +61,20 @@ async def main():
     await application.start()
     await application.updater.start_polling()
 
+    # Start Sora 2 generation queue workers
+    generation_workers = start_generation_workers(settings.generation_workers)
+    logger.info(f"✅ {len(generation_workers)} generation worker(s) started")
+
     # Keep the bot running
     try:
         await asyncio.Event().wait()
     except KeyboardInterrupt:
         logger.info("👋 Shutting down...")
+        await stop_generation_workers(generation_workers)
         await application.updater.stop()
         await application.stop()
         await application.shutdown()
+        await close_http_clients()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
     sora2_model: str = Field(default="sora-2", env="SORA2_MODEL")
     gpt_model: str = Field(default="gpt-4-turbo-preview", env="GPT_MODEL")
+    openai_base_url: str = Field(default="https://api.openai.com/v1", env="OPENAI_BASE_URL")  # Point at fake_sora_api.py for local testing
     
     # Telegram
     telegram_bot_token: str = Field(..., env="TELEGRAM_BOT_TOKEN")
@@ -23,10 +24,17 @@ class Settings(BaseSettings):
     supabase_url: str = Field(..., env="SUPABASE_URL")
     supabase_key: str = Field(..., env="SUPABASE_KEY")
     supabase_service_key: Optional[str] = Field(None, env="SUPABASE_SERVICE_KEY")
+    db_max_workers: int = Field(default=16, env="DB_MAX_WORKERS")  # Threads for off-loop Supabase queries
 
     # Video Storage (S3, R2, or custom)
     storage_type: str = Field(default="local", env="STORAGE_TYPE")  # "s3", "r2", "custom", or "local"
 
+    # Content-addressed store (generated videos, reprocessing)
+    content_store_backend: str = Field(default="supabase", env="CONTENT_STORE_BACKEND")  # "supabase", "s3", "r2" or "local"
+    content_store_state_dir: str = Field(default="./.cache/uploads", env="CONTENT_STORE_STATE_DIR")  # Spooled downloads + resumable upload checkpoints
+    content_store_local_dir: str = Field(default="./.cache/content", env="CONTENT_STORE_LOCAL_DIR")  # Objects for the "local" backend
+    content_store_public_base_url: Optional[str] = Field(None, env="CONTENT_STORE_PUBLIC_BASE_URL")  # URL prefix serving CONTENT_STORE_LOCAL_DIR
+
     # AWS S3 (if using S3)
     aws_access_key_id: Optional[str] = Field(None, env="AWS_ACCESS_KEY_ID")
     aws_secret_access_key: Optional[str] = Field(None, env="AWS_SECRET_ACCESS_KEY")
@@ -46,6 +54,12 @@ class Settings(BaseSettings):
 
     # Redis
     redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
+
+    # Public API response cache
+    response_cache_ttl: float = Field(default=30.0, env="RESPONSE_CACHE_TTL")  # Fresh for this long
+    response_cache_stale_ttl: float = Field(default=300.0, env="RESPONSE_CACHE_STALE_TTL")  # Then served stale while revalidating
+    response_cache_max_entries: int = Field(default=512, env="RESPONSE_CACHE_MAX_ENTRIES")
+    response_cache_redis: bool = Field(default=False, env="RESPONSE_CACHE_REDIS")  # Share cache + invalidations via REDIS_URL
     
     # Social Media
     twitter_api_key: Optional[str] = Field(None, env="TWITTER_API_KEY")
@@ -63,6 +77,10 @@ class Settings(BaseSettings):
     max_strikes: int = Field(default=3, env="MAX_STRIKES")
     cooldown_hours: int = Field(default=24, env="COOLDOWN_HOURS")
     max_videos_per_day: int = Field(default=20, env="MAX_VIDEOS_PER_DAY")
+    validation_fast_path: bool = Field(default=True, env="VALIDATION_FAST_PATH")  # Decide clear-cut prompts from keywords, LLM only for the rest
+    validation_fast_approve_hits: int = Field(default=2, env="VALIDATION_FAST_APPROVE_HITS")  # Category keyword hits the strict validator needs to skip the LLM
+    validation_cache_size: int = Field(default=10000, env="VALIDATION_CACHE_SIZE")
+    validation_cache_ttl: int = Field(default=86400, env="VALIDATION_CACHE_TTL")  # Seconds a verdict for a normalized prompt is reused
     
     # Video Settings
     min_video_duration: int = Field(default=10, env="MIN_VIDEO_DURATION")
@@ -70,15 +88,71 @@ class Settings(BaseSettings):
     default_video_duration: int = Field(default=15, env="DEFAULT_VIDEO_DURATION")
     video_resolution: str = Field(default="1080x1920", env="VIDEO_RESOLUTION")
     
+    # Near-duplicate prompt detection
+    dedup_similarity: float = Field(default=0.75, env="DEDUP_SIMILARITY")  # Word-set Jaccard at which prompts count as the same video
+    dedup_window_days: int = Field(default=30, env="DEDUP_WINDOW_DAYS")  # Prompts kept in the in-memory index
+    dedup_user_window_hours: int = Field(default=24, env="DEDUP_USER_WINDOW_HOURS")  # Same user, similar prompt -> blocked
+    dedup_reuse_global: bool = Field(default=False, env="DEDUP_REUSE_GLOBAL")  # Offer another creator's similar ready video instead of generating
+
+    # Generation Queue
+    generation_workers: int = Field(default=2, env="GENERATION_WORKERS")  # In-process workers started by app.py (0 = run scheduler/generation_worker.py separately)
+    generation_lease_seconds: int = Field(default=120, env="GENERATION_LEASE_SECONDS")
+    generation_max_attempts: int = Field(default=3, env="GENERATION_MAX_ATTEMPTS")
+    generation_poll_interval: float = Field(default=2.0, env="GENERATION_POLL_INTERVAL")  # Idle wait between queue claims
+    generation_retry_backoff_seconds: float = Field(default=30.0, env="GENERATION_RETRY_BACKOFF_SECONDS")  # Requeue delay after a transient failure, doubled per attempt
+
+    # Sora job polling (one shared poller for every in-flight job)
+    sora_expected_seconds: float = Field(default=120.0, env="SORA_EXPECTED_SECONDS")  # ETA prior until progress is reported; tuned by completed jobs
+    sora_poll_min_interval: float = Field(default=2.0, env="SORA_POLL_MIN_INTERVAL")
+    sora_poll_max_interval: float = Field(default=20.0, env="SORA_POLL_MAX_INTERVAL")
+    sora_job_deadline_seconds: float = Field(default=900.0, env="SORA_JOB_DEADLINE_SECONDS")  # Give up on a job after this long
+    sora_poll_max_errors: int = Field(default=5, env="SORA_POLL_MAX_ERRORS")  # Consecutive failed status checks before giving up
+
+    # Sora generation governor (per process)
+    sora_max_concurrent: int = Field(default=4, env="SORA_MAX_CONCURRENT")  # Sora jobs in flight at once; extra jobs wait in fair order
+    sora_cost_per_video: float = Field(default=4.0, env="SORA_COST_PER_VIDEO")  # USD charged per new Sora job (spend accounting)
+    sora_hourly_budget_usd: float = Field(default=0.0, env="SORA_HOURLY_BUDGET_USD")  # Max spend per rolling hour (0 = no cap)
+
+    # Telegram status message updates (live generation progress)
+    status_edit_min_interval: float = Field(default=5.0, env="STATUS_EDIT_MIN_INTERVAL")  # Seconds between edits in one chat
+    status_edit_global_rate: float = Field(default=20.0, env="STATUS_EDIT_GLOBAL_RATE")  # Edits/second across all chats (Bot API allows ~30 msg/s)
+    
     # Campaign
     campaign_start_date: str = Field(..., env="CAMPAIGN_START_DATE")
     campaign_end_date: str = Field(..., env="CAMPAIGN_END_DATE")
     metrics_update_interval_hours: int = Field(default=6, env="METRICS_UPDATE_INTERVAL_HOURS")
+    metrics_tick_minutes: int = Field(default=5, env="METRICS_TICK_MINUTES")  # How often due posts are picked up
+    metrics_batch_size: int = Field(default=200, env="METRICS_BATCH_SIZE")  # Max due posts per tick
+    leaderboard_snapshot_hours: int = Field(default=24, env="LEADERBOARD_SNAPSHOT_HOURS")  # Persisted ranks / rank_change period
+    metrics_concurrency: int = Field(default=8, env="METRICS_CONCURRENCY")  # Posts scraped in parallel
+    metrics_rate_tiktok: float = Field(default=1.0, env="METRICS_RATE_TIKTOK")  # Requests/second per platform
+    metrics_rate_instagram: float = Field(default=0.5, env="METRICS_RATE_INSTAGRAM")
+    metrics_max_retries: int = Field(default=3, env="METRICS_MAX_RETRIES")  # Retries on HTTP 429
     
     # Watermark
     watermark_image_path: str = Field(default="./assets/uniswap_logo.png", env="WATERMARK_IMAGE_PATH")
     watermark_position: str = Field(default="bottom-right", env="WATERMARK_POSITION")
     watermark_opacity: float = Field(default=0.7, env="WATERMARK_OPACITY")
+    watermark_cache_dir: str = Field(default="./.cache/watermarks", env="WATERMARK_CACHE_DIR")  # Pre-scaled overlays, rendered once per size/opacity
+    watermark_encoder_preset: str = Field(default="balanced", env="WATERMARK_ENCODER_PRESET")  # "fast", "balanced" or "small" (see ENCODER_PRESETS)
+
+    # FFmpeg worker pool (watermarking and other encodes)
+    ffmpeg_workers: int = Field(default=0, env="FFMPEG_WORKERS")  # Concurrent ffmpeg processes (0 = cores / threads per job)
+    ffmpeg_threads_per_job: int = Field(default=2, env="FFMPEG_THREADS_PER_JOB")
+    ffmpeg_max_queue: int = Field(default=20, env="FFMPEG_MAX_QUEUE")  # Encodes waiting for a worker before new ones are rejected
+    ffmpeg_timeout_seconds: float = Field(default=600.0, env="FFMPEG_TIMEOUT_SECONDS")  # Kill an encode after this long
+
+    # Gallery previews (poster, preview loop, sprite sheet) rendered after generation
+    previews_enabled: bool = Field(default=True, env="PREVIEWS_ENABLED")
+    preview_poster_width: int = Field(default=360, env="PREVIEW_POSTER_WIDTH")  # Poster JPEG width in px (height keeps the video's aspect)
+    preview_clip_seconds: float = Field(default=3.0, env="PREVIEW_CLIP_SECONDS")  # Length of the muted autoplay loop
+    media_stage_concurrency: int = Field(default=2, env="MEDIA_STAGE_CONCURRENCY")  # Saved videos rendering previews/HLS at once (≤3 ffmpeg jobs each, keep × this under FFMPEG_MAX_QUEUE)
+
+    # HLS renditions for gallery playback (agent/tools/transcode.py)
+    transcode_enabled: bool = Field(default=True, env="TRANSCODE_ENABLED")
+    transcode_renditions: str = Field(default="720p,480p,360p", env="TRANSCODE_RENDITIONS")  # Comma-separated names from RENDITIONS
+    transcode_fallback_rendition: str = Field(default="480p", env="TRANSCODE_FALLBACK_RENDITION")  # Remuxed to a faststart MP4 for players without HLS
+    hls_segment_seconds: int = Field(default=4, env="HLS_SEGMENT_SECONDS")
     
     # Monitoring
     sentry_dsn: Optional[str] = Field(None, env="SENTRY_DSN")
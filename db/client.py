@@ -1,21 +1,54 @@
 """
 Supabase Database Client
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from supabase import create_client, Client
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timezone
 from config.settings import settings
 from loguru import logger
+from utils.pagination import encode_cursor, keyset_filter
+from utils.response_cache import invalidate_responses
+
+
+# Video columns shown by the public gallery; writes touching them invalidate cached responses
+PUBLIC_VIDEO_FIELDS = {"status", "video_url", "watermarked_url", "thumbnail_url", "preview_url", "sprite_url", "sprite_meta", "hls_url", "fallback_url", "caption", "hashtags", "prompt", "category"}
 
 
 class Database:
-    """Wrapper around Supabase client with helper methods"""
+    """
+    Wrapper around Supabase client with helper methods
+
+    The supabase-py client is synchronous: every `.execute()` blocks for the
+    full HTTP round trip. All queries go through `execute()`, which runs them
+    on a dedicated thread pool so the event loop (Telegram updates, webhooks,
+    API requests) keeps serving while PostgREST answers.
+    """
     
     def __init__(self):
         self.client: Client = create_client(
             settings.supabase_url,
             settings.supabase_key
         )
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.db_max_workers,
+            thread_name_prefix="supabase-db"
+        )
+
+    async def execute(self, query) -> Any:
+        """
+        Execute a Supabase query builder off the event loop
+
+        Usage:
+            result = await db.execute(db.client.table("videos").select("*").eq("id", 1))
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, query.execute)
+
+    def close(self) -> None:
+        """Release the query thread pool (called on app shutdown)"""
+        self._executor.shutdown(wait=False)
     
     # ==================== CREATORS ====================
     
@@ -23,7 +56,7 @@ class Database:
         """Get existing creator or create new one"""
         try:
             # Try to get existing
-            result = self.client.table("creators").select("*").eq("tg_user_id", tg_user_id).execute()
+            result = await self.execute(self.client.table("creators").select("*").eq("tg_user_id", tg_user_id))
             
             if result.data:
                 return result.data[0]
@@ -34,7 +67,7 @@ class Database:
                 "username": username,
                 "display_name": display_name or username
             }
-            result = self.client.table("creators").insert(new_creator).execute()
+            result = await self.execute(self.client.table("creators").insert(new_creator))
             return result.data[0]
             
         except Exception as e:
@@ -43,99 +76,230 @@ class Database:
     
     async def get_creator(self, tg_user_id: int) -> Optional[Dict]:
         """Get creator by Telegram user ID"""
-        result = self.client.table("creators").select("*").eq("tg_user_id", tg_user_id).execute()
+        result = await self.execute(self.client.table("creators").select("*").eq("tg_user_id", tg_user_id))
         return result.data[0] if result.data else None
     
     async def update_creator_strikes(self, tg_user_id: int, strikes: int) -> None:
         """Update creator strike count"""
-        self.client.table("creators").update({"strikes": strikes}).eq("tg_user_id", tg_user_id).execute()
+        await self.execute(self.client.table("creators").update({"strikes": strikes}).eq("tg_user_id", tg_user_id))
     
     async def ban_creator(self, tg_user_id: int) -> None:
         """Ban a creator"""
-        self.client.table("creators").update({"is_banned": True}).eq("tg_user_id", tg_user_id).execute()
+        await self.execute(self.client.table("creators").update({"is_banned": True}).eq("tg_user_id", tg_user_id))
     
     async def set_cooldown(self, tg_user_id: int, cooldown_until: datetime) -> None:
         """Set cooldown period for creator"""
-        self.client.table("creators").update({
+        await self.execute(self.client.table("creators").update({
             "cooldown_until": cooldown_until.isoformat()
-        }).eq("tg_user_id", tg_user_id).execute()
+        }).eq("tg_user_id", tg_user_id))
     
     # ==================== VIDEOS ====================
     
     async def create_video(self, video_data: Dict) -> Dict:
         """Create new video record"""
-        result = self.client.table("videos").insert(video_data).execute()
+        result = await self.execute(self.client.table("videos").insert(video_data))
+        await invalidate_responses("videos", "stats")
         return result.data[0]
     
     async def update_video_status(self, video_id: int, status: str, **kwargs) -> None:
         """Update video status and optional fields"""
         update_data = {"status": status, **kwargs}
-        self.client.table("videos").update(update_data).eq("id", video_id).execute()
+        await self.execute(self.client.table("videos").update(update_data).eq("id", video_id))
+        await invalidate_responses("videos", "stats")
 
     async def update_video_by_id(self, video_id: int, update_data: Dict) -> None:
         """Update video fields by ID"""
-        self.client.table("videos").update(update_data).eq("id", video_id).execute()
-    
+        await self.execute(self.client.table("videos").update(update_data).eq("id", video_id))
+        if PUBLIC_VIDEO_FIELDS.intersection(update_data):
+            await invalidate_responses("videos", "stats")
+    
+    async def get_recent_prompts(self, since: datetime, page_size: int = 1000) -> List[Dict]:
+        """id, tg_user_id, prompt, created_at of every video since `since` (paged)"""
+        rows = []
+        offset = 0
+        while True:
+            result = await self.execute(
+                self.client.table("videos")
+                .select("id, tg_user_id, prompt, created_at")
+                .gte("created_at", since.isoformat())
+                .order("id")
+                .range(offset, offset + page_size - 1)
+            )
+            rows.extend(result.data)
+            if len(result.data) < page_size:
+                return rows
+            offset += page_size
+
+    async def get_videos_by_ids(self, video_ids: List[int], columns: str = "id, tg_user_id, status, created_at, public_url") -> List[Dict]:
+        """Several videos in one query"""
+        if not video_ids:
+            return []
+        result = await self.execute(self.client.table("videos").select(columns).in_("id", list(video_ids)))
+        return result.data
+
+    async def get_gallery_videos(self, limit: int, cursor: Optional[str] = None, offset: int = 0) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of publicly playable ready videos, newest first
+        Keyset-paginated on (created_at, id); `offset` is only honoured without
+        a cursor (legacy clients). Returns (videos, next_cursor or None).
+        """
+        query = (
+            self.client.table("videos")
+            .select("id, prompt, category, caption, hashtags, public_url, thumbnail_url, preview_url, sprite_url, sprite_meta, hls_url, fallback_url, created_at, duration_seconds, tg_user_id, creators(username)")
+            .eq("status", "ready")
+            .not_.is_("public_url", "null")
+        )
+
+        after = keyset_filter(cursor)
+        if after:
+            query = query.or_(after)
+
+        query = query.order("created_at", desc=True).order("id", desc=True)
+
+        # Fetch one extra row to know whether another page exists
+        if after or not offset:
+            query = query.limit(limit + 1)
+        else:
+            query = query.range(offset, offset + limit)
+
+        result = await self.execute(query)
+        rows = result.data[:limit]
+        next_cursor = encode_cursor(rows[-1]) if len(result.data) > limit else None
+        return rows, next_cursor
+
     async def get_video(self, video_id: int) -> Optional[Dict]:
         """Get video by ID"""
-        result = self.client.table("videos").select("*").eq("id", video_id).execute()
+        result = await self.execute(self.client.table("videos").select("*").eq("id", video_id))
         return result.data[0] if result.data else None
     
     async def get_user_videos(self, tg_user_id: int, limit: int = 10) -> List[Dict]:
         """Get user's videos"""
-        result = self.client.table("videos").select("*").eq("tg_user_id", tg_user_id).order("created_at", desc=True).limit(limit).execute()
+        result = await self.execute(self.client.table("videos").select("*").eq("tg_user_id", tg_user_id).order("created_at", desc=True).limit(limit))
         return result.data
     
     async def get_last_video(self, tg_user_id: int) -> Optional[Dict]:
         """Get user's most recent video"""
-        result = self.client.table("videos").select("*").eq("tg_user_id", tg_user_id).order("created_at", desc=True).limit(1).execute()
+        result = await self.execute(self.client.table("videos").select("*").eq("tg_user_id", tg_user_id).order("created_at", desc=True).limit(1))
         return result.data[0] if result.data else None
     
     async def count_videos_today(self, tg_user_id: int) -> int:
         """Count videos created today by user"""
-        result = self.client.table("videos").select("id", count="exact").eq("tg_user_id", tg_user_id).gte("created_at", datetime.now().date().isoformat()).execute()
+        result = await self.execute(self.client.table("videos").select("id", count="exact").eq("tg_user_id", tg_user_id).gte("created_at", datetime.now().date().isoformat()))
         return result.count or 0
-    
+
+    # ==================== GENERATION QUEUE ====================
+
+    async def count_queued_before(self, video_id: int) -> int:
+        """Queued videos ahead of this one (claims are oldest-first)"""
+        result = await self.execute(self.client.table("videos").select("id", count="exact").eq("status", "queued").lt("id", video_id))
+        return result.count or 0
+
+    async def claim_generation_job(self, worker_id: str, lease_seconds: int, orphan_seconds: int) -> Optional[Dict]:
+        """
+        Atomically claim the next queued video (or one whose lease expired)
+        Lease-less inline generations are only taken once orphan_seconds old.
+        See migrations/add_generation_queue.sql (FOR UPDATE SKIP LOCKED)
+        """
+        result = await self.execute(self.client.rpc("claim_generation_job", {
+            "p_worker_id": worker_id,
+            "p_lease_seconds": lease_seconds,
+            "p_orphan_seconds": orphan_seconds
+        }))
+        return result.data[0] if result.data else None
+
+    async def renew_generation_lease(self, video_id: int, worker_id: str, lease_seconds: int) -> bool:
+        """Extend a held lease. Returns False if another worker took the job over"""
+        result = await self.execute(self.client.rpc("renew_generation_lease", {
+            "p_video_id": video_id,
+            "p_worker_id": worker_id,
+            "p_lease_seconds": lease_seconds
+        }))
+        return bool(result.data)
+
+    async def release_generation_lease(self, video_id: int, **kwargs) -> None:
+        """Drop the lease on a finished job (plus optional extra fields)"""
+        await self.update_video_by_id(video_id, {
+            "lease_owner": None,
+            "lease_expires_at": None,
+            **kwargs
+        })
+
     # ==================== POSTS ====================
     
     async def create_post(self, post_data: Dict) -> Dict:
         """Register a social media post"""
-        result = self.client.table("posts").insert(post_data).execute()
+        result = await self.execute(self.client.table("posts").insert(post_data))
+        await invalidate_responses("videos", "stats")
         return result.data[0]
     
     async def get_post_by_url(self, post_url: str) -> Optional[Dict]:
         """Get post by URL"""
-        result = self.client.table("posts").select("*").eq("post_url", post_url).execute()
+        result = await self.execute(self.client.table("posts").select("*").eq("post_url", post_url))
         return result.data[0] if result.data else None
     
+    async def get_posts_for_videos(self, video_ids: List[int]) -> Dict[int, List[Dict]]:
+        """
+        Get posts for many videos in a single round trip
+        Returns {video_id: [posts]} (videos without posts are absent)
+        """
+        if not video_ids:
+            return {}
+
+        result = await self.execute(
+            self.client.table("posts")
+            .select("video_id, platform, post_url, views, likes, comments_count, shares")
+            .in_("video_id", list(video_ids))
+        )
+
+        posts_by_video: Dict[int, List[Dict]] = {}
+        for post in result.data:
+            posts_by_video.setdefault(post["video_id"], []).append(post)
+
+        return posts_by_video
+
     async def approve_post(self, post_id: int) -> None:
         """Approve a post"""
-        self.client.table("posts").update({
+        await self.execute(self.client.table("posts").update({
             "approved": True,
             "approved_at": datetime.now().isoformat()
-        }).eq("id", post_id).execute()
+        }).eq("id", post_id))
     
     async def get_posts_for_tracking(self, limit: int = 100) -> List[Dict]:
-        """Get approved posts that need metrics update"""
-        result = self.client.table("posts").select("*, videos(*)").eq("approved", True).order("last_tracked_at").limit(limit).execute()
+        """
+        Get posts whose metrics refresh is due (next_metrics_at <= now or never scheduled)
+        Most overdue first
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        result = await self.execute(
+            self.client.table("posts")
+            .select("id, post_url, platform, tg_user_id, video_id, submitted_at, views, last_metrics_sync, next_metrics_at")
+            .not_.is_("post_url", "null")
+            .or_(f"next_metrics_at.is.null,next_metrics_at.lte.{now}")
+            .order("next_metrics_at", nullsfirst=True)
+            .limit(limit)
+        )
         return result.data
-    
-    async def update_post_tracking(self, post_id: int) -> None:
-        """Update last tracked timestamp"""
-        self.client.table("posts").update({
-            "last_tracked_at": datetime.now().isoformat()
-        }).eq("id", post_id).execute()
-    
+
+    async def update_post_tracking(self, post_id: int, next_metrics_at: datetime = None, views_per_hour: float = None) -> None:
+        """Update last tracked timestamp and the next scheduled refresh"""
+        update_data = {"last_tracked_at": datetime.now(timezone.utc).isoformat()}
+        if next_metrics_at is not None:
+            update_data["next_metrics_at"] = next_metrics_at.isoformat()
+        if views_per_hour is not None:
+            update_data["views_per_hour"] = views_per_hour
+
+        await self.execute(self.client.table("posts").update(update_data).eq("id", post_id))
+
     # ==================== METRICS ====================
     
     async def save_metrics(self, metrics_data: Dict) -> Dict:
         """Save metrics snapshot"""
-        result = self.client.table("metrics").insert(metrics_data).execute()
+        result = await self.execute(self.client.table("metrics").insert(metrics_data))
         return result.data[0]
     
     async def get_latest_metrics(self, post_id: int) -> Optional[Dict]:
         """Get most recent metrics for a post"""
-        result = self.client.table("metrics").select("*").eq("post_id", post_id).order("snapshot_at", desc=True).limit(1).execute()
+        result = await self.execute(self.client.table("metrics").select("*").eq("post_id", post_id).order("snapshot_at", desc=True).limit(1))
         return result.data[0] if result.data else None
 
     async def update_post_metrics(self, post_id: int, metrics: Dict) -> None:
@@ -154,7 +318,7 @@ class Database:
         if metrics.get("video_id") or metrics.get("shortcode"):
             update_data["platform_post_id"] = metrics.get("video_id") or metrics.get("shortcode")
 
-        self.client.table("posts").update(update_data).eq("id", post_id).execute()
+        await self.execute(self.client.table("posts").update(update_data).eq("id", post_id))
 
         # Also save to metrics history
         await self.save_metrics({
@@ -166,44 +330,45 @@ class Database:
             "snapshot_at": now_local().isoformat()
         })
 
+        await invalidate_responses("videos")
+
     async def recalculate_creator_stats(self, tg_user_id: int) -> None:
         """Recalculate aggregated stats for a creator from their posts and videos"""
-        # Get all posts for this user
-        posts_result = self.client.table("posts").select("views, likes, comments_count, shares").eq("tg_user_id", tg_user_id).execute()
-
-        total_views = sum(p.get("views", 0) for p in posts_result.data)
-        total_likes = sum(p.get("likes", 0) for p in posts_result.data)
-        total_comments = sum(p.get("comments_count", 0) for p in posts_result.data)
-        total_shares = sum(p.get("shares", 0) for p in posts_result.data)
-        total_engagements = total_likes + total_comments + total_shares
-
-        # Get total videos count
-        videos_result = self.client.table("videos").select("id", count="exact").eq("tg_user_id", tg_user_id).execute()
-        total_videos = videos_result.count if videos_result.count else 0
-
-        # Update creator
-        self.client.table("creators").update({
-            "total_views": total_views,
-            "total_videos": total_videos,
-            "total_engagements": total_engagements,
-            "total_shares": total_shares
-        }).eq("tg_user_id", tg_user_id).execute()
-    
+        await self.recalculate_creators_stats([tg_user_id])
+
+    async def recalculate_creators_stats(self, tg_user_ids: Optional[List[int]] = None) -> int:
+        """
+        Recalculate aggregated stats for many creators in one SQL statement
+        (see migrations/add_creator_stats_function.sql). None = all creators.
+        Returns the number of creators whose totals changed.
+        """
+        if tg_user_ids is not None:
+            tg_user_ids = list({int(u) for u in tg_user_ids})
+            if not tg_user_ids:
+                return 0
+
+        result = await self.execute(
+            self.client.rpc("recalculate_creator_stats", {"p_tg_user_ids": tg_user_ids})
+        )
+        if result.data:
+            await invalidate_responses("stats", "leaderboard")
+        return result.data or 0
+
     async def get_metrics_history(self, post_id: int) -> List[Dict]:
         """Get metrics history for a post"""
-        result = self.client.table("metrics").select("*").eq("post_id", post_id).order("snapshot_at", desc=True).execute()
+        result = await self.execute(self.client.table("metrics").select("*").eq("post_id", post_id).order("snapshot_at", desc=True))
         return result.data
     
     # ==================== LEADERBOARD ====================
     
     async def get_leaderboard(self, limit: int = 10) -> List[Dict]:
         """Get top N creators"""
-        result = self.client.table("leaderboard").select("*").order("rank").limit(limit).execute()
+        result = await self.execute(self.client.table("leaderboard").select("*").order("rank").limit(limit))
         return result.data
     
     async def get_user_rank(self, tg_user_id: int) -> Optional[Dict]:
         """Get user's leaderboard entry"""
-        result = self.client.table("leaderboard").select("*").eq("tg_user_id", tg_user_id).execute()
+        result = await self.execute(self.client.table("leaderboard").select("*").eq("tg_user_id", tg_user_id))
         return result.data[0] if result.data else None
     
     async def update_leaderboard(self, tg_user_id: int, stats: Dict) -> None:
@@ -211,46 +376,127 @@ class Database:
         existing = await self.get_user_rank(tg_user_id)
         
         if existing:
-            self.client.table("leaderboard").update(stats).eq("tg_user_id", tg_user_id).execute()
+            await self.execute(self.client.table("leaderboard").update(stats).eq("tg_user_id", tg_user_id))
         else:
             stats["tg_user_id"] = tg_user_id
-            self.client.table("leaderboard").insert(stats).execute()
-    
-    async def recalculate_leaderboard(self) -> None:
-        """Recalculate entire leaderboard from raw data"""
-        # This would be a complex aggregation query
-        # For now, implemented as stored procedure or separate job
-        pass
-    
+            await self.execute(self.client.table("leaderboard").insert(stats))
+    
+    async def recalculate_leaderboard(self) -> int:
+        """
+        Rewrite the leaderboard snapshot (ranks + rank_change) from creators
+        in one SQL statement (see migrations/add_leaderboard_function.sql)
+        Returns rows written
+        """
+        result = await self.execute(self.client.rpc("recalculate_leaderboard", {}))
+        return result.data or 0
+
+    async def get_leaderboard_ranks(self, page_size: int = 1000) -> Dict[int, Dict]:
+        """Persisted snapshot as {tg_user_id: {"rank", "rank_change"}}"""
+        ranks = {}
+        offset = 0
+        while True:
+            result = await self.execute(
+                self.client.table("leaderboard")
+                .select("tg_user_id, rank, rank_change")
+                .order("tg_user_id")
+                .range(offset, offset + page_size - 1)
+            )
+            for row in result.data:
+                ranks[row["tg_user_id"]] = {"rank": row["rank"], "rank_change": row.get("rank_change") or 0}
+            if len(result.data) < page_size:
+                return ranks
+            offset += page_size
+
+    async def get_creators_for_ranking(self, tg_user_ids: Optional[List[int]] = None, page_size: int = 1000) -> List[Dict]:
+        """Ranking fields for the given creators (None = every creator, paged)"""
+        columns = "tg_user_id, username, total_views, total_videos, total_engagements"
+
+        if tg_user_ids is not None:
+            ids = list(set(tg_user_ids))
+            rows = []
+            for i in range(0, len(ids), page_size):
+                result = await self.execute(
+                    self.client.table("creators").select(columns).in_("tg_user_id", ids[i:i + page_size])
+                )
+                rows.extend(result.data)
+            return rows
+
+        rows = []
+        offset = 0
+        while True:
+            result = await self.execute(
+                self.client.table("creators")
+                .select(columns)
+                .order("tg_user_id")
+                .range(offset, offset + page_size - 1)
+            )
+            rows.extend(result.data)
+            if len(result.data) < page_size:
+                return rows
+            offset += page_size
+    
+    # ==================== CAMPAIGN ====================
+
+    async def get_campaign_counters(self) -> Dict:
+        """Trigger-maintained campaign totals (see migrations/add_campaign_counters.sql)"""
+        result = await self.execute(self.client.table("campaign_counters").select("*").eq("id", 1))
+        return result.data[0] if result.data else {}
+
+    # ==================== EPOCHS ====================
+
+    async def get_epoch_results(self, epoch_id: int) -> List[Dict]:
+        """Frozen ranking for a closed epoch (empty if not finalized yet)"""
+        result = await self.execute(self.client.table("epoch_results").select("*").eq("epoch_id", epoch_id).order("rank"))
+        return result.data
+
+    async def finalize_epoch(self, epoch_id: int, week_start: datetime, week_end: datetime, limit: int = 10) -> List[Dict]:
+        """Compute and store a closed epoch's ranking once (idempotent)"""
+        result = await self.execute(self.client.rpc("finalize_epoch", {
+            "p_epoch_id": epoch_id,
+            "p_start": week_start.isoformat(),
+            "p_end": week_end.isoformat(),
+            "p_limit": limit
+        }))
+        return result.data or []
+
+    async def compute_epoch_rankings(self, week_start: datetime, week_end: datetime, limit: int = 10) -> List[Dict]:
+        """Live ranking by views gained in [week_start, week_end) (open epochs)"""
+        result = await self.execute(self.client.rpc("compute_epoch_rankings", {
+            "p_start": week_start.isoformat(),
+            "p_end": week_end.isoformat(),
+            "p_limit": limit
+        }))
+        return result.data or []
+
     # ==================== NOTIFICATIONS ====================
     
     async def create_notification(self, notification_data: Dict) -> Dict:
         """Create notification"""
-        result = self.client.table("notifications").insert(notification_data).execute()
+        result = await self.execute(self.client.table("notifications").insert(notification_data))
         return result.data[0]
     
     async def get_pending_notifications(self, limit: int = 50) -> List[Dict]:
         """Get unsent notifications"""
-        result = self.client.table("notifications").select("*").eq("sent", False).order("created_at").limit(limit).execute()
+        result = await self.execute(self.client.table("notifications").select("*").eq("sent", False).order("created_at").limit(limit))
         return result.data
     
     async def mark_notification_sent(self, notification_id: int) -> None:
         """Mark notification as sent"""
-        self.client.table("notifications").update({
+        await self.execute(self.client.table("notifications").update({
             "sent": True,
             "sent_at": datetime.now().isoformat()
-        }).eq("id", notification_id).execute()
+        }).eq("id", notification_id))
     
     # ==================== VIOLATIONS ====================
     
     async def log_violation(self, violation_data: Dict) -> Dict:
         """Log content violation"""
-        result = self.client.table("violations").insert(violation_data).execute()
+        result = await self.execute(self.client.table("violations").insert(violation_data))
         return result.data[0]
     
     async def get_user_violations(self, tg_user_id: int) -> List[Dict]:
         """Get user's violation history"""
-        result = self.client.table("violations").select("*").eq("tg_user_id", tg_user_id).order("created_at", desc=True).execute()
+        result = await self.execute(self.client.table("violations").select("*").eq("tg_user_id", tg_user_id).order("created_at", desc=True))
         return result.data
     
     # ==================== VOTES ====================
@@ -258,18 +504,18 @@ class Database:
     async def cast_vote(self, video_id: int, voter_tg_user_id: int, vote_type: str) -> bool:
         """Cast a vote for a video"""
         try:
-            self.client.table("votes").insert({
+            await self.execute(self.client.table("votes").insert({
                 "video_id": video_id,
                 "voter_tg_user_id": voter_tg_user_id,
                 "vote_type": vote_type
-            }).execute()
+            }))
             return True
         except:
             return False  # Already voted
     
     async def get_video_votes(self, video_id: int) -> Dict[str, int]:
         """Get vote counts for a video"""
-        result = self.client.table("votes").select("vote_type").eq("video_id", video_id).execute()
+        result = await self.execute(self.client.table("votes").select("vote_type").eq("video_id", video_id))
         
         vote_counts = {}
         for vote in result.data:
@@ -282,12 +528,12 @@ class Database:
     
     async def save_conversation(self, conversation_data: Dict) -> Dict:
         """Save agent conversation for context"""
-        result = self.client.table("agent_conversations").insert(conversation_data).execute()
+        result = await self.execute(self.client.table("agent_conversations").insert(conversation_data))
         return result.data[0]
     
     async def get_user_conversations(self, tg_user_id: int, limit: int = 10) -> List[Dict]:
         """Get recent conversations"""
-        result = self.client.table("agent_conversations").select("*").eq("tg_user_id", tg_user_id).order("created_at", desc=True).limit(limit).execute()
+        result = await self.execute(self.client.table("agent_conversations").select("*").eq("tg_user_id", tg_user_id).order("created_at", desc=True).limit(limit))
         return result.data
 
 
@@ -0,0 +1,61 @@
+"""
+Epoch (ISO week) rankings for betting pool settlement
+Winners are ranked by views gained inside the week, from the metrics
+snapshot rollup (see migrations/add_epoch_rankings.sql).
+
+Closed epochs are frozen in `epoch_results` by finalize_epoch() and then
+cached in-process, so settlement reads are O(1) and always return the same
+answer. Open epochs are computed live and flagged as not final.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from loguru import logger
+from db.client import db
+from utils.timezone import epoch_id_for, epoch_window
+
+# Creators stored per closed epoch (settlement uses the top 3)
+EPOCH_RESULTS_LIMIT = 10
+
+_closed_epochs: Dict[int, List[Dict]] = {}
+
+
+async def get_epoch_rankings(epoch_id: int) -> Dict:
+    """
+    Ranking for an epoch
+    Returns {"epoch_id", "week_start", "week_end", "final", "rankings"}
+    """
+    week_start, week_end = epoch_window(epoch_id)
+    final = week_end <= datetime.now(timezone.utc)
+
+    if not final:
+        rankings = await db.compute_epoch_rankings(week_start, week_end, EPOCH_RESULTS_LIMIT)
+    elif epoch_id in _closed_epochs:
+        rankings = _closed_epochs[epoch_id]
+    else:
+        rankings = await db.get_epoch_results(epoch_id)
+        if not rankings:
+            # Freezes the epoch, or returns it as stored if it was frozen (possibly empty)
+            logger.info(f"📊 Finalizing epoch {epoch_id} ({week_start.date()} to {week_end.date()})")
+            rankings = await db.finalize_epoch(epoch_id, week_start, week_end, EPOCH_RESULTS_LIMIT)
+        # Cached even when empty: a closed epoch with no winners stays that way
+        _closed_epochs[epoch_id] = rankings
+
+    return {
+        "epoch_id": epoch_id,
+        "week_start": week_start,
+        "week_end": week_end,
+        "final": final,
+        "rankings": rankings
+    }
+
+
+async def finalize_previous_epoch() -> List[Dict]:
+    """Scheduler job: freeze last week's ranking right after it closes"""
+    epoch_id = epoch_id_for(datetime.now(timezone.utc) - timedelta(days=7))
+    try:
+        result = await get_epoch_rankings(epoch_id)
+        logger.info(f"✅ Epoch {epoch_id} finalized with {len(result['rankings'])} ranked creator(s)")
+        return result["rankings"]
+    except Exception as e:
+        logger.error(f"❌ Error finalizing epoch {epoch_id}: {e}")
+        return []
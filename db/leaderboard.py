@@ -0,0 +1,125 @@
+"""
+Leaderboard engine
+Creators ranked by total_views in an in-process RankIndex, loaded once from
+Supabase and then updated incrementally whenever a creator's stats are
+recalculated. Top-N and "my rank" never hit the database.
+
+The `leaderboard` table is the persisted snapshot: snapshot() rewrites it
+with one SQL call and resets the baseline used for rank deltas, so
+rank_change means "positions moved since the last snapshot".
+
+Usage:
+    from db.leaderboard import get_leaderboard
+    board = get_leaderboard()
+    top = await board.top(10)
+    me = await board.get(tg_user_id)
+    await board.refresh([tg_user_id])   # after recalculate_creator_stats
+"""
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+from loguru import logger
+from db.client import Database, db as default_db
+from utils.ranking import RankIndex
+from utils.response_cache import invalidate_responses
+
+
+class Leaderboard:
+    """Incrementally maintained creator ranking"""
+
+    def __init__(self, database: Optional[Database] = None):
+        self.db = database or default_db
+        self._index = RankIndex()
+        self._creators: Dict[int, Dict] = {}
+        self._baseline: Dict[int, int] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    async def ensure_loaded(self) -> None:
+        """Load the ranking on first use"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await self.load()
+
+    async def load(self) -> None:
+        """(Re)build the index from creators and the baseline from the snapshot"""
+        started = time.monotonic()
+
+        rows = await self.db.get_creators_for_ranking()
+        snapshot = await self.db.get_leaderboard_ranks()
+
+        self._creators = {row["tg_user_id"]: row for row in rows}
+        self._index.load({uid: row.get("total_views") or 0 for uid, row in self._creators.items()})
+        self._baseline = {uid: entry["rank"] for uid, entry in snapshot.items() if entry.get("rank")}
+        self._loaded = True
+
+        logger.info(f"🏆 Leaderboard loaded: {len(self._index)} creators in {time.monotonic() - started:.2f}s")
+
+    def _entry(self, tg_user_id: int, rank: int) -> Dict:
+        creator = self._creators[tg_user_id]
+        baseline = self._baseline.get(tg_user_id)
+        return {
+            "rank": rank,
+            "rank_change": baseline - rank if baseline else 0,
+            "tg_user_id": tg_user_id,
+            "username": creator.get("username"),
+            "total_views": creator.get("total_views") or 0,
+            "total_videos": creator.get("total_videos") or 0,
+            "total_engagements": creator.get("total_engagements") or 0
+        }
+
+    async def top(self, limit: int = 10, offset: int = 0) -> List[Dict]:
+        """Top `limit` creators starting at `offset` (no database round trip)"""
+        await self.ensure_loaded()
+        return [self._entry(uid, rank) for rank, uid, _ in self._index.top(limit, offset)]
+
+    async def get(self, tg_user_id: int) -> Optional[Dict]:
+        """A creator's rank entry, or None if they aren't ranked"""
+        await self.ensure_loaded()
+        rank = self._index.rank_of(tg_user_id)
+        return self._entry(tg_user_id, rank) if rank else None
+
+    async def size(self) -> int:
+        await self.ensure_loaded()
+        return len(self._index)
+
+    def apply(self, creator: Dict) -> None:
+        """Apply fresh stats for one creator (moves them in the index)"""
+        uid = creator["tg_user_id"]
+        self._creators[uid] = {**self._creators.get(uid, {}), **creator}
+        self._index.update(uid, self._creators[uid].get("total_views") or 0)
+
+    async def refresh(self, tg_user_ids: Iterable[int]) -> None:
+        """Re-read the given creators' totals and update their ranks"""
+        ids = list(set(tg_user_ids))
+        if not ids or not self._loaded:
+            # Not loaded yet: the first top()/get() will read fresh data anyway
+            return
+        try:
+            for row in await self.db.get_creators_for_ranking(ids):
+                self.apply(row)
+            await invalidate_responses("leaderboard")
+        except Exception as e:
+            logger.error(f"❌ Error refreshing leaderboard for {len(ids)} creator(s): {e}")
+
+    async def snapshot(self) -> int:
+        """Persist the leaderboard table and start a new rank-delta period"""
+        written = await self.db.recalculate_leaderboard()
+        # Reload so the ranks persisted just now become the new baseline
+        await self.load()
+        await invalidate_responses("leaderboard")
+        logger.info(f"🏆 Leaderboard snapshot saved ({written} rows)")
+        return written
+
+
+# Singleton instance
+_leaderboard = None
+
+def get_leaderboard() -> Leaderboard:
+    """Get or create leaderboard singleton"""
+    global _leaderboard
+    if _leaderboard is None:
+        _leaderboard = Leaderboard()
+    return _leaderboard
@@ -0,0 +1,149 @@
+"""
+Near-duplicate prompt index
+Recent prompts (settings.dedup_window_days) live in an in-process
+MinHashIndex, loaded once from the videos table (the persistent copy) and
+extended as videos are created, so a reworded prompt is caught before
+paying ~$4 for another Sora generation.
+
+Usage:
+    from db.prompt_index import get_prompt_index
+    index = get_prompt_index()
+    found = await index.find_duplicates(prompt, tg_user_id)
+    index.add(video_row)   # after create_video
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from loguru import logger
+from config.settings import settings
+from db.client import Database, db as default_db
+from utils.minhash import MinHashIndex
+
+# Statuses that count as "already made (or being made)"
+ACTIVE_STATUSES = ("queued", "generating", "ready")
+
+# Prune expired prompts every N additions
+PRUNE_EVERY = 1000
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return time.time()
+    dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class PromptIndex:
+    """Per-user and global near-duplicate lookups over recent prompts"""
+
+    def __init__(self, database: Optional[Database] = None):
+        self.db = database or default_db
+        self._index = MinHashIndex(settings.dedup_similarity)
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._added_since_prune = 0
+
+    async def ensure_loaded(self) -> None:
+        """Load the index on first use (or warm it at startup)"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await self.load()
+
+    async def load(self) -> None:
+        started = time.monotonic()
+        since = datetime.now(timezone.utc) - timedelta(days=settings.dedup_window_days)
+        rows = await self.db.get_recent_prompts(since)
+        for row in rows:
+            self.add(row)
+        self._loaded = True
+        logger.info(f"🔎 Prompt index loaded: {len(self._index)} prompts in {time.monotonic() - started:.2f}s")
+
+    def add(self, video: Dict) -> None:
+        """Index a video's prompt"""
+        if not video.get("prompt"):
+            return
+        self._index.add(
+            video["id"],
+            video["prompt"],
+            tg_user_id=video.get("tg_user_id"),
+            created_at=_timestamp(video.get("created_at"))
+        )
+        self._added_since_prune += 1
+        if self._added_since_prune >= PRUNE_EVERY:
+            self.prune()
+
+    def prune(self) -> int:
+        """Forget prompts older than the dedup window"""
+        cutoff = time.time() - settings.dedup_window_days * 86400
+        removed = self._index.prune(lambda meta: meta["created_at"] >= cutoff)
+        self._added_since_prune = 0
+        return removed
+
+    async def find_duplicates(self, prompt: str, tg_user_id: int) -> Dict:
+        """
+        Near-duplicates of `prompt`
+        Returns {"own": video, "similar_ready": video} (keys only when found);
+        each video dict carries its "similarity".
+        """
+        await self.ensure_loaded()
+
+        started = time.perf_counter()
+        matches = self._index.query(prompt)
+        if not matches:
+            return {}
+
+        # The user's own candidates come from the index metadata, so a crowd of
+        # similar prompts from other creators can't push them out of the top 20
+        user_cutoff = time.time() - settings.dedup_user_window_hours * 3600
+        own_keys = [
+            key for _, key, meta in matches
+            if meta.get("tg_user_id") == tg_user_id and meta["created_at"] >= user_cutoff
+        ]
+        global_keys = [key for _, key, _ in matches[:20]]
+
+        # Current status / URL live in the DB (one query for the handful of matches)
+        similarity = {key: score for score, key, _ in matches}
+        videos = await self.db.get_videos_by_ids(list(dict.fromkeys(own_keys + global_keys)))
+        videos.sort(key=lambda v: similarity[v["id"]], reverse=True)
+
+        own_keys, global_keys = set(own_keys), set(global_keys)
+        found = {}
+        for video in videos:
+            video["similarity"] = round(similarity[video["id"]], 2)
+            if video.get("status") not in ACTIVE_STATUSES:
+                continue
+            if "own" not in found and video["id"] in own_keys:
+                found["own"] = video
+            if (
+                "similar_ready" not in found
+                and video["id"] in global_keys
+                and video.get("status") == "ready"
+                and video.get("public_url")
+            ):
+                found["similar_ready"] = video
+
+        if found:
+            logger.info(
+                f"🔎 Near-duplicate prompt for user {tg_user_id}: "
+                f"{ {k: (v['id'], v['similarity']) for k, v in found.items()} } "
+                f"({(time.perf_counter() - started) * 1000:.2f} ms)"
+            )
+        return found
+
+
+# Singleton instance
+_prompt_index = None
+
+def get_prompt_index() -> PromptIndex:
+    """Get or create prompt index singleton"""
+    global _prompt_index
+    if _prompt_index is None:
+        _prompt_index = PromptIndex()
+    return _prompt_index
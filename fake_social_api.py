@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the TikTok and Instagram pages the metrics scrapers read
+Serves the oEmbed endpoint, TikTok video pages (__UNIVERSAL_DATA_FOR_REHYDRATION__)
+and Instagram reels (ld+json interactionStatistic) in the shape
+utils/social_scrapers_v2.py parses, behind a per-platform rate limit that
+answers 429 like the real sites do.
+
+Usage:
+    uvicorn fake_social_api:app --port 9100
+    python bench_metrics_refresh.py      # in-process, no server needed
+
+Env:
+    FAKE_SOCIAL_LATENCY          seconds per response (default 0.3)
+    FAKE_SOCIAL_RATE_TIKTOK      requests/second before 429s (default 1.5)
+    FAKE_SOCIAL_RATE_INSTAGRAM   requests/second before 429s (default 0.4)
+    FAKE_SOCIAL_RETRY_AFTER      Retry-After seconds on 429s (default unset:
+                                 no header, so clients fall back to backoff)
+"""
+import asyncio
+import json
+import os
+import time
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse
+
+app = FastAPI(title="Fake TikTok / Instagram")
+
+LATENCY = float(os.environ.get("FAKE_SOCIAL_LATENCY", "0.3"))
+RATES = {
+    "tiktok": float(os.environ.get("FAKE_SOCIAL_RATE_TIKTOK", "1.5")),
+    "instagram": float(os.environ.get("FAKE_SOCIAL_RATE_INSTAGRAM", "0.4"))
+}
+RETRY_AFTER = os.environ.get("FAKE_SOCIAL_RETRY_AFTER")
+
+stats = {"tiktok": 0, "instagram": 0, "throttled": 0}
+
+# platform -> [tokens, last refill]; burst of 2 requests
+_buckets = {platform: [2.0, time.monotonic()] for platform in RATES}
+
+
+def _allow(platform: str) -> bool:
+    """Server-side token bucket: False means answer 429"""
+    bucket = _buckets[platform]
+    now = time.monotonic()
+    bucket[0] = min(2.0, bucket[0] + (now - bucket[1]) * RATES[platform])
+    bucket[1] = now
+    if bucket[0] < 1:
+        return False
+    bucket[0] -= 1
+    return True
+
+
+async def _gate(platform: str):
+    """Latency + rate limit; returns a 429 response or None"""
+    await asyncio.sleep(LATENCY)
+    stats[platform] += 1
+    if _allow(platform):
+        return None
+    stats["throttled"] += 1
+    headers = {"Retry-After": RETRY_AFTER} if RETRY_AFTER else {}
+    return JSONResponse({"error": "Too Many Requests"}, status_code=429, headers=headers)
+
+
+def _counts(post_id: str) -> dict:
+    """Deterministic metrics that grow with time, so every refresh changes something"""
+    seed = sum(ord(c) for c in post_id)
+    minutes = int(time.time() // 60) % 10_000
+    return {"views": seed * 100 + minutes * 7, "likes": seed * 5 + minutes, "comments": seed % 50, "shares": seed % 13}
+
+
+@app.get("/oembed")
+async def tiktok_oembed(url: str):
+    throttled = await _gate("tiktok")
+    if throttled:
+        return throttled
+    return {"version": "1.0", "type": "video", "provider_name": "TikTok", "title": url}
+
+
+@app.get("/@{username}/video/{video_id}")
+async def tiktok_video(username: str, video_id: str):
+    throttled = await _gate("tiktok")
+    if throttled:
+        return throttled
+    counts = _counts(video_id)
+    data = {
+        "__DEFAULT_SCOPE__": {
+            "webapp.video-detail": {
+                "itemInfo": {
+                    "itemStruct": {
+                        "id": video_id,
+                        "stats": {
+                            "playCount": counts["views"],
+                            "diggCount": counts["likes"],
+                            "commentCount": counts["comments"],
+                            "shareCount": counts["shares"]
+                        }
+                    }
+                }
+            }
+        }
+    }
+    return HTMLResponse(
+        f'<html><body><script id="__UNIVERSAL_DATA_FOR_REHYDRATION__" type="application/json">'
+        f'{json.dumps(data)}</script></body></html>'
+    )
+
+
+@app.get("/{kind}/{shortcode}/")
+async def instagram_post(kind: str, shortcode: str):
+    if kind not in ("p", "reel"):
+        raise HTTPException(status_code=404, detail="Not found")
+    throttled = await _gate("instagram")
+    if throttled:
+        return throttled
+    counts = _counts(shortcode)
+    data = {
+        "@type": "VideoObject",
+        "interactionStatistic": [
+            {"interactionType": "http://schema.org/WatchAction", "userInteractionCount": counts["views"]},
+            {"interactionType": "http://schema.org/LikeAction", "userInteractionCount": counts["likes"]},
+            {"interactionType": "http://schema.org/CommentAction", "userInteractionCount": counts["comments"]}
+        ]
+    }
+    return HTMLResponse(f'<html><head><script type="application/ld+json">{json.dumps(data)}</script></head></html>')
+
+
+@app.get("/stats")
+async def get_stats():
+    """Requests per platform and how many were answered 429"""
+    return stats
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=9100)
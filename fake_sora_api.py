@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI videos (Sora 2) API
+Lets the generation queue run end to end without spending credits.
+
+Usage:
+    uvicorn fake_sora_api:app --port 9000
+    OPENAI_BASE_URL=http://localhost:9000/v1 python -m scheduler.generation_worker
+
+Env:
+    FAKE_SORA_SECONDS       time until a job completes (default 20)
+    FAKE_SORA_VIDEO_BYTES   size of the fake MP4 payload (default 2 MB)
+    FAKE_SORA_FAIL_RATE     fraction of jobs that end as "failed" (default 0)
+"""
+import os
+import random
+import time
+import uuid
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="Fake Sora 2 API")
+
+JOB_SECONDS = float(os.environ.get("FAKE_SORA_SECONDS", "20"))
+VIDEO_BYTES = int(os.environ.get("FAKE_SORA_VIDEO_BYTES", str(2 * 1024 * 1024)))
+FAIL_RATE = float(os.environ.get("FAKE_SORA_FAIL_RATE", "0"))
+
+# job_id -> {"created": float, "seconds": str, "fail": bool, "remixed_from": str}
+jobs = {}
+
+stats = {"create": 0, "status": 0, "content": 0}
+
+
+def _job_payload(job_id: str) -> dict:
+    job = jobs[job_id]
+    elapsed = time.time() - job["created"]
+    progress = min(int(elapsed / JOB_SECONDS * 100), 100)
+
+    if progress < 100:
+        status = "in_progress" if progress > 0 else "queued"
+    elif job["fail"]:
+        status = "failed"
+    else:
+        status = "completed"
+
+    payload = {
+        "id": job_id,
+        "object": "video",
+        "status": status,
+        "progress": progress,
+        "seconds": job["seconds"],
+        "remixed_from_video_id": job.get("remixed_from")
+    }
+    if status == "failed":
+        payload["error"] = {"message": "Fake generation failure"}
+    return payload
+
+
+def _new_job(seconds: str = "12", remixed_from: str = None) -> str:
+    job_id = f"video_{uuid.uuid4().hex[:24]}"
+    jobs[job_id] = {
+        "created": time.time(),
+        "seconds": seconds,
+        "fail": random.random() < FAIL_RATE,
+        "remixed_from": remixed_from
+    }
+    stats["create"] += 1
+    return job_id
+
+
+@app.post("/v1/videos")
+async def create_video(request: Request):
+    body = await request.json()
+    job_id = _new_job(str(body.get("seconds", "12")))
+    return _job_payload(job_id)
+
+
+@app.post("/v1/videos/{video_id}/remix")
+async def remix_video(video_id: str):
+    if video_id not in jobs:
+        raise HTTPException(status_code=404, detail="Video not found")
+    job_id = _new_job(jobs[video_id]["seconds"], remixed_from=video_id)
+    return _job_payload(job_id)
+
+
+@app.get("/v1/videos/{video_id}")
+async def get_video(video_id: str):
+    if video_id not in jobs:
+        raise HTTPException(status_code=404, detail="Video not found")
+    stats["status"] += 1
+    return _job_payload(video_id)
+
+
+@app.get("/v1/videos/{video_id}/content")
+async def get_video_content(video_id: str):
+    if video_id not in jobs or _job_payload(video_id)["status"] != "completed":
+        raise HTTPException(status_code=404, detail="Video not ready")
+    stats["content"] += 1
+
+    async def body():
+        chunk = os.urandom(64 * 1024)
+        sent = 0
+        while sent < VIDEO_BYTES:
+            piece = chunk[:min(len(chunk), VIDEO_BYTES - sent)]
+            sent += len(piece)
+            yield piece
+
+    return StreamingResponse(
+        body(),
+        media_type="video/mp4",
+        headers={"Content-Length": str(VIDEO_BYTES)}
+    )
+
+
+@app.get("/stats")
+async def get_stats():
+    """Request counters (e.g. status polls per completed video)"""
+    return {**stats, "jobs": len(jobs)}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=9000)
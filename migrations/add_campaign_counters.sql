@@ -0,0 +1,128 @@
+-- Campaign counters for /api/stats
+-- A single row kept up to date by triggers in the same transaction as the
+-- write, so the stats endpoint reads one row instead of two exact COUNT(*)s,
+-- an ORDER BY and a download of every post id.
+--
+-- Every counted write updates this one row (row lock held until commit);
+-- fine at our write rate of a few inserts per second.
+
+CREATE TABLE IF NOT EXISTS campaign_counters (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    total_creators BIGINT NOT NULL DEFAULT 0,
+    total_videos BIGINT NOT NULL DEFAULT 0,   -- status = 'ready'
+    total_posts BIGINT NOT NULL DEFAULT 0,
+    top_creator_views BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Full recount (initial seed, or after a TRUNCATE / bulk load with triggers off)
+CREATE OR REPLACE FUNCTION refresh_campaign_counters()
+RETURNS campaign_counters
+LANGUAGE sql
+AS $$
+    INSERT INTO campaign_counters (id, total_creators, total_videos, total_posts, top_creator_views, updated_at)
+    VALUES (
+        1,
+        (SELECT COUNT(*) FROM creators),
+        (SELECT COUNT(*) FROM videos WHERE status = 'ready'),
+        (SELECT COUNT(*) FROM posts),
+        (SELECT COALESCE(MAX(total_views), 0) FROM creators),
+        NOW()
+    )
+    ON CONFLICT (id) DO UPDATE SET
+        total_creators = EXCLUDED.total_creators,
+        total_videos = EXCLUDED.total_videos,
+        total_posts = EXCLUDED.total_posts,
+        top_creator_views = EXCLUDED.top_creator_views,
+        updated_at = NOW()
+    RETURNING *;
+$$;
+
+CREATE OR REPLACE FUNCTION count_creators()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE campaign_counters
+    SET total_creators = total_creators + CASE TG_OP WHEN 'INSERT' THEN 1 ELSE -1 END,
+        updated_at = NOW()
+    WHERE id = 1;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_ready_videos()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    delta INTEGER := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'ready' THEN
+        delta := delta + 1;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'ready' THEN
+        delta := delta - 1;
+    END IF;
+
+    IF delta <> 0 THEN
+        UPDATE campaign_counters
+        SET total_videos = total_videos + delta, updated_at = NOW()
+        WHERE id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_posts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE campaign_counters
+    SET total_posts = total_posts + CASE TG_OP WHEN 'INSERT' THEN 1 ELSE -1 END,
+        updated_at = NOW()
+    WHERE id = 1;
+    RETURN NULL;
+END;
+$$;
+
+-- Statement level: one index lookup (idx_creators_total_views) per
+-- recalculate_creator_stats() call, however many creators it touched
+CREATE OR REPLACE FUNCTION refresh_top_creator_views()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE campaign_counters
+    SET top_creator_views = (SELECT COALESCE(MAX(total_views), 0) FROM creators),
+        updated_at = NOW()
+    WHERE id = 1;
+    RETURN NULL;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_creators_total_views ON creators(total_views DESC, tg_user_id);
+
+DROP TRIGGER IF EXISTS campaign_count_creators ON creators;
+CREATE TRIGGER campaign_count_creators
+AFTER INSERT OR DELETE ON creators
+FOR EACH ROW EXECUTE FUNCTION count_creators();
+
+DROP TRIGGER IF EXISTS campaign_top_creator_views ON creators;
+CREATE TRIGGER campaign_top_creator_views
+AFTER INSERT OR DELETE OR UPDATE OF total_views ON creators
+FOR EACH STATEMENT EXECUTE FUNCTION refresh_top_creator_views();
+
+DROP TRIGGER IF EXISTS campaign_count_videos ON videos;
+CREATE TRIGGER campaign_count_videos
+AFTER INSERT OR DELETE OR UPDATE OF status ON videos
+FOR EACH ROW EXECUTE FUNCTION count_ready_videos();
+
+DROP TRIGGER IF EXISTS campaign_count_posts ON posts;
+CREATE TRIGGER campaign_count_posts
+AFTER INSERT OR DELETE ON posts
+FOR EACH ROW EXECUTE FUNCTION count_posts();
+
+-- Seed
+SELECT refresh_campaign_counters();
@@ -0,0 +1,61 @@
+-- Set-based creator stats recomputation
+-- One statement recomputes total_views / total_engagements / total_shares /
+-- total_videos for a single creator, a set of creators, or everyone:
+--
+--   SELECT recalculate_creator_stats(ARRAY[123]);       -- one creator
+--   SELECT recalculate_creator_stats(ARRAY[123, 456]);  -- a set
+--   SELECT recalculate_creator_stats();                 -- all creators
+--
+-- Returns the number of creators whose totals actually changed.
+
+CREATE INDEX IF NOT EXISTS idx_posts_user ON posts(tg_user_id);
+
+CREATE OR REPLACE FUNCTION recalculate_creator_stats(p_tg_user_ids BIGINT[] DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH post_totals AS (
+        SELECT
+            tg_user_id,
+            SUM(COALESCE(views, 0)) AS views,
+            SUM(COALESCE(likes, 0) + COALESCE(comments_count, 0) + COALESCE(shares, 0)) AS engagements,
+            SUM(COALESCE(shares, 0)) AS shares
+        FROM posts
+        WHERE p_tg_user_ids IS NULL OR tg_user_id = ANY(p_tg_user_ids)
+        GROUP BY tg_user_id
+    ),
+    video_totals AS (
+        SELECT tg_user_id, COUNT(*) AS videos
+        FROM videos
+        WHERE p_tg_user_ids IS NULL OR tg_user_id = ANY(p_tg_user_ids)
+        GROUP BY tg_user_id
+    ),
+    totals AS (
+        SELECT
+            c.tg_user_id,
+            COALESCE(p.views, 0) AS total_views,
+            COALESCE(p.engagements, 0) AS total_engagements,
+            COALESCE(p.shares, 0) AS total_shares,
+            COALESCE(v.videos, 0) AS total_videos
+        FROM creators c
+        LEFT JOIN post_totals p ON p.tg_user_id = c.tg_user_id
+        LEFT JOIN video_totals v ON v.tg_user_id = c.tg_user_id
+        WHERE p_tg_user_ids IS NULL OR c.tg_user_id = ANY(p_tg_user_ids)
+    ),
+    updated AS (
+        UPDATE creators c
+        SET
+            total_views = t.total_views,
+            total_engagements = t.total_engagements,
+            total_shares = t.total_shares,
+            total_videos = t.total_videos,
+            updated_at = NOW()
+        FROM totals t
+        WHERE c.tg_user_id = t.tg_user_id
+          -- Skip no-op writes (most creators don't change between metric ticks)
+          AND (c.total_views, c.total_engagements, c.total_shares, c.total_videos)
+              IS DISTINCT FROM (t.total_views, t.total_engagements, t.total_shares, t.total_videos)
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$;
@@ -0,0 +1,190 @@
+-- Epoch (ISO week) rankings from metrics history
+--
+-- metrics_hourly: one row per post per UTC hour holding the last snapshot
+-- taken in that hour, maintained by a trigger on metrics. Epoch queries read
+-- two buckets per post (last before the window, last inside it) through the
+-- (post_id, bucket) primary key instead of scanning every snapshot.
+--
+-- epoch_results: frozen ranking per closed epoch, written once by
+-- finalize_epoch() so settlement reads are O(1) and reproducible.
+-- epoch_finalized: one row per frozen epoch, so an epoch that ranked nobody
+-- is frozen too (late metrics can't give it winners afterwards).
+
+CREATE TABLE IF NOT EXISTS metrics_hourly (
+    post_id BIGINT NOT NULL REFERENCES posts(id) ON DELETE CASCADE,
+    bucket TIMESTAMPTZ NOT NULL,
+    views BIGINT DEFAULT 0,
+    likes BIGINT DEFAULT 0,
+    comments BIGINT DEFAULT 0,
+    shares BIGINT DEFAULT 0,
+    PRIMARY KEY (post_id, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_metrics_hourly_bucket ON metrics_hourly(bucket);
+
+CREATE OR REPLACE FUNCTION rollup_metrics_snapshot()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO metrics_hourly (post_id, bucket, views, likes, comments, shares)
+    VALUES (
+        NEW.post_id,
+        date_trunc('hour', COALESCE(NEW.snapshot_at, NOW()), 'UTC'),
+        COALESCE(NEW.views, 0),
+        COALESCE(NEW.likes, 0),
+        COALESCE(NEW.comments, 0),
+        COALESCE(NEW.shares, 0)
+    )
+    ON CONFLICT (post_id, bucket) DO UPDATE SET
+        views = EXCLUDED.views,
+        likes = EXCLUDED.likes,
+        comments = EXCLUDED.comments,
+        shares = EXCLUDED.shares;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS metrics_rollup_hourly ON metrics;
+CREATE TRIGGER metrics_rollup_hourly
+AFTER INSERT ON metrics
+FOR EACH ROW EXECUTE FUNCTION rollup_metrics_snapshot();
+
+-- Backfill existing history (last snapshot per post per hour)
+INSERT INTO metrics_hourly (post_id, bucket, views, likes, comments, shares)
+SELECT DISTINCT ON (post_id, date_trunc('hour', snapshot_at, 'UTC'))
+    post_id,
+    date_trunc('hour', snapshot_at, 'UTC'),
+    COALESCE(views, 0), COALESCE(likes, 0), COALESCE(comments, 0), COALESCE(shares, 0)
+FROM metrics
+WHERE snapshot_at IS NOT NULL
+ORDER BY post_id, date_trunc('hour', snapshot_at, 'UTC'), snapshot_at DESC, id DESC
+ON CONFLICT (post_id, bucket) DO NOTHING;
+
+-- Views gained per creator in [p_start, p_end)
+-- Per post: last value in the window minus the last value before it.
+-- Posts with no earlier snapshot start from 0 if they were submitted inside
+-- the window, otherwise from their first snapshot in the window (so old
+-- posts first tracked mid-week don't count their lifetime views).
+CREATE OR REPLACE FUNCTION compute_epoch_rankings(
+    p_start TIMESTAMPTZ,
+    p_end TIMESTAMPTZ,
+    p_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    rank INTEGER,
+    tg_user_id BIGINT,
+    username TEXT,
+    views_gained BIGINT,
+    posts_counted INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH window_posts AS (
+        SELECT DISTINCT post_id
+        FROM metrics_hourly
+        WHERE bucket >= p_start AND bucket < p_end
+    ),
+    per_post AS (
+        SELECT
+            p.id AS post_id,
+            p.tg_user_id,
+            p.submitted_at,
+            (SELECT h.views FROM metrics_hourly h
+              WHERE h.post_id = p.id AND h.bucket >= p_start AND h.bucket < p_end
+              ORDER BY h.bucket DESC LIMIT 1) AS end_views,
+            (SELECT h.views FROM metrics_hourly h
+              WHERE h.post_id = p.id AND h.bucket < p_start
+              ORDER BY h.bucket DESC LIMIT 1) AS before_views,
+            (SELECT h.views FROM metrics_hourly h
+              WHERE h.post_id = p.id AND h.bucket >= p_start AND h.bucket < p_end
+              ORDER BY h.bucket ASC LIMIT 1) AS first_views
+        FROM window_posts w
+        JOIN posts p ON p.id = w.post_id
+    ),
+    per_creator AS (
+        SELECT
+            tg_user_id,
+            SUM(GREATEST(
+                end_views - COALESCE(
+                    before_views,
+                    CASE WHEN submitted_at >= p_start THEN 0 ELSE first_views END
+                ),
+                0
+            ))::BIGINT AS views_gained,
+            COUNT(*)::INTEGER AS posts_counted
+        FROM per_post
+        GROUP BY tg_user_id
+    )
+    SELECT
+        ROW_NUMBER() OVER (ORDER BY pc.views_gained DESC, pc.tg_user_id)::INTEGER AS rank,
+        pc.tg_user_id,
+        c.username,
+        pc.views_gained,
+        pc.posts_counted
+    FROM per_creator pc
+    JOIN creators c ON c.tg_user_id = pc.tg_user_id
+    WHERE pc.views_gained > 0
+    ORDER BY pc.views_gained DESC, pc.tg_user_id
+    LIMIT p_limit;
+$$;
+
+CREATE TABLE IF NOT EXISTS epoch_results (
+    epoch_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    tg_user_id BIGINT NOT NULL,
+    username TEXT,
+    views_gained BIGINT NOT NULL,
+    posts_counted INTEGER NOT NULL,
+    week_start TIMESTAMPTZ NOT NULL,
+    week_end TIMESTAMPTZ NOT NULL,
+    computed_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (epoch_id, rank)
+);
+
+CREATE TABLE IF NOT EXISTS epoch_finalized (
+    epoch_id INTEGER PRIMARY KEY,
+    ranked INTEGER NOT NULL,
+    finalized_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Epochs frozen before epoch_finalized existed
+INSERT INTO epoch_finalized (epoch_id, ranked)
+SELECT epoch_id, COUNT(*) FROM epoch_results GROUP BY epoch_id
+ON CONFLICT (epoch_id) DO NOTHING;
+
+-- Freeze a closed epoch's ranking. Idempotent: a finalized epoch (even an
+-- empty one) is returned as stored, never recomputed.
+CREATE OR REPLACE FUNCTION finalize_epoch(
+    p_epoch_id INTEGER,
+    p_start TIMESTAMPTZ,
+    p_end TIMESTAMPTZ,
+    p_limit INTEGER DEFAULT 10
+)
+RETURNS SETOF epoch_results
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_end > NOW() THEN
+        RAISE EXCEPTION 'Epoch % is still open (ends %)', p_epoch_id, p_end;
+    END IF;
+
+    -- Serialize concurrent finalizers of the same epoch
+    PERFORM pg_advisory_xact_lock(p_epoch_id);
+
+    IF NOT EXISTS (SELECT 1 FROM epoch_finalized WHERE epoch_id = p_epoch_id) THEN
+        INSERT INTO epoch_results (
+            epoch_id, rank, tg_user_id, username, views_gained, posts_counted, week_start, week_end
+        )
+        SELECT p_epoch_id, r.rank, r.tg_user_id, r.username, r.views_gained, r.posts_counted, p_start, p_end
+        FROM compute_epoch_rankings(p_start, p_end, p_limit) r;
+
+        INSERT INTO epoch_finalized (epoch_id, ranked)
+        SELECT p_epoch_id, COUNT(*) FROM epoch_results WHERE epoch_id = p_epoch_id;
+    END IF;
+
+    RETURN QUERY
+    SELECT * FROM epoch_results WHERE epoch_id = p_epoch_id ORDER BY rank;
+END;
+$$;
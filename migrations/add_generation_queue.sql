@@ -0,0 +1,73 @@
+-- Durable generation queue on top of the videos table
+-- Handlers insert rows with status 'queued'; workers claim them with a lease.
+-- A crashed/redeployed worker stops renewing its lease, so the row becomes
+-- claimable again and the next worker resumes polling the stored sora_job_id.
+
+ALTER TABLE videos
+ADD COLUMN IF NOT EXISTS tg_chat_id BIGINT,
+ADD COLUMN IF NOT EXISTS status_message_id BIGINT,
+ADD COLUMN IF NOT EXISTS lease_owner TEXT,
+ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS attempts INT DEFAULT 0,
+ADD COLUMN IF NOT EXISTS last_error TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_videos_queue ON videos(status, created_at)
+    WHERE status IN ('queued', 'generating');
+
+-- Claim the next runnable job, fairly between creators.
+-- Each active row gets a turn: 1 + the creator's older queued/generating
+-- rows. Jobs are claimed by turn, then age. A creator who queues 30 videos
+-- gets one claimed per round, interleaved with everybody else's; creators
+-- with jobs already running wait behind those with none.
+-- A 'queued' row with a future lease_expires_at was requeued after a
+-- transient failure and is backing off until then.
+-- 'generating' rows without a lease are inline generations (/create outside
+-- the queue). They are only reclaimed after p_orphan_seconds, once the inline
+-- run must be dead: a live one can wait on Sora for the whole
+-- SORA_JOB_DEADLINE_SECONDS and would otherwise be delivered twice.
+DROP FUNCTION IF EXISTS claim_generation_job(TEXT, INT);
+CREATE OR REPLACE FUNCTION claim_generation_job(p_worker_id TEXT, p_lease_seconds INT DEFAULT 120, p_orphan_seconds INT DEFAULT 1200)
+RETURNS SETOF videos AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE videos v
+    SET status = 'generating',
+        lease_owner = p_worker_id,
+        lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = COALESCE(v.attempts, 0) + 1
+    WHERE v.id = (
+        SELECT q.id
+        FROM videos q
+        JOIN (
+            -- Window functions can't share a level with FOR UPDATE
+            SELECT a.id, row_number() OVER (PARTITION BY a.tg_user_id ORDER BY a.created_at, a.id) AS turn
+            FROM videos a
+            WHERE a.status IN ('queued', 'generating')
+        ) t ON t.id = q.id
+        WHERE (q.status = 'queued'
+               AND (q.lease_expires_at IS NULL OR q.lease_expires_at < NOW()))
+           OR (q.status = 'generating'
+               AND COALESCE(q.lease_expires_at, q.created_at + make_interval(secs => p_orphan_seconds)) < NOW())
+        ORDER BY t.turn, q.created_at
+        LIMIT 1
+        FOR UPDATE OF q SKIP LOCKED
+    )
+    RETURNING v.*;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Heartbeat: only the current lease owner can extend it. Ownership alone
+-- decides: save_video flips the row to 'ready' while the worker is still
+-- delivering, and that must not look like a lost lease. A takeover always
+-- rewrites lease_owner, so a stale owner still fails here.
+CREATE OR REPLACE FUNCTION renew_generation_lease(p_video_id BIGINT, p_worker_id TEXT, p_lease_seconds INT DEFAULT 120)
+RETURNS SETOF BIGINT AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE videos
+    SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id = p_video_id
+      AND lease_owner = p_worker_id
+    RETURNING id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,47 @@
+-- Leaderboard snapshot
+-- Ranks every creator by total_views (ties: lowest tg_user_id first, same as
+-- the in-process RankIndex) and upserts the denormalized leaderboard table.
+-- rank_change = previous snapshot rank - new rank (positive = climbed).
+--
+--   SELECT recalculate_leaderboard();  -- returns rows written
+
+CREATE INDEX IF NOT EXISTS idx_creators_total_views ON creators(total_views DESC, tg_user_id);
+
+CREATE OR REPLACE FUNCTION recalculate_leaderboard()
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH ranked AS (
+        SELECT
+            tg_user_id,
+            username,
+            COALESCE(total_videos, 0) AS total_videos,
+            COALESCE(total_views, 0) AS total_views,
+            COALESCE(total_shares, 0) AS total_shares,
+            COALESCE(total_engagements, 0) AS total_engagements,
+            ROW_NUMBER() OVER (ORDER BY COALESCE(total_views, 0) DESC, tg_user_id) AS rank
+        FROM creators
+    ),
+    upserted AS (
+        INSERT INTO leaderboard (
+            tg_user_id, username, total_videos, total_views, total_shares,
+            total_engagements, rank, rank_change, updated_at
+        )
+        SELECT
+            r.tg_user_id, r.username, r.total_videos, r.total_views, r.total_shares,
+            r.total_engagements, r.rank, COALESCE(l.rank - r.rank, 0), NOW()
+        FROM ranked r
+        LEFT JOIN leaderboard l ON l.tg_user_id = r.tg_user_id
+        ON CONFLICT (tg_user_id) DO UPDATE SET
+            username = EXCLUDED.username,
+            total_videos = EXCLUDED.total_videos,
+            total_views = EXCLUDED.total_views,
+            total_shares = EXCLUDED.total_shares,
+            total_engagements = EXCLUDED.total_engagements,
+            rank = EXCLUDED.rank,
+            rank_change = EXCLUDED.rank_change,
+            updated_at = NOW()
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM upserted;
+$$;
@@ -0,0 +1,14 @@
+-- Per-post metrics refresh schedule
+-- The metrics scheduler only scrapes posts whose next_metrics_at is due;
+-- the interval shrinks for fresh / fast-growing posts and grows for stale ones.
+ALTER TABLE posts
+ADD COLUMN IF NOT EXISTS next_metrics_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS views_per_hour DOUBLE PRECISION DEFAULT 0;
+
+-- Everything already tracked is due on the first tick
+UPDATE posts SET next_metrics_at = NOW() WHERE next_metrics_at IS NULL;
+
+-- Due-post scan: WHERE next_metrics_at <= NOW() ORDER BY next_metrics_at
+CREATE INDEX IF NOT EXISTS idx_posts_next_metrics
+ON posts(next_metrics_at NULLS FIRST)
+WHERE post_url IS NOT NULL;
@@ -0,0 +1,21 @@
+-- Gallery keyset pagination
+-- public_url is the URL the gallery plays (watermarked first, then raw),
+-- NULL when the video isn't publicly playable (missing, not http, or an
+-- OpenAI content URL that needs our API key). Filtering on it in SQL means a
+-- page always has `limit` rows when that many exist, instead of Python
+-- dropping rows after the fetch.
+ALTER TABLE videos
+ADD COLUMN IF NOT EXISTS public_url TEXT GENERATED ALWAYS AS (
+    CASE
+        WHEN COALESCE(NULLIF(watermarked_url, ''), video_url) LIKE 'http%'
+         AND COALESCE(NULLIF(watermarked_url, ''), video_url) NOT LIKE 'https://api.openai.com/%'
+        THEN COALESCE(NULLIF(watermarked_url, ''), video_url)
+    END
+) STORED;
+
+-- Keyset scan: WHERE status = 'ready' AND public_url IS NOT NULL
+--              AND (created_at, id) < (:cursor_created_at, :cursor_id)
+--              ORDER BY created_at DESC, id DESC LIMIT n
+CREATE INDEX IF NOT EXISTS idx_videos_gallery
+ON videos(created_at DESC, id DESC)
+WHERE status = 'ready' AND public_url IS NOT NULL;
@@ -0,0 +1,9 @@
+-- Gallery previews rendered after generation (agent/tools/previews.py)
+-- thumbnail_url (already in schema.sql) holds the poster frame; these add
+-- the short muted preview loop and the hover-scrub sprite sheet. sprite_meta
+-- is the grid layout the client needs to crop frames out of the sheet:
+-- {"columns", "rows", "frames", "tile_width", "tile_height", "interval_seconds"}
+ALTER TABLE videos
+ADD COLUMN IF NOT EXISTS preview_url TEXT,
+ADD COLUMN IF NOT EXISTS sprite_url TEXT,
+ADD COLUMN IF NOT EXISTS sprite_meta JSONB;
@@ -0,0 +1,9 @@
+-- Adaptive gallery playback (agent/tools/transcode.py)
+-- hls_url is the master playlist over the rendition ladder, fallback_url a
+-- faststart MP4 for players without HLS. renditions records each encode:
+-- [{"name", "width", "height", "bandwidth", "average_bandwidth", "size",
+--   "segments", "playlist_url", "codecs", "encode_seconds"}]
+ALTER TABLE videos
+ADD COLUMN IF NOT EXISTS hls_url TEXT,
+ADD COLUMN IF NOT EXISTS fallback_url TEXT,
+ADD COLUMN IF NOT EXISTS renditions JSONB;
@@ -1,20 +1,21 @@
 #!/usr/bin/env python3
 """
 Re-process videos from October 14, 2025
-Downloads from OpenAI and uploads to Supabase Storage
+Downloads from OpenAI into the content-addressed store (utils/content_store.py);
+re-runs skip files that are already stored and resume interrupted uploads
 """
 import asyncio
 import httpx
 from supabase import create_client
 from config.settings import settings
-from utils.storage import get_storage
+from utils.content_store import get_content_store
 from loguru import logger
 
 async def reprocess_videos():
     """Download videos from OpenAI and upload to Supabase"""
 
     supabase = create_client(settings.supabase_url, settings.supabase_service_key or settings.supabase_key)
-    storage = get_storage()
+    store = get_content_store()
 
     print("=" * 80)
     print("🔄 RE-PROCESSING VIDEOS FROM OCTOBER 14, 2025")
@@ -37,11 +38,11 @@ async def reprocess_videos():
     success_count = 0
     error_count = 0
     skip_count = 0
+    downloaded_bytes = 0
 
     for i, video in enumerate(videos, 1):
         video_id = video['id']
         video_url = video.get('video_url', '')
-        job_id = video.get('sora_job_id', f'video_{video_id}')
 
         print(f"\n{'='*80}")
         print(f"📹 Video {i}/{len(videos)} - ID: {video_id}")
@@ -61,47 +62,37 @@ async def reprocess_videos():
             continue
 
         try:
-            print(f"   ⬇️  Downloading from OpenAI...")
+            print(f"   ⬇️  Streaming from OpenAI into the content store...")
 
-            # Download video
+            # Hashed while downloading; only uploaded if this exact file isn't stored yet,
+            # and an interrupted upload resumes on the next run
             async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.get(
+                async with client.stream(
+                    "GET",
                     video_url,
                     headers={"Authorization": f"Bearer {settings.openai_api_key}"},
                     follow_redirects=True
-                )
-
-                if response.status_code != 200:
-                    print(f"   ❌ ERROR: Download failed - {response.status_code}")
-                    print(f"      Response: {response.text[:200]}")
-                    error_count += 1
-                    continue
-
-                video_bytes = response.content
-                size_mb = len(video_bytes) / (1024 * 1024)
-                print(f"   ✅ Downloaded {size_mb:.2f} MB")
-
-            # Upload to Supabase Storage
-            print(f"   ⬆️  Uploading to Supabase Storage...")
-
-            filename = f"{job_id}.mp4"
-            public_video_url, public_thumbnail_url = await storage.upload_video(
-                video_bytes,
-                filename=filename
-            )
-
-            print(f"   ✅ Uploaded successfully!")
-            print(f"      Video: {public_video_url[:60]}...")
-            print(f"      Thumb: {public_thumbnail_url[:60]}...")
+                ) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        print(f"   ❌ ERROR: Download failed - {response.status_code}")
+                        print(f"      Response: {response.text[:200]}")
+                        error_count += 1
+                        continue
+
+                    stored = await store.put_stream(response.aiter_bytes(), content_type="video/mp4")
+
+            downloaded_bytes += stored["size"]
+            size_mb = stored["size"] / (1024 * 1024)
+            if stored["uploaded"]:
+                print(f"   ✅ Downloaded {size_mb:.2f} MB, uploaded {stored['bytes_sent'] / (1024 * 1024):.2f} MB")
+            else:
+                print(f"   ♻️  Downloaded {size_mb:.2f} MB, already stored - nothing uploaded")
+            print(f"      Video: {stored['url'][:60]}...")
 
             # Update database
             print(f"   💾 Updating database...")
-            update_data = {
-                "video_url": public_video_url,
-                "thumbnail_url": public_thumbnail_url
-            }
-
-            supabase.table('videos').update(update_data).eq('id', video_id).execute()
+            supabase.table('videos').update({"video_url": stored["url"]}).eq('id', video_id).execute()
 
             print(f"   ✅ Database updated!")
             success_count += 1
@@ -120,6 +111,11 @@ async def reprocess_videos():
     print(f"   ❌ Errors: {error_count}")
     print(f"   ⏭️  Skipped: {skip_count}")
     print(f"   📹 Total: {len(videos)}")
+    stats = store.snapshot()
+    print(f"   ⬇️  Downloaded: {downloaded_bytes / (1024 * 1024):.1f} MB")
+    print(f"   ⬆️  Uploaded: {stats['bytes_uploaded'] / (1024 * 1024):.1f} MB "
+          f"(skipped {stats['bytes_deduplicated'] / (1024 * 1024):.1f} MB already stored, "
+          f"{stats['bytes_resumed'] / (1024 * 1024):.1f} MB resumed)")
     print()
 
     if success_count > 0:
@@ -0,0 +1,300 @@
+"""
+Durable generation queue worker
+Claims queued videos with a lease, runs Sora 2 generation and delivers the
+result to Telegram. Telegram handlers only enqueue (see enqueue_video_simple).
+
+If a worker dies (crash, Railway redeploy) it stops renewing its lease; once
+the lease expires another worker claims the row and resumes polling the
+stored sora_job_id instead of paying for a new generation.
+
+Run standalone (e.g. as a separate Railway service with GENERATION_WORKERS=0 on web):
+    python -m scheduler.generation_worker
+"""
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from loguru import logger
+from config.settings import settings
+from db.client import db
+from utils.progress import get_progress_hub
+from utils.status_updates import get_status_editor
+from utils.telegram_notifier import notifier
+
+
+# Download + save time after the Sora deadline before a lease-less inline run counts as dead
+INLINE_FINALIZE_SECONDS = 300
+
+NEXT_STEPS_MESSAGE = (
+    "✅ **¡Video listo!**\n\n"
+    "📤 **Siguientes pasos:**\n"
+    "1. Descarga el video de arriba\n"
+    "2. Publícalo en TikTok/X/Instagram\n"
+    "3. Usa `/posted [url]` para comenzar el seguimiento\n\n"
+    "💡 Consejo: ¡Publica en horas pico (6-8 PM) para máximo alcance!\n\n"
+    "🌐 **Ver todos los videos:** www.ethcreators.app"
+)
+
+NO_CREDITS_MESSAGE = (
+    "🎬💸 **¡Ups! Nos quedamos sin créditos de IA!** 💸🎬\n\n"
+    "🤖 *El robot de videos se quedó sin combustible...*\n\n"
+    "😅 Generar videos con Sora 2 cuesta ~$4 USD por video,\n"
+    "¡y parece que gastamos todo el presupuesto del mes! 🫠\n\n"
+    "📢 **¡Pero no te preocupes!**\n"
+    "Los admins ya están recargando la cuenta. 🔋⚡\n\n"
+    "⏰ **Vuelve en unas horas** y podrás crear tu video.\n\n"
+    "🌐 Mientras tanto, mira los videos existentes en:\n"
+    "www.ethcreators.app\n\n"
+    "💡 *Consejo:* ¡Síguenos en @ETHCreators para saber cuándo volvemos! 🚀"
+)
+
+
+def _format_eta(seconds) -> str:
+    if seconds is None:
+        return "calculando..."
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"~{max(seconds, 5)} s"
+    return f"~{seconds // 60} min {seconds % 60:02d} s"
+
+
+def progress_message(job: Dict, event: Dict) -> str:
+    """Status message text for a progress event (real Sora progress and ETA)"""
+    progress = int(event.get("progress") or 0)
+    filled = progress // 10
+    bar = "▓" * filled + "░" * (10 - filled)
+
+    stage = event.get("stage")
+    if stage == "uploading":
+        headline = "📤 **¡Video generado! Subiéndolo...**"
+    elif stage == "queued":
+        headline = "🕐 **En la cola de Sora 2...**"
+    else:
+        headline = "🎬 **Generando tu video con IA...**"
+
+    message = f"{headline}\n\n"
+    message += f"🆔 **Video ID:** #{job['id']}\n"
+    message += f"📝 **Tu Prompt:** _{job.get('prompt', '')}_\n\n"
+    if stage == "queued" and event.get("position"):
+        message += f"🚦 **Posición en la cola:** {event['position']}\n"
+    else:
+        message += f"{bar} {progress}%\n"
+    if stage != "uploading":
+        message += f"⏳ **Tiempo restante:** {_format_eta(event.get('eta_seconds'))}\n"
+    message += "\n📬 Te enviaremos el video aquí en cuanto esté listo."
+    return message
+
+
+class GenerationWorker:
+    """Pulls jobs from the videos table queue and runs them to completion"""
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._running = False
+
+    async def run(self) -> None:
+        """Claim and process jobs until stop() is called"""
+        self._running = True
+        logger.info(f"👷 Generation worker {self.worker_id} started")
+
+        while self._running:
+            try:
+                job = await db.claim_generation_job(
+                    self.worker_id,
+                    settings.generation_lease_seconds,
+                    int(settings.sora_job_deadline_seconds + INLINE_FINALIZE_SECONDS)
+                )
+            except Exception as e:
+                logger.error(f"❌ Worker {self.worker_id} could not claim a job: {e}")
+                await asyncio.sleep(settings.generation_poll_interval * 5)
+                continue
+
+            if not job:
+                await asyncio.sleep(settings.generation_poll_interval)
+                continue
+
+            try:
+                await self.process(job)
+            except Exception as e:
+                # Lease lapses on its own, so another claim retries the job; keep this worker alive
+                logger.error(f"❌ Worker {self.worker_id} failed processing video {job.get('id')}: {e}")
+                import traceback
+                logger.error(traceback.format_exc())
+
+        logger.info(f"👋 Generation worker {self.worker_id} stopped")
+
+    def stop(self) -> None:
+        """Finish the current job and exit the loop"""
+        self._running = False
+
+    async def process(self, job: Dict) -> Dict:
+        """Run one claimed job: generate (or resume), finalize and deliver"""
+        video_id = job["id"]
+        attempts = job.get("attempts") or 1
+
+        if job.get("sora_job_id"):
+            logger.info(f"👷 [{self.worker_id}] Resuming video {video_id} (Sora job {job['sora_job_id']}, attempt {attempts})")
+        else:
+            logger.info(f"👷 [{self.worker_id}] Claimed video {video_id} (attempt {attempts})")
+
+        if attempts > settings.generation_max_attempts:
+            logger.error(f"❌ Video {video_id} exceeded {settings.generation_max_attempts} attempts, giving up")
+            await db.release_generation_lease(video_id, status="failed", last_error="Too many attempts")
+            result = {"success": False, "error": "Too many attempts"}
+            await self._deliver_failure(job, result)
+            return result
+
+        from simple_flow import process_video_job
+        flow = asyncio.create_task(process_video_job(job, notify_user=False))
+        heartbeat = asyncio.create_task(self._heartbeat(video_id))
+        relay = asyncio.create_task(self._relay_progress(job)) if job.get("status_message_id") else None
+        try:
+            # The heartbeat only returns when another worker has taken the job over
+            await asyncio.wait({flow, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (flow, heartbeat, relay):
+                if task is None or task.done():
+                    continue
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        if not flow.done() or flow.cancelled():
+            # Lease lost: the new owner resumes the job and delivers it, so don't touch the row
+            logger.warning(f"⚠️ Worker {self.worker_id} stopped video {video_id} after losing its lease")
+            return {"success": False, "error": "Lease lost"}
+        result = flow.result()
+
+        if result.get("success"):
+            await db.release_generation_lease(video_id, last_error=None)
+            await self._deliver_video(job, result)
+        elif result.get("retryable") and attempts < settings.generation_max_attempts:
+            # Transient error (DB, network): back off and requeue; the user only hears about the final outcome
+            backoff = settings.generation_retry_backoff_seconds * 2 ** (attempts - 1)
+            logger.warning(f"🔁 Video {video_id} failed on attempt {attempts}, retrying in {backoff:.0f}s: {result.get('error')}")
+            await db.release_generation_lease(
+                video_id,
+                status="queued",
+                lease_expires_at=(datetime.now(timezone.utc) + timedelta(seconds=backoff)).isoformat(),
+                last_error=result.get("error")
+            )
+        else:
+            await db.release_generation_lease(video_id, status="failed", last_error=result.get("error"))
+            await self._deliver_failure(job, result)
+
+        return result
+
+    async def _heartbeat(self, video_id: int) -> None:
+        """Keep the lease alive while the job is running; returns once the lease is lost"""
+        interval = max(settings.generation_lease_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await db.renew_generation_lease(video_id, self.worker_id, settings.generation_lease_seconds)
+                if not renewed:
+                    logger.warning(f"⚠️ Worker {self.worker_id} lost the lease on video {video_id}")
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew lease on video {video_id}: {e}")
+
+    async def _relay_progress(self, job: Dict) -> None:
+        """Mirror the job's progress channel into its Telegram status message"""
+        chat_id = job.get("tg_chat_id") or job["tg_user_id"]
+        editor = get_status_editor()
+        try:
+            async for event in get_progress_hub().subscribe(job["id"]):
+                editor.update(chat_id, job["status_message_id"], progress_message(job, event))
+        except Exception as e:
+            logger.warning(f"Progress relay for video {job['id']} stopped: {e}")
+
+    async def _deliver_video(self, job: Dict, result: Dict) -> None:
+        """Send the finished video (by public URL) and the next-steps message"""
+        chat_id = job.get("tg_chat_id") or job["tg_user_id"]
+        video_url = result.get("video_url") or ""
+        caption = result.get("caption") or ""
+        hashtags = result.get("hashtags") or ""
+
+        video_caption = f"✅ **¡Video Listo!**\n\n"
+        video_caption += f"🆔 Video ID: #{result.get('video_id')}\n\n"
+        video_caption += f"{caption}\n\n{hashtags}" if caption or hashtags else "¡Mira este increíble video con IA!"
+
+        await self._clear_status_message(job)
+
+        # OpenAI content URLs need our API key, so Telegram can only fetch public storage URLs
+        is_public_url = video_url.startswith("http") and not video_url.startswith(settings.openai_base_url)
+
+        sent = False
+        if is_public_url:
+            sent = await notifier.send_video(chat_id, video_url, caption=video_caption)
+
+        if not sent:
+            await notifier.send_message(
+                chat_id,
+                f"✅ **Video generated!**\n\n"
+                f"{caption}\n\n{hashtags}\n\n"
+                f"⚠️ Could not send to Telegram directly.\n"
+                f"🆔 Video ID: #{result.get('video_id')}"
+            )
+
+        await notifier.send_message(chat_id, NEXT_STEPS_MESSAGE)
+
+    async def _deliver_failure(self, job: Dict, result: Dict) -> None:
+        """Tell the user their generation failed"""
+        chat_id = job.get("tg_chat_id") or job["tg_user_id"]
+        await self._clear_status_message(job)
+
+        if "NO_CREDITS_AVAILABLE" in (result.get("error") or ""):
+            await notifier.send_message(chat_id, NO_CREDITS_MESSAGE)
+        else:
+            await notifier.send_message(
+                chat_id,
+                f"❌ **No pudimos generar tu video** (ID #{job['id']})\n\n"
+                f"Por favor intenta de nuevo con `/create`.\n\n"
+                f"🌐 **Ver galería:** www.ethcreators.app"
+            )
+
+    async def _clear_status_message(self, job: Dict) -> None:
+        """Delete the processing message posted by /create"""
+        if job.get("status_message_id"):
+            await get_status_editor().finish(job.get("tg_chat_id") or job["tg_user_id"], job["status_message_id"])
+            await notifier.delete_message(job.get("tg_chat_id") or job["tg_user_id"], job["status_message_id"])
+
+
+def start_generation_workers(count: int) -> list:
+    """Start `count` in-process workers as asyncio tasks. Returns [(worker, task)]"""
+    workers = []
+    for _ in range(count):
+        worker = GenerationWorker()
+        workers.append((worker, asyncio.create_task(worker.run())))
+    return workers
+
+
+async def stop_generation_workers(workers: list) -> None:
+    """Stop in-process workers; in-flight jobs are resumed by the next claimer"""
+    for worker, task in workers:
+        worker.stop()
+        task.cancel()
+    for _, task in workers:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def main():
+    """Run a pool of workers in this process until interrupted"""
+    count = max(settings.generation_workers, 1)
+    logger.info(f"🚀 Starting {count} generation worker(s)")
+    workers = start_generation_workers(count)
+    try:
+        await asyncio.gather(*(task for _, task in workers))
+    finally:
+        await stop_generation_workers(workers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
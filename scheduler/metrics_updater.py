@@ -3,95 +3,267 @@ Automatic metrics updater for social media posts
 Runs periodically to refresh metrics from TikTok, Instagram, etc.
 """
 import asyncio
-from datetime import datetime
-from typing import List, Dict
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Set
 from loguru import logger
+from config.settings import settings
 from db.client import Database
+from db.leaderboard import get_leaderboard
+from utils.rate_limit import TokenBucket, backoff_delay
 from utils.social_scrapers_v2 import scrape_social_metrics
 
 
+# Refresh interval by post age (hours): fresh posts move fast, old ones barely change
+AGE_REFRESH_TIERS = [
+    (24, timedelta(minutes=30)),
+    (72, timedelta(hours=2)),
+    (7 * 24, timedelta(hours=6)),
+    (30 * 24, timedelta(hours=24)),
+]
+STALE_REFRESH_INTERVAL = timedelta(days=3)
+MIN_REFRESH_INTERVAL = timedelta(minutes=15)
+MAX_REFRESH_INTERVAL = timedelta(days=7)
+FAILED_REFRESH_INTERVAL = timedelta(hours=6)
+
+# Views/hour above which a post is refreshed twice as often, below which half as often
+FAST_VIEWS_PER_HOUR = 1000
+SLOW_VIEWS_PER_HOUR = 1
+
+
+def _parse_ts(value) -> Optional[datetime]:
+    """Parse a Supabase timestamp into an aware datetime"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def post_age_hours(post: Dict, now: datetime) -> float:
+    """Hours since the post was submitted"""
+    submitted = _parse_ts(post.get("submitted_at"))
+    if submitted is None:
+        return 0.0
+    return max((now - submitted).total_seconds() / 3600, 0.0)
+
+
+def views_per_hour(post: Dict, new_views: int, now: datetime) -> float:
+    """View velocity since the previous sync (or since submission on first sync)"""
+    since = _parse_ts(post.get("last_metrics_sync")) or _parse_ts(post.get("submitted_at"))
+    if since is None:
+        return 0.0
+    hours = max((now - since).total_seconds() / 3600, 1 / 60)
+    return max(new_views - (post.get("views") or 0), 0) / hours
+
+
+def next_refresh_interval(age_hours: float, velocity: float) -> timedelta:
+    """How long until a post should be scraped again"""
+    interval = STALE_REFRESH_INTERVAL
+    for max_age, tier_interval in AGE_REFRESH_TIERS:
+        if age_hours < max_age:
+            interval = tier_interval
+            break
+
+    if velocity >= FAST_VIEWS_PER_HOUR:
+        interval /= 2
+    elif velocity < SLOW_VIEWS_PER_HOUR and age_hours >= 24:
+        interval *= 2
+
+    return min(max(interval, MIN_REFRESH_INTERVAL), MAX_REFRESH_INTERVAL)
+
+
 class MetricsUpdater:
     """Periodically updates metrics for all social media posts"""
 
     def __init__(self):
         self.db = Database()
+        self._platform_rates = {
+            "tiktok": settings.metrics_rate_tiktok,
+            "instagram": settings.metrics_rate_instagram
+        }
+        self._buckets: Dict[str, TokenBucket] = {}
 
     async def update_all_metrics(self) -> Dict[str, int]:
         """
-        Update metrics for all posts in the database
+        Update metrics for all posts in the database (manual full rescan)
         Returns summary of updates
         """
-        logger.info("🔄 Starting automatic metrics update...")
+        logger.info("🔄 Starting full metrics update...")
 
         # Get all posts that have URLs
-        posts_result = self.db.client.table("posts") \
-            .select("id, post_url, platform, tg_user_id, video_id") \
-            .not_.is_("post_url", "null") \
-            .execute()
+        posts_result = await self.db.execute(
+            self.db.client.table("posts")
+            .select("id, post_url, platform, tg_user_id, video_id, submitted_at, views, last_metrics_sync")
+            .not_.is_("post_url", "null")
+        )
 
-        stats = {
-            "total_posts": len(posts_result.data),
-            "updated": 0,
-            "failed": 0,
-            "skipped": 0
-        }
+        return await self._refresh_posts(posts_result.data)
 
-        for post in posts_result.data:
-            try:
-                post_id = post["id"]
-                url = post["post_url"]
-                platform = post["platform"]
-                tg_user_id = post["tg_user_id"]
-
-                logger.info(f"Updating metrics for post {post_id} ({platform})")
+    async def update_due_metrics(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Scheduler tick: refresh only posts whose next_metrics_at is due
+        Each refreshed post is rescheduled from its age and view velocity.
+        Returns summary of updates
+        """
+        posts = await self.db.get_posts_for_tracking(limit or settings.metrics_batch_size)
 
-                # Scrape metrics
-                metrics = await scrape_social_metrics(url, platform)
+        if not posts:
+            logger.debug("📊 No posts due for metrics refresh")
+            return {"total_posts": 0, "updated": 0, "failed": 0, "skipped": 0, "rate_limited": 0}
 
-                if metrics.get("success"):
-                    # Update post metrics
-                    await self.db.update_post_metrics(post_id, metrics)
+        logger.info(f"🔄 {len(posts)} post(s) due for metrics refresh")
+        return await self._refresh_posts(posts)
 
-                    # Recalculate creator stats
-                    await self.db.recalculate_creator_stats(tg_user_id)
+    async def _refresh_posts(self, posts: List[Dict]) -> Dict[str, int]:
+        """
+        Refresh a set of posts
+        Posts are scraped by a bounded pool of workers; each platform has its
+        own token bucket so TikTok and Instagram are throttled independently.
+        Creator stats are recomputed once per affected creator at the end.
+        """
+        started = time.monotonic()
 
-                    stats["updated"] += 1
-                    logger.success(f"✅ Updated post {post_id}: {metrics.get('views', 0)} views")
-                else:
-                    error_msg = metrics.get("error", "Unknown error")
-                    logger.warning(f"⚠️ Failed to scrape post {post_id}: {error_msg}")
+        stats = {
+            "total_posts": len(posts),
+            "updated": 0,
+            "failed": 0,
+            "skipped": 0,
+            "rate_limited": 0
+        }
+        touched_creators: Set[int] = set()
 
-                    # Save error to database
-                    self.db.client.table("posts").update({
-                        "metrics_fetch_error": error_msg
-                    }).eq("id", post_id).execute()
+        queue: asyncio.Queue = asyncio.Queue()
+        for post in posts:
+            queue.put_nowait(post)
 
+        async def worker():
+            while True:
+                try:
+                    post = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    if await self._refresh_post(post, stats):
+                        touched_creators.add(post["tg_user_id"])
+                except Exception as e:
+                    logger.error(f"❌ Error updating post {post.get('id')}: {e}")
                     stats["failed"] += 1
 
-                # Add delay to avoid rate limiting
-                await asyncio.sleep(2)
+        concurrency = max(1, min(settings.metrics_concurrency, len(posts)))
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
 
-            except Exception as e:
-                logger.error(f"❌ Error updating post {post.get('id')}: {e}")
-                stats["failed"] += 1
+        # One stats recompute per creator instead of one per post
+        await self._recalculate_creators(touched_creators)
 
         logger.info(f"""
-        📊 Metrics update completed:
+        📊 Metrics update completed in {time.monotonic() - started:.1f}s:
         - Total posts: {stats['total_posts']}
         - Updated: {stats['updated']}
         - Failed: {stats['failed']}
         - Skipped: {stats['skipped']}
+        - Rate limited (retried): {stats['rate_limited']}
+        - Creators recalculated: {len(touched_creators)}
         """)
 
         return stats
 
+    def _bucket_for(self, platform: str) -> Optional[TokenBucket]:
+        """Per-platform token bucket (None for platforms we don't scrape over HTTP)"""
+        rate = self._platform_rates.get(platform)
+        if not rate:
+            return None
+        if platform not in self._buckets:
+            self._buckets[platform] = TokenBucket(rate)
+        return self._buckets[platform]
+
+    async def _scrape_with_backoff(self, url: str, platform: str, stats: Dict[str, int]) -> Dict:
+        """Scrape under the platform's rate limit, retrying 429s with jittered backoff"""
+        bucket = self._bucket_for(platform)
+
+        for attempt in range(settings.metrics_max_retries + 1):
+            if bucket:
+                await bucket.acquire()
+
+            metrics = await scrape_social_metrics(url, platform)
+
+            if metrics.get("status_code") != 429 or attempt == settings.metrics_max_retries:
+                return metrics
+
+            stats["rate_limited"] += 1
+            try:
+                delay = float(metrics.get("retry_after"))
+            except (TypeError, ValueError):
+                delay = backoff_delay(attempt)
+
+            # Slow down every worker on this platform, not just this one
+            if bucket:
+                bucket.penalize(delay)
+
+            logger.warning(f"⏳ {platform} rate limited, retrying in {delay:.1f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+
+        return metrics
+
+    async def _refresh_post(self, post: Dict, stats: Dict[str, int]) -> bool:
+        """Scrape, store and reschedule one post. Returns True if metrics changed"""
+        post_id = post["id"]
+        platform = post["platform"]
+        now = datetime.now(timezone.utc)
+
+        logger.info(f"Updating metrics for post {post_id} ({platform})")
+
+        metrics = await self._scrape_with_backoff(post["post_url"], platform, stats)
+
+        if metrics.get("success"):
+            await self.db.update_post_metrics(post_id, metrics)
+
+            velocity = views_per_hour(post, metrics.get("views", 0), now)
+            next_at = now + next_refresh_interval(post_age_hours(post, now), velocity)
+            await self.db.update_post_tracking(post_id, next_at, velocity)
+
+            stats["updated"] += 1
+            logger.success(f"✅ Updated post {post_id}: {metrics.get('views', 0)} views (next refresh {next_at:%Y-%m-%d %H:%M} UTC)")
+            return True
+
+        error_msg = metrics.get("error", "Unknown error")
+        logger.warning(f"⚠️ Failed to scrape post {post_id}: {error_msg}")
+
+        # Save error and push the retry out so broken URLs don't hog every tick
+        await self.db.execute(
+            self.db.client.table("posts").update({
+                "metrics_fetch_error": error_msg,
+                "next_metrics_at": (now + FAILED_REFRESH_INTERVAL).isoformat()
+            }).eq("id", post_id)
+        )
+
+        stats["failed"] += 1
+        return False
+
+    async def _recalculate_creators(self, tg_user_ids: Set[int]) -> None:
+        """Recompute creator stats for every affected creator in a single statement"""
+        if not tg_user_ids:
+            return
+        try:
+            changed = await self.db.recalculate_creators_stats(list(tg_user_ids))
+            logger.info(f"📊 Recalculated stats for {len(tg_user_ids)} creator(s), {changed} changed")
+        except Exception as e:
+            logger.error(f"❌ Error recalculating creator stats: {e}")
+            return
+
+        # Move the affected creators in the in-process leaderboard
+        await get_leaderboard().refresh(tg_user_ids)
+
     async def update_single_post(self, post_id: int) -> bool:
         """Update metrics for a single post"""
         try:
-            post_result = self.db.client.table("posts") \
-                .select("id, post_url, platform, tg_user_id") \
-                .eq("id", post_id) \
-                .execute()
+            post_result = await self.db.execute(
+                self.db.client.table("posts")
+                .select("id, post_url, platform, tg_user_id, submitted_at, views, last_metrics_sync")
+                .eq("id", post_id)
+            )
 
             if not post_result.data:
                 logger.error(f"Post {post_id} not found")
@@ -106,11 +278,20 @@ class MetricsUpdater:
             metrics = await scrape_social_metrics(url, platform)
 
             if metrics.get("success"):
-                # Update post metrics
+                # Update post metrics and reschedule the next refresh
                 await self.db.update_post_metrics(post_id, metrics)
 
+                now = datetime.now(timezone.utc)
+                velocity = views_per_hour(post, metrics.get("views", 0), now)
+                await self.db.update_post_tracking(
+                    post_id,
+                    now + next_refresh_interval(post_age_hours(post, now), velocity),
+                    velocity
+                )
+
                 # Recalculate creator stats
                 await self.db.recalculate_creator_stats(tg_user_id)
+                await get_leaderboard().refresh([tg_user_id])
 
                 logger.success(f"✅ Updated post {post_id}: {metrics.get('views', 0)} views")
                 return True
@@ -3,16 +3,68 @@ Simplified Video Generation Flow - Direct Sora 2 API
 No OpenAI Assistants - Direct calls only
 """
 import asyncio
+from typing import Optional
 from openai import AsyncOpenAI
 from config.settings import settings
 from db.client import db
+from db.prompt_index import get_prompt_index
+from agent.tools.content_validator import APPROVED_CATEGORIES
+from agent.tools.tiered_validator import KeywordMatcher, TieredValidator, register_validator, top_category
+from utils.flow import Flow, FlowStop
+from utils.progress import get_progress_hub
 from loguru import logger
 from datetime import datetime, timedelta
 
 client = AsyncOpenAI(api_key=settings.openai_api_key)
 
 
+# Clearly Ethereum-related: approve without asking GPT-4
+ETH_TERMS = [
+    "ethereum", "eth", "ether", "defi", "web3", "blockchain", "crypto", "cripto", "criptomoneda",
+    "nft", "dao", "dapp", "token", "wallet", "billetera", "staking", "stake", "validator", "validador",
+    "layer 2", "l2", "rollup", "smart contract", "contrato inteligente", "gas fee", "stablecoin",
+    "uniswap", "etherfi", "aave", "lido", "arbitrum", "optimism", "polygon", "unichain"
+]
+
+# Possible reject reasons (illegal, scams, hate, violence, NSFW): GPT-4 decides, never keywords
+# Stems: any word starting with one counts ("hack" -> "hackers", "asesin" -> "asesinando")
+RED_FLAG_TERMS = [
+    "scam", "estafa", "fraud", "fraude", "ponzi", "phishing", "rug", "hack", "steal", "roba",
+    "launder", "lavado", "drug", "droga", "cocaine", "weapon", "arma", "gun", "kill", "mata", "murder", "asesin",
+    "blood", "sangre", "gore", "bomb", "bomba", "terror", "nazi", "racist", "racista",
+    "nude", "desnudo", "naked", "sex", "sexo", "porn", "porno", "nsfw"
+]
+
+_simple_matcher = KeywordMatcher(
+    RED_FLAG_TERMS,
+    {
+        **{category: data["keywords"] for category, data in APPROVED_CATEGORIES.items()},
+        "ethereum": ETH_TERMS
+    }
+)
+
+
+def _fast_validate_simple(scan: dict):
+    """Approve obviously on-topic prompts; anything else goes to GPT-4"""
+    if scan["banned"] or "ethereum" not in scan["categories"]:
+        return None
+    categories = {c: n for c, n in scan["categories"].items() if c in APPROVED_CATEGORIES}
+    return {
+        "approved": True,
+        "category": top_category({"categories": categories}),
+        "reason": "Approved - Ethereum-related content",
+        "suggestions": []
+    }
+
+
 async def validate_content_simple(prompt: str) -> dict:
+    """
+    Tiered validation: cached verdict -> keyword fast path -> GPT-4
+    """
+    return await _simple_validator.validate(prompt)
+
+
+async def _llm_validate_simple(prompt: str, scan: dict) -> dict:
     """
     Simple GPT-4 validation without Assistant API
     """
@@ -81,10 +133,16 @@ Respond ONLY with valid JSON:
             "approved": True,
             "category": "defi_education",
             "reason": "Auto-approved (validation service temporarily unavailable)",
-            "suggestions": []
+            "suggestions": [],
+            "tier": "fallback"
         }
 
 
+_simple_validator = register_validator(
+    TieredValidator("simple", _simple_matcher, _fast_validate_simple, _llm_validate_simple)
+)
+
+
 async def generate_caption_simple(prompt: str, category: str) -> dict:
     """
     Simple GPT-4 caption generation
@@ -141,7 +199,6 @@ async def check_user_limits_simple(tg_user_id: int, prompt: str = None) -> dict:
             return {"can_create": True, "remaining": 10}
 
         # Check daily limit (20 videos per day)
-        today = datetime.now().date()
         videos_today = await db.count_videos_today(tg_user_id)
 
         if videos_today >= 20:
@@ -152,20 +209,20 @@ async def check_user_limits_simple(tg_user_id: int, prompt: str = None) -> dict:
 
         # Check for duplicate prompt in last 24 hours
         if prompt:
-            from datetime import datetime, timedelta
             yesterday = datetime.now() - timedelta(days=1)
 
-            existing = db.client.table("videos") \
-                .select("id, prompt, created_at, status") \
-                .eq("tg_user_id", tg_user_id) \
-                .eq("prompt", prompt) \
-                .gte("created_at", yesterday.isoformat()) \
-                .in_("status", ["generating", "ready"])  \
-                .execute()
+            existing = await db.execute(
+                db.client.table("videos")
+                .select("id, prompt, created_at, status")
+                .eq("tg_user_id", tg_user_id)
+                .eq("prompt", prompt)
+                .gte("created_at", yesterday.isoformat())
+                .in_("status", ["queued", "generating", "ready"])
+            )
 
             if existing.data and len(existing.data) > 0:
                 last_video = existing.data[0]
-                status_text = "being generated" if last_video.get('status') == 'generating' else "created"
+                status_text = "being generated" if last_video.get('status') in ('queued', 'generating') else "created"
                 logger.warning(f"⚠️ Duplicate prompt detected for user {tg_user_id}: '{prompt[:50]}...'")
                 return {
                     "can_create": False,
@@ -174,6 +231,31 @@ async def check_user_limits_simple(tg_user_id: int, prompt: str = None) -> dict:
                     "existing_video_id": last_video['id']
                 }
 
+            # Reworded versions of the same prompt (cost the same ~$4 as exact ones)
+            near = await get_prompt_index().find_duplicates(prompt, tg_user_id)
+
+            if near.get("own"):
+                similar = near["own"]
+                status_text = "being generated" if similar.get('status') in ('queued', 'generating') else "created"
+                return {
+                    "can_create": False,
+                    "reason": f"You already {status_text} a very similar video recently (Video ID: {similar['id']}, {similar['similarity']:.0%} similar). Please try a different idea.",
+                    "duplicate": True,
+                    "similarity": similar["similarity"],
+                    "existing_video_id": similar['id']
+                }
+
+            if near.get("similar_ready") and settings.dedup_reuse_global:
+                similar = near["similar_ready"]
+                return {
+                    "can_create": False,
+                    "reason": f"A very similar video already exists (Video ID: {similar['id']}, {similar['similarity']:.0%} similar).",
+                    "duplicate": True,
+                    "similarity": similar["similarity"],
+                    "reuse_video_id": similar['id'],
+                    "reuse_video_url": similar.get("public_url")
+                }
+
         return {
             "can_create": True,
             "remaining": 20 - videos_today
@@ -184,93 +266,223 @@ async def check_user_limits_simple(tg_user_id: int, prompt: str = None) -> dict:
         return {"can_create": True, "remaining": 10}
 
 
-async def create_video_simple(tg_user_id: int, username: str, prompt: str) -> dict:
+async def prepare_video_simple(
+    tg_user_id: int,
+    username: str,
+    prompt: str,
+    status: str = "generating",
+    **video_fields
+) -> dict:
     """
-    Simplified video generation flow - NO ASSISTANT API
+    Steps 1-2.5 of the flow: limits, validation and the pending video record
+
+    Returns {"success": True, "video": <row>, "category": str, "timings": {...}}
+    or a failure result in the same shape create_video_simple returns.
     """
-    try:
-        logger.info(f"=== Starting simple video flow for @{username} ===")
+    logger.info(f"=== Starting simple video flow for @{username} ===")
 
-        # Step 1: Check limits (including duplicate detection)
+    # Steps 1 and 2 are independent: check limits and validate concurrently;
+    # whichever rejects first cancels the other
+    async def check_limits(_):
         logger.info("Step 1: Checking user limits and duplicates")
         limits = await check_user_limits_simple(tg_user_id, prompt)
-
         if not limits.get("can_create"):
-            return {
+            raise FlowStop({
                 "success": False,
                 "error": "duplicate_prompt" if limits.get("duplicate") else "limit_exceeded",
                 "reason": limits.get("reason"),
                 "duplicate": limits.get("duplicate", False),
-                "existing_video_id": limits.get("existing_video_id")
-            }
-
-        # Step 2: Validate content
+                "existing_video_id": limits.get("existing_video_id"),
+                "similarity": limits.get("similarity"),
+                "reuse_video_id": limits.get("reuse_video_id"),
+                "reuse_video_url": limits.get("reuse_video_url")
+            })
+        return limits
+
+    async def validate(_):
         logger.info("Step 2: Validating content")
         validation = await validate_content_simple(prompt)
-
         if not validation.get("approved"):
-            return {
+            raise FlowStop({
                 "success": False,
                 "approved": False,
                 "reason": validation.get("reason")
-            }
+            })
+        return validation
 
-        category = validation.get("category", "defi_education")
-
-        # Step 2.5: Create PENDING video record immediately to prevent race conditions
-        # This ensures duplicate detection works even if multiple requests come simultaneously
-        logger.info("Step 2.5: Creating pending video record to prevent duplicates")
+    # Step 2.5: Create PENDING video record immediately to prevent race conditions
+    # This ensures duplicate detection works even if multiple requests come simultaneously
+    async def create_record(results):
+        logger.info(f"Step 2.5: Creating {status} video record to prevent duplicates")
         pending_video_data = {
             "tg_user_id": tg_user_id,
             "prompt": prompt,
             "enhanced_prompt": prompt,  # Will update later
             "duration_seconds": 15,
-            "category": category,
-            "status": "generating",  # Mark as generating
+            "category": results["validation"].get("category", "defi_education"),
+            "status": status,
             "video_url": None,  # Will update after generation
-            "thumbnail_url": None
+            "thumbnail_url": None,
+            **video_fields
         }
 
         pending_video = await db.create_video(pending_video_data)
-        pending_video_id = pending_video.get("id")
-        logger.info(f"✅ Created pending video record ID: {pending_video_id} (prevents duplicates)")
+        logger.info(f"✅ Created {status} video record ID: {pending_video.get('id')} (prevents duplicates)")
+        get_prompt_index().add(pending_video)
+        return pending_video
+
+    flow = (
+        Flow(f"prepare@{username}")
+        .step("limits", check_limits)
+        .step("validation", validate)
+        .step("record", create_record, after=("limits", "validation"))
+    )
+    try:
+        results = await flow.run()
+    except FlowStop as stop:
+        return {**stop.result, "timings": flow.timings}
 
-        # Step 3: Generate video with Sora 2
-        logger.info("Step 3: Generating video with Sora 2")
+    return {
+        "success": True,
+        "video": results["record"],
+        "category": results["validation"].get("category", "defi_education"),
+        "timings": flow.timings
+    }
+
+
+# Post-save media stage: runs after the video is ready and delivered, bounded so
+# a burst of finished videos can't flood the FFmpeg pool queue
+_media_tasks: set = set()
+_media_slots: Optional[asyncio.Semaphore] = None
+
+
+async def render_media(video_id: int, video_url: str, duration: float) -> None:
+    """
+    Render gallery previews, then HLS renditions, for a saved video
+    Each writes its own fields to the row as soon as it's done.
+    """
+    global _media_slots
+    if _media_slots is None:
+        _media_slots = asyncio.Semaphore(max(settings.media_stage_concurrency, 1))
+
+    from agent.tools.previews import generate_previews
+    from agent.tools.transcode import transcode_video
+
+    async with _media_slots:
+        try:
+            fields = await generate_previews(video_url, duration)
+            if fields:
+                await db.update_video_by_id(video_id, fields)
+        except Exception as e:
+            logger.error(f"Preview stage failed for video {video_id}: {e}")
+
+        if not settings.transcode_enabled:
+            return
+        try:
+            logger.info(f"Transcoding HLS renditions (video {video_id})")
+            transcoded = await transcode_video(video_url)
+            if transcoded.get("success"):
+                await db.update_video_by_id(video_id, {key: transcoded[key] for key in ("hls_url", "fallback_url", "renditions")})
+            else:
+                logger.warning(f"Transcoding failed for video {video_id}: {transcoded.get('error')}")
+        except Exception as e:
+            logger.error(f"Transcode stage failed for video {video_id}: {e}")
+
+
+def schedule_media_stage(video_id: int, video_url: str, duration: float) -> None:
+    """Run render_media in the background (reference kept until it finishes)"""
+    if not video_url:
+        return
+    task = asyncio.create_task(render_media(video_id, video_url, duration))
+    _media_tasks.add(task)
+    task.add_done_callback(_media_tasks.discard)
+
+
+async def process_video_job(video: dict, notify_user: bool = True) -> dict:
+    """
+    Steps 3-5 of the flow for an existing video record
+
+    Resumes polling when the record already has a sora_job_id (worker
+    restarted mid-generation) instead of paying for a new generation.
+    """
+    video_id = video["id"]
+    tg_user_id = video["tg_user_id"]
+    prompt = video["prompt"]
+    category = video.get("category") or "defi_education"
+
+    try:
         from agent.tools.sora2 import Sora2Generator
 
-        generator = Sora2Generator()
-        video_result = await generator.generate(
-            prompt=prompt,
-            duration=15,  # Default 15 seconds
-            category=category,
-            tg_user_id=tg_user_id  # Pass user ID for Telegram notification
-        )
+        async def save_job_id(job_id: str):
+            # Persist before polling so a crash can resume this job
+            await db.update_video_by_id(video_id, {"sora_job_id": job_id})
+
+        # Live progress for whoever follows this video (Telegram status message relay)
+        progress_hub = get_progress_hub()
+        progress_hub.publish(video_id, {"stage": "generating", "progress": 0, "eta_seconds": None})
 
-        if not video_result.get("success"):
-            # Mark pending video as failed
-            logger.warning(f"Video generation failed, marking pending video {pending_video_id} as failed")
-            await db.update_video_by_id(pending_video_id, {"status": "failed"})
+        async def report_progress(event: dict):
+            progress_hub.publish(video_id, {"stage": event.get("status") or "generating", **event})
+
+        # Step 3: Generate video with Sora 2
+        async def generate_video(_):
+            logger.info(f"Step 3: Generating video with Sora 2 (video {video_id})")
+            generator = Sora2Generator()
+            video_result = await generator.generate(
+                prompt=prompt,
+                duration=15,  # Default 15 seconds
+                category=category,
+                tg_user_id=tg_user_id if notify_user else None,  # Pass user ID for Telegram notification
+                job_id=video.get("sora_job_id"),
+                on_job_created=save_job_id,
+                on_progress=report_progress,
+                requester=tg_user_id  # Governor fairness is per creator, even without notifications
+            )
+
+            if not video_result.get("success"):
+                # Mark pending video as failed
+                logger.warning(f"Video generation failed, marking pending video {video_id} as failed")
+                await db.update_video_by_id(video_id, {"status": "failed"})
+                raise FlowStop(video_result)
             return video_result
 
-        # Step 4: Generate caption
-        logger.info("Step 4: Generating caption")
-        caption_result = await generate_caption_simple(prompt, category)
+        # Step 4: Generate caption (only needs prompt + category, so it runs during Sora polling)
+        async def generate_caption(_):
+            logger.info("Step 4: Generating caption")
+            return await generate_caption_simple(prompt, category)
 
         # Step 5: Update pending video record with final data
-        logger.info(f"Step 5: Updating pending video {pending_video_id} with final data")
-        update_data = {
-            "video_url": video_result.get("video_url"),
-            "thumbnail_url": video_result.get("thumbnail_url"),
-            "enhanced_prompt": video_result.get("enhanced_prompt"),
-            "duration_seconds": video_result.get("duration"),
-            "sora_job_id": video_result.get("job_id"),
-            "generation_time_seconds": video_result.get("generation_time"),
-            "status": "ready"
-        }
+        async def save_video(results):
+            video_result, caption_result = results["sora"], results["caption"]
+            logger.info(f"Step 5: Updating pending video {video_id} with final data")
+            update_data = {
+                "video_url": video_result.get("video_url"),
+                "thumbnail_url": video_result.get("thumbnail_url"),
+                "enhanced_prompt": video_result.get("enhanced_prompt"),
+                "duration_seconds": video_result.get("duration"),
+                "sora_job_id": video_result.get("job_id"),
+                "generation_time_seconds": video_result.get("generation_time"),
+                "caption": caption_result.get("caption"),
+                "hashtags": caption_result.get("hashtags"),
+                "status": "ready"
+            }
+            await db.update_video_by_id(video_id, update_data)
+
+        flow = (
+            Flow(f"video#{video_id}")
+            .step("sora", generate_video)
+            .step("caption", generate_caption)
+            .step("save", save_video, after=("sora", "caption"))
+        )
+        try:
+            results = await flow.run()
+        except FlowStop as stop:
+            return {**stop.result, "timings": flow.timings}
+
+        video_result, caption_result = results["sora"], results["caption"]
 
-        await db.update_video_by_id(pending_video_id, update_data)
-        video_id = pending_video_id
+        # Step 6: Gallery previews + HLS after the video is saved and delivered (doesn't hold up the user)
+        schedule_media_stage(video_id, video_result.get("video_url"), video_result.get("duration") or 15)
 
         logger.info(f"=== Video flow completed successfully! Video ID: {video_id} ===")
 
@@ -283,7 +495,8 @@ async def create_video_simple(tg_user_id: int, username: str, prompt: str) -> di
             "hashtags": caption_result.get("hashtags"),
             "category": category,
             "job_id": video_result.get("job_id"),
-            "duration": video_result.get("duration")
+            "duration": video_result.get("duration"),
+            "timings": flow.timings
         }
 
     except Exception as e:
@@ -293,5 +506,76 @@ async def create_video_simple(tg_user_id: int, username: str, prompt: str) -> di
         return {
             "success": False,
             "error": str(e),
+            "retryable": True,  # Unexpected error (DB, network): the queue may retry; Sora failures stop via FlowStop
             "message": "An error occurred during video generation"
         }
+
+    finally:
+        get_progress_hub().close(video_id)
+
+
+async def create_video_simple(tg_user_id: int, username: str, prompt: str) -> dict:
+    """
+    Simplified video generation flow - NO ASSISTANT API
+    Runs the whole flow inline (scripts/tests); the bot uses enqueue_video_simple
+    """
+    try:
+        prepared = await prepare_video_simple(tg_user_id, username, prompt)
+        if not prepared.get("success"):
+            return prepared
+
+        return await process_video_job(prepared["video"])
+
+    except Exception as e:
+        logger.error(f"Simple flow error: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "An error occurred during video generation"
+        }
+
+
+async def enqueue_video_simple(
+    tg_user_id: int,
+    username: str,
+    prompt: str,
+    chat_id: int = None,
+    status_message_id: int = None
+) -> dict:
+    """
+    Validate the request and queue it for a generation worker
+    Returns immediately; scheduler/generation_worker.py does Steps 3-5 and delivery
+    """
+    try:
+        prepared = await prepare_video_simple(
+            tg_user_id,
+            username,
+            prompt,
+            status="queued",
+            tg_chat_id=chat_id or tg_user_id,
+            status_message_id=status_message_id
+        )
+        if not prepared.get("success"):
+            return prepared
+
+        logger.info(f"📥 Video {prepared['video']['id']} queued for generation")
+
+        return {
+            "success": True,
+            "approved": True,
+            "queued": True,
+            "video_id": prepared["video"]["id"],
+            "category": prepared["category"]
+        }
+
+    except Exception as e:
+        logger.error(f"Enqueue error: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "An error occurred while queueing your video"
+        }
@@ -0,0 +1,82 @@
+"""
+Aho-Corasick multi-pattern matcher
+All patterns are found in one left-to-right pass over the text, so the
+cost is O(len(text) + matches) no matter how many patterns are loaded;
+checking each keyword with `in` costs O(len(text) * keywords).
+
+Usage:
+    automaton = AhoCorasick(["moon", "to the moon", "swap"])
+    for start, end, pattern in automaton.find_all("eth to the moon"):
+        ...
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """Trie + failure links; build() must run after the last add()"""
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Patterns ending at each state, including those reached via failure links
+        self._out: List[Tuple[str, ...]] = [()]
+        self._built = False
+        self._count = 0
+        for pattern in patterns:
+            self.add(pattern)
+        self.build()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, pattern: str) -> None:
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if pattern not in self._out[state]:
+            self._out[state] = (pattern,) + self._out[state]
+            self._count += 1
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + tuple(
+                    p for p in self._out[self._fail[nxt]] if p not in self._out[nxt]
+                )
+                queue.append(nxt)
+        self._built = True
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, pattern) for every occurrence, overlaps included"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                for pattern in out[state]:
+                    yield end - len(pattern), end, pattern
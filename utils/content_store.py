@@ -0,0 +1,393 @@
+"""
+Content-addressed video storage
+Objects are stored under the SHA-256 of their full content
+(cas/ab/abcdef....mp4), so the same bytes always land on the same key:
+    - before uploading, the backend is asked whether the key exists; a
+      retry or re-run that produces the same file uploads nothing
+    - large files go up in parts (S3/R2 multipart, Supabase TUS resumable
+      uploads); progress is checkpointed in CONTENT_STORE_STATE_DIR, so
+      an interrupted upload resumes from the last finished part
+    - streams (downloads) are hashed while they are spooled to disk,
+      since the key is only known once the last byte has been read
+
+Backends (CONTENT_STORE_BACKEND): "supabase", "s3", "r2" and "local"
+(a directory, for development and benchmarks).
+
+Usage:
+    store = get_content_store()
+    result = await store.put_stream(chunks, content_type="video/mp4")
+    result["url"], result["uploaded"]   # uploaded=False -> deduplicated
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Optional
+from urllib.parse import urljoin
+from loguru import logger
+from config.settings import settings
+from utils.http_clients import get_http_client
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+CONTENT_TYPE_EXTENSIONS = {
+    "video/mp4": ".mp4",
+    "image/jpeg": ".jpg",
+    "image/webp": ".webp",
+    "image/png": ".png",
+    "application/vnd.apple.mpegurl": ".m3u8",
+    "video/mp2t": ".ts"
+}
+
+SaveState = Callable[[Dict], None]
+
+
+def file_digest(path: str) -> tuple:
+    """(sha256 hex, size) of a file, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _read_range(path: str, offset: int, length: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+# ==================== BACKENDS ====================
+
+class LocalBackend:
+    """Objects as files under a directory; parts kept until the upload completes"""
+
+    part_size = 8 * 1024 * 1024
+
+    def __init__(self, root: str, public_base_url: Optional[str] = None):
+        self.root = Path(root)
+        self.public_base_url = public_base_url.rstrip("/") if public_base_url else None
+
+    async def exists(self, key: str) -> bool:
+        return (self.root / key).exists()
+
+    def public_url(self, key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url}/{key}"
+        return (self.root / key).resolve().as_uri()
+
+    async def upload_file(self, key: str, path: str, size: int, content_type: str, state: Dict, save_state: SaveState) -> int:
+        if not state.get("upload_id"):
+            state["upload_id"] = uuid.uuid4().hex
+            save_state(state)
+        parts_dir = self.root / ".uploads" / state["upload_id"]
+        parts_dir.mkdir(parents=True, exist_ok=True)
+
+        sent = 0
+        for number, offset in enumerate(range(0, max(size, 1), self.part_size), start=1):
+            part = parts_dir / f"{number:05d}"
+            length = min(self.part_size, size - offset)
+            if part.exists() and part.stat().st_size == length:
+                continue
+            data = await asyncio.to_thread(_read_range, path, offset, length)
+            await asyncio.to_thread(part.write_bytes, data)
+            sent += len(data)
+
+        await asyncio.to_thread(self._assemble, key, parts_dir)
+        return sent
+
+    def _assemble(self, key: str, parts_dir: Path) -> None:
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:6]}")
+        with open(tmp, "wb") as out:
+            for part in sorted(parts_dir.iterdir()):
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(tmp, target)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+class S3Backend:
+    """S3 / Cloudflare R2 via boto3 (blocking calls run in threads)"""
+
+    # S3 minimum part size is 5 MiB
+    part_size = 8 * 1024 * 1024
+
+    def __init__(self, bucket: str, public_base_url: str, acl: Optional[str] = None, **client_kwargs):
+        import boto3
+        self.bucket = bucket
+        self.public_base_url = public_base_url.rstrip("/")
+        self.acl = acl
+        self.client = boto3.client("s3", **client_kwargs)
+
+    async def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def public_url(self, key: str) -> str:
+        return f"{self.public_base_url}/{key}"
+
+    def _object_args(self, key: str, content_type: str) -> Dict:
+        args = {"Bucket": self.bucket, "Key": key, "ContentType": content_type}
+        if self.acl:
+            args["ACL"] = self.acl
+        return args
+
+    async def upload_file(self, key: str, path: str, size: int, content_type: str, state: Dict, save_state: SaveState) -> int:
+        from botocore.exceptions import ClientError
+
+        if size <= self.part_size:
+            body = await asyncio.to_thread(_read_range, path, 0, size)
+            await asyncio.to_thread(self.client.put_object, Body=body, **self._object_args(key, content_type))
+            return size
+
+        done: Dict[int, str] = {}
+        upload_id = state.get("upload_id")
+        if upload_id:
+            try:
+                done = await asyncio.to_thread(self._list_parts, key, upload_id)
+                logger.info(f"♻️ Resuming multipart upload of {key}: {len(done)} part(s) already uploaded")
+            except ClientError:
+                # Expired or aborted: start over
+                upload_id = None
+
+        if not upload_id:
+            response = await asyncio.to_thread(self.client.create_multipart_upload, **self._object_args(key, content_type))
+            upload_id = state["upload_id"] = response["UploadId"]
+            save_state(state)
+
+        sent = 0
+        for number, offset in enumerate(range(0, size, self.part_size), start=1):
+            length = min(self.part_size, size - offset)
+            if number in done:
+                continue
+            data = await asyncio.to_thread(_read_range, path, offset, length)
+            response = await asyncio.to_thread(
+                self.client.upload_part,
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data
+            )
+            done[number] = response["ETag"]
+            sent += length
+
+        await asyncio.to_thread(
+            self.client.complete_multipart_upload,
+            Bucket=self.bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": n, "ETag": done[n]} for n in sorted(done)]}
+        )
+        return sent
+
+    def _list_parts(self, key: str, upload_id: str) -> Dict[int, str]:
+        parts = {}
+        paginator = self.client.get_paginator("list_parts")
+        for page in paginator.paginate(Bucket=self.bucket, Key=key, UploadId=upload_id):
+            for part in page.get("Parts", []):
+                parts[part["PartNumber"]] = part["ETag"]
+        return parts
+
+
+class SupabaseBackend:
+    """Supabase Storage REST API; large files via its TUS resumable endpoint"""
+
+    # Supabase's resumable endpoint expects 6 MiB chunks
+    part_size = 6 * 1024 * 1024
+
+    def __init__(self, supabase_url: str, api_key: str, bucket: str = "videos"):
+        self.base_url = supabase_url.rstrip("/")
+        self.bucket = bucket
+        self.headers = {"Authorization": f"Bearer {api_key}", "apikey": api_key}
+
+    async def exists(self, key: str) -> bool:
+        response = await get_http_client("storage").head(
+            f"{self.base_url}/storage/v1/object/{self.bucket}/{key}",
+            headers=self.headers
+        )
+        if response.status_code == 200:
+            return True
+        if response.status_code in (400, 404):
+            return False
+        raise Exception(f"Storage existence check failed: {response.status_code}")
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/storage/v1/object/public/{self.bucket}/{key}"
+
+    async def upload_file(self, key: str, path: str, size: int, content_type: str, state: Dict, save_state: SaveState) -> int:
+        client = get_http_client("storage")
+
+        if size <= self.part_size:
+            body = await asyncio.to_thread(_read_range, path, 0, size)
+            response = await client.post(
+                f"{self.base_url}/storage/v1/object/{self.bucket}/{key}",
+                content=body,
+                headers={**self.headers, "Content-Type": content_type, "x-upsert": "true"}
+            )
+            if response.status_code not in (200, 201):
+                raise Exception(f"Storage upload failed: {response.status_code} - {response.text}")
+            return size
+
+        tus_headers = {**self.headers, "Tus-Resumable": "1.0.0"}
+        location, offset = state.get("location"), 0
+        if location:
+            response = await client.head(location, headers=tus_headers)
+            if response.status_code == 200:
+                offset = int(response.headers.get("Upload-Offset", 0))
+                logger.info(f"♻️ Resuming upload of {key} at {offset / 1e6:.1f} MB")
+            else:
+                location = None
+
+        if not location:
+            metadata = {"bucketName": self.bucket, "objectName": key, "contentType": content_type}
+            response = await client.post(
+                f"{self.base_url}/storage/v1/upload/resumable",
+                headers={
+                    **tus_headers,
+                    "Upload-Length": str(size),
+                    "Upload-Metadata": ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in metadata.items()),
+                    "x-upsert": "true"
+                }
+            )
+            if response.status_code != 201:
+                raise Exception(f"Could not start resumable upload: {response.status_code} - {response.text}")
+            location = state["location"] = urljoin(f"{self.base_url}/", response.headers["Location"])
+            save_state(state)
+
+        sent = 0
+        while offset < size:
+            data = await asyncio.to_thread(_read_range, path, offset, self.part_size)
+            response = await client.patch(
+                location,
+                content=data,
+                headers={**tus_headers, "Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"}
+            )
+            if response.status_code != 204:
+                raise Exception(f"Resumable upload chunk failed at {offset}: {response.status_code} - {response.text}")
+            offset = int(response.headers.get("Upload-Offset", offset + len(data)))
+            sent += len(data)
+
+        return sent
+
+
+# ==================== STORE ====================
+
+class ContentStore:
+    """Dedup-by-hash uploads with resumable large-file transfers"""
+
+    def __init__(self, backend, state_dir: str, prefix: str = "cas"):
+        self.backend = backend
+        self.state_dir = Path(state_dir)
+        self.prefix = prefix
+        self.stats = {"stored": 0, "deduplicated": 0, "bytes_uploaded": 0, "bytes_deduplicated": 0, "bytes_resumed": 0}
+
+    def key_for(self, digest: str, content_type: str) -> str:
+        ext = CONTENT_TYPE_EXTENSIONS.get(content_type, "")
+        return f"{self.prefix}/{digest[:2]}/{digest}{ext}"
+
+    async def put_file(self, path: str, content_type: str = "video/mp4", digest: Optional[str] = None, size: Optional[int] = None) -> Dict:
+        """
+        Store a local file under its content hash
+        Returns: {"key", "url", "sha256", "size", "uploaded", "bytes_sent"}
+        """
+        if digest is None or size is None:
+            digest, size = await asyncio.to_thread(file_digest, path)
+        key = self.key_for(digest, content_type)
+        result = {"key": key, "url": self.backend.public_url(key), "sha256": digest, "size": size}
+
+        if await self.backend.exists(key):
+            self.stats["deduplicated"] += 1
+            self.stats["bytes_deduplicated"] += size
+            logger.info(f"♻️ {key} already stored ({size / 1e6:.1f} MB not uploaded)")
+            return {**result, "uploaded": False, "bytes_sent": 0}
+
+        state_path = self.state_dir / f"{digest}.json"
+        state = json.loads(state_path.read_text()) if state_path.exists() else {}
+
+        def save_state(new_state: Dict) -> None:
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(new_state))
+            os.replace(tmp, state_path)
+
+        sent = await self.backend.upload_file(key, path, size, content_type, state, save_state)
+        state_path.unlink(missing_ok=True)
+
+        self.stats["stored"] += 1
+        self.stats["bytes_uploaded"] += sent
+        self.stats["bytes_resumed"] += size - sent
+        logger.info(f"📦 Stored {key}: {sent / 1e6:.1f} of {size / 1e6:.1f} MB sent")
+        return {**result, "uploaded": True, "bytes_sent": sent}
+
+    async def put_stream(self, chunks: AsyncIterator[bytes], content_type: str = "video/mp4") -> Dict:
+        """Spool a stream to disk while hashing it, then put_file"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, spool_path = tempfile.mkstemp(dir=self.state_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as spool:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    spool.write(chunk)
+                    size += len(chunk)
+            return await self.put_file(spool_path, content_type, digest=digest.hexdigest(), size=size)
+        finally:
+            os.unlink(spool_path)
+
+    async def put_bytes(self, data: bytes, content_type: str = "video/mp4") -> Dict:
+        async def chunks():
+            view = memoryview(data)
+            for i in range(0, len(data), HASH_CHUNK_SIZE):
+                yield view[i:i + HASH_CHUNK_SIZE]
+
+        return await self.put_stream(chunks(), content_type)
+
+    def snapshot(self) -> Dict:
+        return dict(self.stats)
+
+
+# Singleton instance
+_content_store = None
+
+def get_content_store() -> ContentStore:
+    """Get or create content store singleton (CONTENT_STORE_BACKEND)"""
+    global _content_store
+    if _content_store is None:
+        kind = settings.content_store_backend
+        if kind == "supabase":
+            backend = SupabaseBackend(settings.supabase_url, settings.supabase_service_key or settings.supabase_key)
+        elif kind == "s3":
+            backend = S3Backend(
+                settings.s3_bucket_name,
+                f"https://{settings.s3_bucket_name}.s3.{settings.aws_region}.amazonaws.com",
+                acl="public-read",
+                aws_access_key_id=settings.aws_access_key_id,
+                aws_secret_access_key=settings.aws_secret_access_key,
+                region_name=settings.aws_region
+            )
+        elif kind == "r2":
+            backend = S3Backend(
+                settings.r2_bucket_name,
+                f"https://{settings.r2_public_domain}",
+                endpoint_url=settings.r2_endpoint,
+                aws_access_key_id=settings.r2_access_key_id,
+                aws_secret_access_key=settings.r2_secret_access_key
+            )
+        elif kind == "local":
+            backend = LocalBackend(settings.content_store_local_dir, settings.content_store_public_base_url)
+        else:
+            raise ValueError(f"Unknown CONTENT_STORE_BACKEND: {kind}")
+        logger.info(f"🗂️ Content store backend: {kind}")
+        _content_store = ContentStore(backend, settings.content_store_state_dir)
+    return _content_store
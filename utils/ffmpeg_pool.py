@@ -0,0 +1,242 @@
+"""
+Managed FFmpeg process pool
+Encodes are CPU bound, so at most FFMPEG_WORKERS ffmpeg processes run at
+once (default: cores / FFMPEG_THREADS_PER_JOB) and each is told to use
+that many threads. Further jobs wait in a bounded queue; once
+FFMPEG_MAX_QUEUE jobs are waiting, new ones are rejected with
+FFmpegQueueFull instead of piling up behind a CPU that can't keep up.
+
+I/O goes through pipes: input is read by ffmpeg itself (URL/path) or fed
+to stdin from an async iterator, and stdout is handed to a consumer as an
+async iterator of chunks (e.g. straight into stream_to_supabase). A slow
+consumer stops draining stdout, which blocks ffmpeg - backpressure end to
+end, with one chunk per pipe in memory and no temp files.
+
+Usage:
+    pool = get_ffmpeg_pool()
+    result = await pool.run(
+        ["-i", url, "-vf", "...", "-f", "mp4", "-movflags", FRAGMENTED_MP4, "pipe:1"],
+        stdout_consumer=lambda chunks: stream_to_supabase(chunks, path)
+    )
+    result["output"]   # what the consumer returned
+"""
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+from config.settings import settings
+
+PIPE_CHUNK_SIZE = 256 * 1024
+
+# MP4 muxer flags for non-seekable output (moov first, then fragments)
+FRAGMENTED_MP4 = "frag_keyframe+empty_moov+default_base_moof"
+
+# Bytes of ffmpeg stderr kept for error messages
+STDERR_TAIL_BYTES = 4096
+
+
+class FFmpegError(Exception):
+    """ffmpeg exited with a non-zero status"""
+
+    def __init__(self, returncode: int, stderr: str):
+        super().__init__(f"ffmpeg exited with {returncode}: {stderr[-500:]}")
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class FFmpegQueueFull(Exception):
+    """Too many encodes already waiting for a worker"""
+
+
+class FFmpegPool:
+    """Bounded pool of ffmpeg subprocesses with a bounded wait queue"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        threads_per_job: int = 2,
+        max_queue: int = 20,
+        binary: str = "ffmpeg"
+    ):
+        self.workers = workers
+        self.threads_per_job = threads_per_job
+        self.max_queue = max_queue
+        self.binary = binary
+        self._slots = asyncio.Semaphore(workers)
+        self._waiting = 0
+        self._running = 0
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0, "encode_seconds": 0.0, "queued_seconds": 0.0}
+
+    # ==================== PUBLIC API ====================
+
+    async def run(
+        self,
+        args: List[str],
+        stdin: Optional[AsyncIterator[bytes]] = None,
+        stdout_consumer: Optional[Callable[[AsyncIterator[bytes]], Awaitable]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """
+        Run `ffmpeg <args>` on a pool worker
+
+        Args:
+            args: ffmpeg arguments, output last (no shell; "-threads"
+                  is added before the output unless given)
+            stdin: chunks to pipe into ffmpeg (use "-i pipe:0")
+            stdout_consumer: awaited with an iterator over ffmpeg's stdout
+                             (use "pipe:1" as output); its return value
+                             becomes result["output"]
+            timeout: seconds before the encode is killed
+
+        Returns:
+            {"output": ..., "seconds": float, "queued_seconds": float}
+        Raises:
+            FFmpegQueueFull, FFmpegError, asyncio.TimeoutError
+        """
+        if self._waiting >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise FFmpegQueueFull(f"{self._waiting} encodes already waiting for {self.workers} workers")
+
+        queued_at = time.monotonic()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        started = time.monotonic()
+        self._running += 1
+        self.stats["queued_seconds"] += started - queued_at
+        try:
+            output = await asyncio.wait_for(self._execute(args, stdin, stdout_consumer), timeout)
+            self.stats["completed"] += 1
+            return {
+                "output": output,
+                "seconds": time.monotonic() - started,
+                "queued_seconds": started - queued_at
+            }
+        except BaseException:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self.stats["encode_seconds"] += time.monotonic() - started
+            self._running -= 1
+            self._slots.release()
+
+    def snapshot(self) -> Dict:
+        return {
+            **self.stats,
+            "encode_seconds": round(self.stats["encode_seconds"], 1),
+            "queued_seconds": round(self.stats["queued_seconds"], 1),
+            "workers": self.workers,
+            "running": self._running,
+            "waiting": self._waiting
+        }
+
+    # ==================== PROCESS ====================
+
+    async def _execute(
+        self,
+        args: List[str],
+        stdin: Optional[AsyncIterator[bytes]],
+        stdout_consumer: Optional[Callable[[AsyncIterator[bytes]], Awaitable]]
+    ):
+        argv = [self.binary, "-hide_banner", "-loglevel", "error", "-y"] + (["-nostdin"] if stdin is None else [])
+        if "-threads" not in args:
+            # Output options precede the output, which is the last argument
+            args = args[:-1] + ["-threads", str(self.threads_per_job)] + args[-1:]
+        argv += args
+
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE if stdout_consumer else asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stderr_tail = bytearray()
+
+        async def feed():
+            try:
+                async for chunk in stdin:
+                    process.stdin.write(chunk)
+                    # Waits while ffmpeg's pipe buffer is full
+                    await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # ffmpeg stopped reading (it failed or had all it needed); its exit code tells which
+                pass
+            finally:
+                if not process.stdin.is_closing():
+                    process.stdin.close()
+
+        async def read_stderr():
+            while True:
+                chunk = await process.stderr.read(STDERR_TAIL_BYTES)
+                if not chunk:
+                    return
+                stderr_tail.extend(chunk)
+                del stderr_tail[:-STDERR_TAIL_BYTES]
+
+        async def stdout_chunks():
+            while True:
+                chunk = await process.stdout.read(PIPE_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+        async def consume():
+            if stdout_consumer is None:
+                return None
+            output = await stdout_consumer(stdout_chunks())
+            # Consumer returned before EOF: drain so ffmpeg isn't blocked writing
+            while await process.stdout.read(PIPE_CHUNK_SIZE):
+                pass
+            return output
+
+        tasks = [asyncio.create_task(consume()), asyncio.create_task(read_stderr())]
+        if stdin is not None:
+            tasks.append(asyncio.create_task(feed()))
+
+        try:
+            await asyncio.gather(*tasks)
+            returncode = await process.wait()
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if process.returncode is None:
+                process.kill()
+            # Drain the pipes too: the process only counts as finished once they close
+            await process.communicate()
+            raise
+
+        if returncode != 0:
+            raise FFmpegError(returncode, stderr_tail.decode(errors="replace").strip())
+        return tasks[0].result()
+
+
+def input_args(url: str, start: Optional[float] = None, duration: Optional[float] = None) -> List[str]:
+    """ffmpeg input options for a stored video URL (or local path), optionally trimmed"""
+    args = []
+    if url.startswith(settings.openai_base_url):
+        # Storage upload fell back to the OpenAI content URL, which needs our key
+        args += ["-headers", f"Authorization: Bearer {settings.openai_api_key}\r\n"]
+    if start:
+        args += ["-ss", f"{start:.2f}"]
+    if duration:
+        args += ["-t", f"{duration:.2f}"]
+    return args + ["-i", url]
+
+
+# Singleton instance
+_ffmpeg_pool = None
+
+def get_ffmpeg_pool() -> FFmpegPool:
+    """Get or create FFmpeg pool singleton"""
+    global _ffmpeg_pool
+    if _ffmpeg_pool is None:
+        threads = max(settings.ffmpeg_threads_per_job, 1)
+        workers = settings.ffmpeg_workers or max((os.cpu_count() or 1) // threads, 1)
+        _ffmpeg_pool = FFmpegPool(workers=workers, threads_per_job=threads, max_queue=settings.ffmpeg_max_queue)
+        logger.info(f"🎞️ FFmpeg pool: {workers} worker(s) × {threads} thread(s), queue ≤{settings.ffmpeg_max_queue}")
+    return _ffmpeg_pool
@@ -0,0 +1,106 @@
+"""
+Small DAG executor for the video creation flow
+Each step is an async callable that receives the results of the steps it
+depends on; a step starts as soon as all of its dependencies finished, so
+independent steps (limit checks and validation, Sora and the caption) run
+concurrently. If a step fails, or ends the flow early with FlowStop, every
+step still running is cancelled and the rest never start.
+
+Usage:
+    flow = Flow("prepare")
+    flow.step("limits", lambda r: check_limits(...))
+    flow.step("validation", lambda r: validate(...))
+    flow.step("record", lambda r: create(r["validation"]), after=("limits", "validation"))
+    results = await flow.run()      # raises FlowStop / the step's exception
+    flow.timings                    # {"limits": {"status": "ok", "start_ms": 0.1, "ms": 120.3}, ...}
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+from loguru import logger
+
+
+class FlowStop(Exception):
+    """Raised by a step to end the flow early; `result` is what the caller returns"""
+
+    def __init__(self, result: Dict):
+        super().__init__(result.get("reason") or result.get("error") or "flow stopped")
+        self.result = result
+
+
+class Flow:
+    """Dependency-ordered, maximally concurrent async steps"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._steps: Dict[str, Tuple[Callable[[Dict[str, Any]], Awaitable[Any]], Tuple[str, ...]]] = {}
+        self.timings: Dict[str, Dict] = {}
+
+    def step(self, name: str, fn: Callable[[Dict[str, Any]], Awaitable[Any]], after: Iterable[str] = ()) -> "Flow":
+        after = tuple(after)
+        missing = [dep for dep in after if dep not in self._steps]
+        if missing:
+            # Declaring dependencies first also rules out cycles
+            raise ValueError(f"Step '{name}' depends on undeclared step(s): {missing}")
+        self._steps[name] = (fn, after)
+        return self
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every step; returns {step: result}"""
+        flow_started = time.perf_counter()
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        self.timings = {name: {"status": "pending"} for name in self._steps}
+
+        async def run_step(name: str) -> Any:
+            fn, after = self._steps[name]
+            if after:
+                await asyncio.gather(*(tasks[dep] for dep in after))
+            timing = self.timings[name]
+            started = time.perf_counter()
+            timing.update(status="running", start_ms=round((started - flow_started) * 1000, 1))
+            try:
+                results[name] = await fn({dep: results[dep] for dep in after})
+                timing["status"] = "ok"
+                return results[name]
+            except asyncio.CancelledError:
+                timing["status"] = "cancelled"
+                raise
+            except FlowStop:
+                timing["status"] = "stopped"
+                raise
+            except Exception:
+                timing["status"] = "failed"
+                raise
+            finally:
+                timing["ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        # Declaration order is a valid topological order (see step())
+        for name in self._steps:
+            tasks[name] = asyncio.create_task(run_step(name), name=f"{self.name}:{name}")
+
+        pending = set(tasks.values())
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    if not task.cancelled() and task.exception() is not None:
+                        raise task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            # Dependents re-raise their dependency's error; mark those retrieved too
+            for task in tasks.values():
+                if task.done() and not task.cancelled():
+                    task.exception()
+            for timing in self.timings.values():
+                if timing["status"] == "pending":
+                    timing["status"] = "skipped"
+            logger.info(
+                f"⏱️ Flow {self.name} took {(time.perf_counter() - flow_started) * 1000:.0f} ms: "
+                + ", ".join(f"{n}={t.get('ms', 0):.0f}ms/{t['status']}" for n, t in self.timings.items())
+            )
+
+        return results
@@ -0,0 +1,84 @@
+"""
+Shared HTTP Client Registry
+One pooled, keep-alive httpx.AsyncClient per upstream service, reused for
+the life of the process instead of a new client (and TLS handshake) per call.
+
+Usage:
+    from utils.http_clients import get_http_client
+    client = get_http_client("openai")
+    response = await client.get(url)
+
+Close on shutdown with `await close_http_clients()` (FastAPI lifespan / bot.py).
+"""
+from typing import Dict
+import httpx
+from loguru import logger
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Per-service pool and timeout tuning
+CLIENT_PROFILES = {
+    # Sora 2 create/poll + MP4 downloads: small JSON calls, long streamed bodies
+    "openai": {
+        "timeout": httpx.Timeout(30.0, connect=10.0, read=120.0),
+        "limits": httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=90.0),
+        "http2": True
+    },
+    # Bot API: many tiny requests (messages, edits, sendVideo by URL)
+    "telegram": {
+        "timeout": httpx.Timeout(10.0, connect=5.0, read=120.0),
+        "limits": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+        "http2": True
+    },
+    # Supabase Storage / custom upload endpoints: big request bodies
+    "storage": {
+        "timeout": httpx.Timeout(120.0, connect=10.0),
+        "limits": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+        "http2": True
+    },
+    # TikTok / Instagram HTML scraping
+    "scrapers": {
+        "timeout": httpx.Timeout(30.0, connect=10.0),
+        "limits": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+        "http2": True,
+        "follow_redirects": True
+    },
+    # Anything else (arbitrary public URLs)
+    "default": {
+        "timeout": httpx.Timeout(60.0, connect=10.0),
+        "limits": httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+        "http2": True,
+        "follow_redirects": True
+    }
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def get_http_client(name: str = "default") -> httpx.AsyncClient:
+    """Get (or lazily create) the shared client for a service"""
+    client = _clients.get(name)
+
+    if client is None or client.is_closed:
+        profile = dict(CLIENT_PROFILES.get(name, CLIENT_PROFILES["default"]))
+        profile["http2"] = profile.get("http2", False) and HTTP2_AVAILABLE
+        client = httpx.AsyncClient(**profile)
+        _clients[name] = client
+        logger.debug(f"🌐 Created shared HTTP client '{name}' (http2={profile['http2']})")
+
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close all shared clients and their connection pools"""
+    for name, client in list(_clients.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client '{name}': {e}")
+    _clients.clear()
@@ -0,0 +1,136 @@
+"""
+MinHash LSH near-duplicate index for short texts (video prompts)
+Prompts are reduced to a set of normalized, lightly stemmed words
+("Un gato haciendo swaps de ETH!" -> {gato, haciendo, swap, eth}) and
+compared by Jaccard similarity. A 120-value MinHash signature split into
+20 bands of 6 rows finds candidates (pairs at Jaccard 0.75 collide in
+some band with probability ~0.98, pairs at 0.4 only ~0.08); candidates are
+then confirmed with the exact Jaccard of the stored word sets, so there are
+no false positives.
+"""
+import hashlib
+import re
+import struct
+import unicodedata
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+NUM_PERM = 120
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+
+# Each token gets NUM_PERM independent 64-bit hashes from one SHAKE digest
+_TOKEN_HASHES = struct.Struct(f">{NUM_PERM}Q")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that change nothing about the video (en + es)
+STOPWORDS = frozenset("""
+a an the of to in on at for with and or is are be by from as it its this that
+un una unos unas el la lo los las de del al en con por para y o que se su sus es
+""".split())
+
+
+def _stem(word: str) -> str:
+    """Crude plural folding so 'swaps' / 'swap', 'finanzas' / 'finanza' match"""
+    if len(word) > 4 and word.endswith("es"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Lowercase, strip accents and punctuation, drop stopwords, fold plurals"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return frozenset(_stem(w) for w in _WORD_RE.findall(text) if w not in STOPWORDS)
+
+
+def _token_hashes(token: str) -> Tuple[int, ...]:
+    return _TOKEN_HASHES.unpack(hashlib.shake_128(token.encode()).digest(_TOKEN_HASHES.size))
+
+
+def signature(tokens: FrozenSet[str]) -> Tuple[int, ...]:
+    """MinHash signature (NUM_PERM values); empty sets get an all-zero signature"""
+    if not tokens:
+        return (0,) * NUM_PERM
+    # Column-wise min over every token's hash vector
+    return tuple(map(min, zip(*map(_token_hashes, tokens))))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashIndex:
+    """In-memory near-duplicate index: key -> (tokens, metadata)"""
+
+    def __init__(self, threshold: float = 0.75):
+        self.threshold = threshold
+        self._entries: Dict[Hashable, Tuple[FrozenSet[str], Tuple[int, ...], Dict]] = {}
+        # One bucket map per band: band hash -> keys
+        self._buckets: List[Dict[int, set]] = [defaultdict(set) for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _band_hashes(sig: Tuple[int, ...]) -> Tuple[int, ...]:
+        return tuple(hash(sig[i * ROWS:(i + 1) * ROWS]) for i in range(BANDS))
+
+    def add(self, key: Hashable, text: str, **metadata) -> None:
+        """Index a text under `key` (replaces any previous entry for the key)"""
+        self.remove(key)
+        tokens = tokenize(text)
+        bands = self._band_hashes(signature(tokens))
+        self._entries[key] = (tokens, bands, metadata)
+        for buckets, band in zip(self._buckets, bands):
+            buckets[band].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for buckets, band in zip(self._buckets, entry[1]):
+            bucket = buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band]
+
+    def query(self, text: str, threshold: Optional[float] = None, **filters) -> List[Tuple[float, Hashable, Dict]]:
+        """
+        [(similarity, key, metadata)] at or above threshold, most similar first
+        `filters` must all equal the entry's metadata (e.g. tg_user_id=123)
+        """
+        limit = self.threshold if threshold is None else threshold
+        tokens = tokenize(text)
+        bands = self._band_hashes(signature(tokens))
+
+        candidates = set()
+        for buckets, band in zip(self._buckets, bands):
+            bucket = buckets.get(band)
+            if bucket:
+                candidates |= bucket
+
+        matches = []
+        for key in candidates:
+            entry_tokens, _, metadata = self._entries[key]
+            if any(metadata.get(k) != v for k, v in filters.items()):
+                continue
+            similarity = jaccard(tokens, entry_tokens)
+            if similarity >= limit:
+                matches.append((similarity, key, metadata))
+
+        matches.sort(key=lambda m: m[0], reverse=True)
+        return matches
+
+    def prune(self, keep) -> int:
+        """Drop entries whose metadata fails `keep(metadata)`. Returns removed count"""
+        stale = [key for key, (_, _, metadata) in self._entries.items() if not keep(metadata)]
+        for key in stale:
+            self.remove(key)
+        return len(stale)
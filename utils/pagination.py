@@ -0,0 +1,38 @@
+"""
+Keyset (cursor) pagination helpers
+Cursors are opaque url-safe tokens for the last row of a page, ordered by
+(created_at DESC, id DESC). The next page starts strictly after that row,
+so page boundaries stay stable while new rows are inserted and deep pages
+cost the same as the first one.
+"""
+import base64
+import json
+from typing import Dict, Optional, Tuple
+
+
+def encode_cursor(row: Dict) -> str:
+    """Cursor pointing just after `row`"""
+    raw = json.dumps({"c": row["created_at"], "i": row["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """(created_at, id) from a cursor; raises ValueError if it's malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(data["c"]), int(data["i"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_filter(cursor: Optional[str]) -> Optional[str]:
+    """
+    PostgREST or() filter for rows after the cursor, or None for the first page
+    (created_at, id) < (c, i)  ==  created_at < c OR (created_at = c AND id < i)
+    """
+    if not cursor:
+        return None
+    created_at, row_id = decode_cursor(cursor)
+    # Quote the timestamp: ':' and '.' are reserved inside or() filters
+    return f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
@@ -0,0 +1,87 @@
+"""
+In-process progress channels
+The generation pipeline publishes progress events to a per-job channel
+(keyed by video ID); any number of subscribers (e.g. the Telegram status
+message relay) consume them. Subscribers only ever see the newest event:
+if several are published while a subscriber is busy, the older ones are
+skipped, so a slow consumer never builds a backlog.
+
+Usage:
+    hub = get_progress_hub()
+    hub.publish(video_id, {"stage": "generating", "progress": 40, "eta_seconds": 70})
+    async for event in hub.subscribe(video_id):   # ends when the channel closes
+        ...
+    hub.close(video_id)
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Hashable, Optional, Set
+
+
+@dataclass
+class ProgressChannel:
+    latest: Optional[Dict] = None
+    version: int = 0
+    closed: bool = False
+    waiters: Set[asyncio.Event] = field(default_factory=set)
+
+    def wake(self) -> None:
+        for waiter in self.waiters:
+            waiter.set()
+
+
+class ProgressHub:
+    """Latest-value pub/sub, one channel per job"""
+
+    def __init__(self):
+        self._channels: Dict[Hashable, ProgressChannel] = {}
+
+    def publish(self, channel: Hashable, event: Dict) -> None:
+        ch = self._channels.setdefault(channel, ProgressChannel())
+        ch.latest = {**event, "at": time.time()}
+        ch.version += 1
+        ch.wake()
+
+    def latest(self, channel: Hashable) -> Optional[Dict]:
+        ch = self._channels.get(channel)
+        return ch.latest if ch else None
+
+    def close(self, channel: Hashable) -> None:
+        """End the channel; subscribers drain the last event and stop"""
+        ch = self._channels.pop(channel, None)
+        if ch is not None:
+            ch.closed = True
+            ch.wake()
+
+    async def subscribe(self, channel: Hashable) -> AsyncIterator[Dict]:
+        ch = self._channels.setdefault(channel, ProgressChannel())
+        wake = asyncio.Event()
+        ch.waiters.add(wake)
+        seen = 0
+        try:
+            while True:
+                wake.clear()
+                if ch.version > seen:
+                    seen = ch.version
+                    yield ch.latest
+                    continue
+                if ch.closed:
+                    return
+                await wake.wait()
+        finally:
+            ch.waiters.discard(wake)
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+
+# Singleton instance
+_progress_hub = None
+
+def get_progress_hub() -> ProgressHub:
+    """Get or create progress hub singleton"""
+    global _progress_hub
+    if _progress_hub is None:
+        _progress_hub = ProgressHub()
+    return _progress_hub
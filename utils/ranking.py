@@ -0,0 +1,81 @@
+"""
+In-memory rank index
+Keeps members sorted by score so top-N and "what's my rank" are binary
+searches instead of an ORDER BY over the whole creators table.
+
+Ties are broken by member id (ascending), matching the SQL ordering
+`ORDER BY score DESC, id ASC` used for the persisted snapshot.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class RankIndex:
+    """
+    Sorted (score DESC, member ASC) index
+
+    rank_of() / score lookups are O(log n); update() is a bisect plus a
+    list insert/delete (memmove), which stays in the microseconds range
+    at 100k members.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[float, Hashable]] = []
+        self._scores: Dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, member: Hashable) -> bool:
+        return member in self._scores
+
+    @staticmethod
+    def _key(member: Hashable, score: float) -> Tuple[float, Hashable]:
+        return (-score, member)
+
+    def load(self, items: Dict[Hashable, float]) -> None:
+        """Replace the index contents in one O(n log n) sort"""
+        self._scores = dict(items)
+        self._keys = sorted(self._key(m, s) for m, s in self._scores.items())
+
+    def update(self, member: Hashable, score: float) -> None:
+        """Insert a member or move it to its new score"""
+        old = self._scores.get(member)
+        if old is not None:
+            if old == score:
+                return
+            self._remove_key(member, old)
+        self._scores[member] = score
+        insort(self._keys, self._key(member, score))
+
+    def remove(self, member: Hashable) -> None:
+        old = self._scores.pop(member, None)
+        if old is not None:
+            self._remove_key(member, old)
+
+    def _remove_key(self, member: Hashable, score: float) -> None:
+        key = self._key(member, score)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def score(self, member: Hashable) -> Optional[float]:
+        return self._scores.get(member)
+
+    def rank_of(self, member: Hashable) -> Optional[int]:
+        """1-based rank, or None if the member isn't ranked"""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        return bisect_left(self._keys, self._key(member, score)) + 1
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[int, Hashable, float]]:
+        """[(rank, member, score)] for ranks offset+1 .. offset+limit"""
+        return [
+            (offset + i + 1, member, -neg_score)
+            for i, (neg_score, member) in enumerate(self._keys[offset:offset + limit])
+        ]
+
+    def ranks(self) -> Dict[Hashable, int]:
+        """Full {member: rank} map (O(n), used when taking a snapshot)"""
+        return {member: i + 1 for i, (_, member) in enumerate(self._keys)}
@@ -0,0 +1,47 @@
+"""
+Async rate limiting helpers
+"""
+import asyncio
+import random
+import time
+
+
+class TokenBucket:
+    """
+    Async token bucket
+
+    `rate` tokens are added per second up to `capacity`; acquire() waits
+    until a token is available. Safe to share between many tasks.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` are available and take them"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket so the next acquire waits ~`seconds` (e.g. after a 429)"""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+def backoff_delay(attempt: int, base: float = 2.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
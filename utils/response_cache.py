@@ -0,0 +1,244 @@
+"""
+Response cache for the public landing-page API
+In-process LRU with TTL and stale-while-revalidate, keyed by endpoint path +
+query params, plus ETag / 304 handling. Optionally shares entries and
+invalidations across processes through Redis (settings.response_cache_redis).
+
+Invalidation is tag based: every entry is stored under the current version
+of its tags ("videos", "stats", "leaderboard"), and a write bumps the tag
+version with invalidate(...). Old entries simply stop matching and age out
+of the LRU. With Redis the versions live in Redis, so a write in the bot
+process invalidates the API process too.
+
+Usage:
+    from utils.response_cache import get_response_cache
+    return await get_response_cache().respond(request, ("videos",), compute)
+
+`compute` is an async callable returning the JSON payload; payloads with
+"success": False are never cached.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from loguru import logger
+from config.settings import settings
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+# Every tag used by the public API
+CACHE_TAGS = ("videos", "stats", "leaderboard")
+
+REDIS_PREFIX = "respcache"
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    stored_at: float
+
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class ResponseCache:
+    """LRU + TTL + stale-while-revalidate response cache"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 30.0, stale_ttl: float = 300.0,
+                 redis_url: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._versions: Dict[str, int] = {tag: 0 for tag in CACHE_TAGS}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._redis = None
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0}
+
+        if redis_url:
+            if REDIS_AVAILABLE:
+                self._redis = aioredis.from_url(redis_url)
+                logger.info("🗄️ Response cache backed by Redis")
+            else:
+                logger.warning("⚠️ RESPONSE_CACHE_REDIS is set but the redis package is not installed; using in-process cache only")
+
+    # ==================== KEYS & VERSIONS ====================
+
+    async def _tag_versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        tags = tuple(tags)
+        if self._redis is not None:
+            try:
+                values = await self._redis.mget([f"{REDIS_PREFIX}:v:{tag}" for tag in tags])
+                return tuple(int(v or 0) for v in values)
+            except Exception as e:
+                logger.warning(f"Redis version lookup failed, using local versions: {e}")
+        return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    @staticmethod
+    def _request_key(path: str, params: Iterable[Tuple[str, str]]) -> str:
+        return f"{path}?{'&'.join(f'{k}={v}' for k, v in sorted(params))}"
+
+    async def invalidate(self, *tags: str) -> None:
+        """Bump tag versions so every entry depending on them misses"""
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+        self.stats["invalidations"] += 1
+
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                for tag in tags:
+                    pipe.incr(f"{REDIS_PREFIX}:v:{tag}")
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Redis invalidation failed for {tags}: {e}")
+
+    # ==================== STORAGE ====================
+
+    async def _get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(f"{REDIS_PREFIX}:e:{key}")
+                if raw:
+                    data = json.loads(raw)
+                    # Translate the wall-clock timestamp into our monotonic clock
+                    stored_at = time.monotonic() - max(time.time() - data["stored_at"], 0)
+                    entry = CacheEntry(data["body"].encode(), data["etag"], stored_at)
+                    self._put_local(key, entry)
+                    return entry
+            except Exception as e:
+                logger.warning(f"Redis cache read failed: {e}")
+        return None
+
+    def _put_local(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _put(self, key: str, entry: CacheEntry) -> None:
+        self._put_local(key, entry)
+        if self._redis is not None:
+            try:
+                payload = json.dumps({"body": entry.body.decode(), "etag": entry.etag, "stored_at": time.time()})
+                await self._redis.set(f"{REDIS_PREFIX}:e:{key}", payload, ex=int(self.ttl + self.stale_ttl))
+            except Exception as e:
+                logger.warning(f"Redis cache write failed: {e}")
+
+    # ==================== COMPUTE ====================
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Dict]]) -> Tuple[bytes, Optional[CacheEntry]]:
+        """Run compute once per key at a time (concurrent misses share the result)"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute_and_store(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[Dict]]) -> Tuple[bytes, Optional[CacheEntry]]:
+        payload = await compute()
+        body = json.dumps(payload, default=str, separators=(",", ":")).encode()
+
+        if not payload.get("success", True):
+            return body, None
+
+        entry = CacheEntry(body, f'W/"{hashlib.sha1(body).hexdigest()[:20]}"', time.monotonic())
+        await self._put(key, entry)
+        return body, entry
+
+    def _revalidate_in_background(self, key: str, compute: Callable[[], Awaitable[Dict]]) -> None:
+        if key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self._compute(key, compute)
+            except Exception as e:
+                logger.warning(f"Background revalidation of {key} failed: {e}")
+
+        asyncio.create_task(refresh())
+
+    async def get_or_compute(self, path: str, params: Iterable[Tuple[str, str]], tags: Iterable[str],
+                             compute: Callable[[], Awaitable[Dict]]) -> Tuple[bytes, Optional[CacheEntry]]:
+        """
+        Cached body for a request
+        Returns (body, entry); entry is None when the payload wasn't cacheable
+        """
+        tags = tuple(tags)
+        versions = await self._tag_versions(tags)
+        key = f"{','.join(f'{t}{v}' for t, v in zip(tags, versions))}|{self._request_key(path, params)}"
+
+        entry = await self._get(key)
+        if entry is not None:
+            age = entry.age()
+            if age <= self.ttl:
+                self.stats["hits"] += 1
+                return entry.body, entry
+            if age <= self.ttl + self.stale_ttl:
+                # Serve stale now, refresh for the next caller
+                self.stats["stale_hits"] += 1
+                self._revalidate_in_background(key, compute)
+                return entry.body, entry
+
+        self.stats["misses"] += 1
+        return await self._compute(key, compute)
+
+    async def respond(self, request, tags: Iterable[str], compute: Callable[[], Awaitable[Dict]]):
+        """FastAPI response with ETag / 304 and Cache-Control headers"""
+        from fastapi.responses import Response
+
+        body, entry = await self.get_or_compute(request.url.path, request.query_params.multi_items(), tags, compute)
+
+        if entry is None:
+            return Response(content=body, media_type="application/json")
+
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": f"public, max-age={int(self.ttl)}, stale-while-revalidate={int(self.stale_ttl)}"
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Singleton instance
+_response_cache = None
+
+def get_response_cache() -> ResponseCache:
+    """Get or create response cache singleton"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl=settings.response_cache_ttl,
+            stale_ttl=settings.response_cache_stale_ttl,
+            redis_url=settings.redis_url if settings.response_cache_redis else None
+        )
+    return _response_cache
+
+
+async def invalidate_responses(*tags: str) -> None:
+    """Invalidate cached API responses for the given tags (never raises)"""
+    try:
+        await get_response_cache().invalidate(*(tags or CACHE_TAGS))
+    except Exception as e:
+        logger.warning(f"Response cache invalidation failed: {e}")
@@ -8,6 +8,7 @@ from typing import Optional, Dict
 from loguru import logger
 import httpx
 from bs4 import BeautifulSoup
+from utils.http_clients import get_http_client
 
 
 class TikTokScraperV2:
@@ -38,18 +39,18 @@ class TikTokScraperV2:
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(oembed_url, headers=headers)
+            client = get_http_client("scrapers")
+            response = await client.get(oembed_url, headers=headers)
 
-                if response.status_code == 200:
-                    data = response.json()
+            if response.status_code == 200:
+                data = response.json()
 
-                    # oEmbed gives us basic info but not metrics
-                    # We need to scrape the HTML page
-                    return await TikTokScraperV2._scrape_from_html(url, client)
-                else:
-                    logger.warning(f"oEmbed failed: {response.status_code}")
-                    return await TikTokScraperV2._scrape_from_html(url, client)
+                # oEmbed gives us basic info but not metrics
+                # We need to scrape the HTML page
+                return await TikTokScraperV2._scrape_from_html(url, client)
+            else:
+                logger.warning(f"oEmbed failed: {response.status_code}")
+                return await TikTokScraperV2._scrape_from_html(url, client)
 
         except Exception as e:
             logger.error(f"TikTok scraping error for {url}: {e}")
@@ -78,6 +79,8 @@ class TikTokScraperV2:
                 return {
                     "success": False,
                     "error": f"HTTP {response.status_code}",
+                    "status_code": response.status_code,
+                    "retry_after": response.headers.get("Retry-After"),
                     "views": 0,
                     "likes": 0,
                     "comments": 0,
@@ -175,62 +178,64 @@ class InstagramScraperV2:
                 "Accept-Language": "en-US,en;q=0.5",
             }
 
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
-
-                if response.status_code != 200:
-                    return {
-                        "success": False,
-                        "error": f"HTTP {response.status_code}",
-                        "views": 0,
-                        "likes": 0,
-                        "comments": 0,
-                        "shares": 0
-                    }
+            client = get_http_client("scrapers")
+            response = await client.get(url, headers=headers, follow_redirects=True)
 
-                html = response.text
-
-                # Try to find embedded JSON data
-                # Instagram embeds data in script tags
-                soup = BeautifulSoup(html, 'lxml')
-                scripts = soup.find_all('script', type='application/ld+json')
-
-                for script in scripts:
-                    try:
-                        data = json.loads(script.string)
-                        if 'interactionStatistic' in data:
-                            stats = {}
-                            for stat in data['interactionStatistic']:
-                                interaction_type = stat['interactionType'].split('/')[-1]
-                                if interaction_type == 'LikeAction':
-                                    stats['likes'] = stat['userInteractionCount']
-                                elif interaction_type == 'CommentAction':
-                                    stats['comments'] = stat['userInteractionCount']
-                                elif interaction_type == 'WatchAction':
-                                    stats['views'] = stat['userInteractionCount']
-
-                            return {
-                                "success": True,
-                                "error": None,
-                                "views": stats.get('views', 0),
-                                "likes": stats.get('likes', 0),
-                                "comments": stats.get('comments', 0),
-                                "shares": 0,  # Instagram doesn't expose shares
-                                "shortcode": shortcode
-                            }
-                    except:
-                        continue
-
-                # Fallback: Manual entry needed
+            if response.status_code != 200:
                 return {
                     "success": False,
-                    "error": "Could not extract metrics. Please update manually with /update",
+                    "error": f"HTTP {response.status_code}",
+                    "status_code": response.status_code,
+                    "retry_after": response.headers.get("Retry-After"),
                     "views": 0,
                     "likes": 0,
                     "comments": 0,
                     "shares": 0
                 }
 
+            html = response.text
+
+            # Try to find embedded JSON data
+            # Instagram embeds data in script tags
+            soup = BeautifulSoup(html, 'lxml')
+            scripts = soup.find_all('script', type='application/ld+json')
+
+            for script in scripts:
+                try:
+                    data = json.loads(script.string)
+                    if 'interactionStatistic' in data:
+                        stats = {}
+                        for stat in data['interactionStatistic']:
+                            interaction_type = stat['interactionType'].split('/')[-1]
+                            if interaction_type == 'LikeAction':
+                                stats['likes'] = stat['userInteractionCount']
+                            elif interaction_type == 'CommentAction':
+                                stats['comments'] = stat['userInteractionCount']
+                            elif interaction_type == 'WatchAction':
+                                stats['views'] = stat['userInteractionCount']
+
+                        return {
+                            "success": True,
+                            "error": None,
+                            "views": stats.get('views', 0),
+                            "likes": stats.get('likes', 0),
+                            "comments": stats.get('comments', 0),
+                            "shares": 0,  # Instagram doesn't expose shares
+                            "shortcode": shortcode
+                        }
+                except:
+                    continue
+
+            # Fallback: Manual entry needed
+            return {
+                "success": False,
+                "error": "Could not extract metrics. Please update manually with /update",
+                "views": 0,
+                "likes": 0,
+                "comments": 0,
+                "shares": 0
+            }
+
         except Exception as e:
             logger.error(f"Instagram scraping error for {url}: {e}")
             return {
@@ -0,0 +1,113 @@
+"""
+Coalesced, rate-limited Telegram message edits
+Status messages (the "generating your video" message posted by /create)
+are edited as progress arrives. Every edit is a Bot API call, so edits
+are:
+    - coalesced per message: only the newest text is sent, intermediate
+      updates are dropped
+    - rate limited per chat (STATUS_EDIT_MIN_INTERVAL seconds apart) and
+      across the bot (STATUS_EDIT_GLOBAL_RATE edits/second), so many
+      concurrent jobs can't starve deliveries and replies
+
+Usage:
+    editor = get_status_editor()
+    editor.update(chat_id, message_id, text)   # returns immediately
+    await editor.finish(chat_id, message_id)   # drop pending edits (before deleting)
+"""
+import asyncio
+from typing import Dict, Tuple
+from loguru import logger
+from config.settings import settings
+from utils.rate_limit import TokenBucket
+from utils.telegram_notifier import notifier
+
+MessageKey = Tuple[int, int]
+
+
+class StatusEditor:
+    """Per-message latest-text slots flushed through per-chat + global token buckets"""
+
+    def __init__(self, min_interval: float = 5.0, global_rate: float = 20.0):
+        self.min_interval = min_interval
+        self._global = TokenBucket(global_rate)
+        self._chats: Dict[int, TokenBucket] = {}
+        self._pending: Dict[MessageKey, str] = {}
+        self._sent: Dict[MessageKey, str] = {}
+        self._flushers: Dict[MessageKey, asyncio.Task] = {}
+        self.stats = {"requested": 0, "sent": 0, "coalesced": 0, "failed": 0}
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(1 / self.min_interval, capacity=1)
+        return bucket
+
+    def update(self, chat_id: int, message_id: int, text: str) -> None:
+        """Queue `text` as the message's next content (replaces any pending text)"""
+        key = (chat_id, message_id)
+        self.stats["requested"] += 1
+        if key in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[key] = text
+
+        flusher = self._flushers.get(key)
+        if flusher is None or flusher.done():
+            task = asyncio.create_task(self._flush(key))
+            self._flushers[key] = task
+            task.add_done_callback(lambda t: self._flushers.pop(key) if self._flushers.get(key) is t else None)
+
+    async def _flush(self, key: MessageKey) -> None:
+        chat_id, message_id = key
+        bucket = self._chat_bucket(chat_id)
+        while key in self._pending:
+            await bucket.acquire()
+            await self._global.acquire()
+
+            # Take the newest text only after waiting: everything queued meanwhile is coalesced
+            text = self._pending.pop(key, None)
+            if text is None or text == self._sent.get(key):
+                continue
+
+            if await notifier.edit_message(chat_id, message_id, text):
+                self._sent[key] = text
+                self.stats["sent"] += 1
+            else:
+                # Likely rate limited or the message is gone: back off this chat
+                self.stats["failed"] += 1
+                bucket.penalize(self.min_interval * 2)
+
+    async def finish(self, chat_id: int, message_id: int) -> None:
+        """Stop editing a message (call before deleting or replacing it)"""
+        key = (chat_id, message_id)
+        self._pending.pop(key, None)
+        self._sent.pop(key, None)
+        task = self._flushers.pop(key, None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if not any(k[0] == chat_id for k in self._flushers):
+            self._chats.pop(chat_id, None)
+
+    def snapshot(self) -> Dict:
+        return {**self.stats, "active_messages": len(self._flushers)}
+
+
+# Singleton instance
+_status_editor = None
+
+def get_status_editor() -> StatusEditor:
+    """Get or create status editor singleton"""
+    global _status_editor
+    if _status_editor is None:
+        _status_editor = StatusEditor(
+            min_interval=settings.status_edit_min_interval,
+            global_rate=settings.status_edit_global_rate
+        )
+        logger.info(
+            f"✏️ Status edits: ≥{settings.status_edit_min_interval}s apart per chat, "
+            f"≤{settings.status_edit_global_rate}/s overall"
+        )
+    return _status_editor
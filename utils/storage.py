@@ -4,9 +4,9 @@ Uploads videos to public storage (S3, R2, or similar)
 """
 import hashlib
 import uuid
-from typing import Optional, Tuple
+from typing import AsyncIterator, Optional, Tuple
 from loguru import logger
-import httpx
+from utils.http_clients import get_http_client
 
 
 class VideoStorage:
@@ -26,7 +26,7 @@ class VideoStorage:
         self,
         video_bytes: bytes,
         filename: Optional[str] = None
-    ) -> Tuple[str, str]:
+    ) -> Tuple[str, Optional[str]]:
         """
         Upload video to public storage
 
@@ -35,13 +35,13 @@ class VideoStorage:
             filename: Optional custom filename
 
         Returns:
-            (video_url, thumbnail_url) - Public URLs
+            (video_url, thumbnail_url) - Public URLs; thumbnail_url is None
+            unless the backend renders one (posters come from agent/tools/previews.py)
         """
         try:
-            # Generate unique filename if not provided
+            # Default filename is the full-content hash, so re-uploading the same video overwrites one object
             if not filename:
-                video_hash = hashlib.md5(video_bytes[:1024]).hexdigest()[:12]
-                filename = f"{video_hash}.mp4"
+                filename = f"{hashlib.sha256(video_bytes).hexdigest()}.mp4"
 
             logger.info(f"Uploading video: {filename} ({len(video_bytes)} bytes)")
 
@@ -62,7 +62,7 @@ class VideoStorage:
             logger.error(f"Upload error: {e}")
             raise
 
-    async def _upload_to_supabase(self, video_bytes: bytes, filename: str) -> Tuple[str, str]:
+    async def _upload_to_supabase(self, video_bytes: bytes, filename: str) -> Tuple[str, Optional[str]]:
         """Upload to Supabase Storage"""
         try:
             from config.settings import settings
@@ -94,12 +94,9 @@ class VideoStorage:
             # Get public URL
             video_url = supabase.storage.from_(bucket_name).get_public_url(file_path)
 
-            # Generate thumbnail path (you can implement actual thumbnail generation later)
-            thumbnail_path = f"thumbnails/{filename.replace('.mp4', '.jpg')}"
-            thumbnail_url = supabase.storage.from_(bucket_name).get_public_url(thumbnail_path)
-
+            # No thumbnail here: posters are rendered by agent/tools/previews.py
             logger.info(f"✅ Uploaded to Supabase Storage: {video_url}")
-            return video_url, thumbnail_url
+            return video_url, None
 
         except Exception as e:
             logger.error(f"❌ Supabase Storage upload error: {e}")
@@ -108,7 +105,7 @@ class VideoStorage:
             logger.error(traceback.format_exc())
             raise
 
-    async def _upload_to_s3(self, video_bytes: bytes, filename: str) -> Tuple[str, str]:
+    async def _upload_to_s3(self, video_bytes: bytes, filename: str) -> Tuple[str, Optional[str]]:
         """Upload to AWS S3"""
         try:
             import boto3
@@ -136,17 +133,14 @@ class VideoStorage:
             # Construct public URL
             video_url = f"https://{bucket}.s3.{settings.aws_region}.amazonaws.com/{video_key}"
 
-            # Generate thumbnail (placeholder for now)
-            thumbnail_url = f"https://{bucket}.s3.{settings.aws_region}.amazonaws.com/thumbnails/{filename.replace('.mp4', '.jpg')}"
-
             logger.info(f"Uploaded to S3: {video_url}")
-            return video_url, thumbnail_url
+            return video_url, None
 
         except Exception as e:
             logger.error(f"S3 upload error: {e}")
             raise
 
-    async def _upload_to_r2(self, video_bytes: bytes, filename: str) -> Tuple[str, str]:
+    async def _upload_to_r2(self, video_bytes: bytes, filename: str) -> Tuple[str, Optional[str]]:
         """Upload to Cloudflare R2"""
         try:
             import boto3
@@ -172,16 +166,15 @@ class VideoStorage:
 
             # R2 public URL
             video_url = f"https://{settings.r2_public_domain}/{video_key}"
-            thumbnail_url = f"https://{settings.r2_public_domain}/thumbnails/{filename.replace('.mp4', '.jpg')}"
 
             logger.info(f"Uploaded to R2: {video_url}")
-            return video_url, thumbnail_url
+            return video_url, None
 
         except Exception as e:
             logger.error(f"R2 upload error: {e}")
             raise
 
-    async def _upload_to_custom(self, video_bytes: bytes, filename: str) -> Tuple[str, str]:
+    async def _upload_to_custom(self, video_bytes: bytes, filename: str) -> Tuple[str, Optional[str]]:
         """
         Upload to custom endpoint (e.g., your own server)
         Implement this based on your storage API
@@ -190,35 +183,35 @@ class VideoStorage:
             from config.settings import settings
 
             # Example: POST to your custom upload endpoint
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                files = {'video': (filename, video_bytes, 'video/mp4')}
-                response = await client.post(
-                    settings.custom_upload_endpoint,
-                    files=files,
-                    headers={"Authorization": f"Bearer {settings.custom_upload_token}"}
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    video_url = result.get("video_url")
-                    thumbnail_url = result.get("thumbnail_url", "")
-
-                    logger.info(f"Uploaded to custom storage: {video_url}")
-                    return video_url, thumbnail_url
-                else:
-                    raise Exception(f"Upload failed: {response.status_code} - {response.text}")
+            client = get_http_client("storage")
+            files = {'video': (filename, video_bytes, 'video/mp4')}
+            response = await client.post(
+                settings.custom_upload_endpoint,
+                files=files,
+                headers={"Authorization": f"Bearer {settings.custom_upload_token}"}
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                video_url = result.get("video_url")
+                thumbnail_url = result.get("thumbnail_url", "")
+
+                logger.info(f"Uploaded to custom storage: {video_url}")
+                return video_url, thumbnail_url
+            else:
+                raise Exception(f"Upload failed: {response.status_code} - {response.text}")
 
         except Exception as e:
             logger.error(f"Custom upload error: {e}")
             raise
 
-    async def _placeholder_upload(self, video_bytes: bytes, filename: str) -> Tuple[str, str]:
+    async def _placeholder_upload(self, video_bytes: bytes, filename: str) -> Tuple[str, Optional[str]]:
         """
         Placeholder for local development
         Returns mock URLs
         """
         # Generate deterministic URLs for testing
-        video_hash = hashlib.md5(video_bytes[:1024]).hexdigest()[:12]
+        video_hash = hashlib.sha256(video_bytes).hexdigest()[:12]
 
         video_url = f"https://storage.uniswap.com/videos/{video_hash}.mp4"
         thumbnail_url = f"https://storage.uniswap.com/thumbnails/{video_hash}.jpg"
@@ -229,6 +222,47 @@ class VideoStorage:
         return video_url, thumbnail_url
 
 
+async def stream_to_supabase(
+    chunks: AsyncIterator[bytes],
+    path: str,
+    bucket: str = "videos",
+    content_type: str = "video/mp4",
+    content_length: Optional[int] = None
+) -> str:
+    """
+    Upload a byte stream to Supabase Storage without buffering the file
+
+    Chunks are forwarded to the Storage REST API as they arrive, so memory
+    stays at one chunk regardless of video size, and the upload naturally
+    applies backpressure to whatever produces the chunks (e.g. a download).
+
+    Returns: public URL of the object
+    """
+    from config.settings import settings
+
+    api_key = settings.supabase_service_key or settings.supabase_key
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "apikey": api_key,
+        "Content-Type": content_type,
+        "x-upsert": "true"
+    }
+    if content_length:
+        headers["Content-Length"] = str(content_length)
+
+    client = get_http_client("storage")
+    response = await client.post(
+        f"{settings.supabase_url}/storage/v1/object/{bucket}/{path}",
+        content=chunks,
+        headers=headers
+    )
+
+    if response.status_code not in (200, 201):
+        raise Exception(f"Storage upload failed: {response.status_code} - {response.text}")
+
+    return f"{settings.supabase_url}/storage/v1/object/public/{bucket}/{path}"
+
+
 # Singleton instance
 _storage = None
 
@@ -3,9 +3,9 @@ Telegram Notification Utility
 Send messages to users from background processes
 """
 import asyncio
-import httpx
 from loguru import logger
 from config.settings import settings
+from utils.http_clients import get_http_client
 
 
 class TelegramNotifier:
@@ -28,28 +28,95 @@ class TelegramNotifier:
             bool: True if message sent successfully
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/sendMessage",
-                    json={
-                        "chat_id": chat_id,
-                        "text": text,
-                        "parse_mode": parse_mode
-                    },
-                    timeout=10.0
-                )
-
-                if response.status_code == 200:
-                    logger.info(f"✅ Telegram notification sent to user {chat_id}")
-                    return True
-                else:
-                    logger.error(f"❌ Failed to send Telegram message: {response.status_code} - {response.text}")
-                    return False
+            client = get_http_client("telegram")
+            response = await client.post(
+                f"{self.base_url}/sendMessage",
+                json={
+                    "chat_id": chat_id,
+                    "text": text,
+                    "parse_mode": parse_mode
+                },
+                timeout=10.0
+            )
+
+            if response.status_code == 200:
+                logger.info(f"✅ Telegram notification sent to user {chat_id}")
+                return True
+            else:
+                logger.error(f"❌ Failed to send Telegram message: {response.status_code} - {response.text}")
+                return False
 
         except Exception as e:
             logger.error(f"❌ Error sending Telegram notification: {e}")
             return False
 
+    async def send_video(self, chat_id: int, video_url: str, caption: str = None, parse_mode: str = "Markdown") -> bool:
+        """
+        Send a video by public URL (Telegram fetches it, no bytes pass through us)
+
+        Returns:
+            bool: True if video sent successfully
+        """
+        try:
+            client = get_http_client("telegram")
+            response = await client.post(
+                f"{self.base_url}/sendVideo",
+                json={
+                    "chat_id": chat_id,
+                    "video": video_url,
+                    "caption": caption,
+                    "parse_mode": parse_mode,
+                    "supports_streaming": True
+                },
+                timeout=120.0
+            )
+
+            if response.status_code == 200:
+                logger.info(f"✅ Telegram video sent to chat {chat_id}")
+                return True
+            else:
+                logger.error(f"❌ Failed to send Telegram video: {response.status_code} - {response.text}")
+                return False
+
+        except Exception as e:
+            logger.error(f"❌ Error sending Telegram video: {e}")
+            return False
+
+    async def edit_message(self, chat_id: int, message_id: int, text: str, parse_mode: str = "Markdown") -> bool:
+        """Edit a previously sent message (e.g. a processing/status message)"""
+        try:
+            client = get_http_client("telegram")
+            response = await client.post(
+                f"{self.base_url}/editMessageText",
+                json={
+                    "chat_id": chat_id,
+                    "message_id": message_id,
+                    "text": text,
+                    "parse_mode": parse_mode
+                },
+                timeout=10.0
+            )
+            return response.status_code == 200
+
+        except Exception as e:
+            logger.warning(f"Could not edit Telegram message {message_id}: {e}")
+            return False
+
+    async def delete_message(self, chat_id: int, message_id: int) -> bool:
+        """Delete a message (e.g. the processing message once the video is delivered)"""
+        try:
+            client = get_http_client("telegram")
+            response = await client.post(
+                f"{self.base_url}/deleteMessage",
+                json={"chat_id": chat_id, "message_id": message_id},
+                timeout=10.0
+            )
+            return response.status_code == 200
+
+        except Exception as e:
+            logger.warning(f"Could not delete Telegram message {message_id}: {e}")
+            return False
+
     async def send_video_ready_notification(self, chat_id: int, video_url: str) -> bool:
         """
         Send notification that video is ready with download link
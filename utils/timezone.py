@@ -1,7 +1,8 @@
 """
 Timezone utilities for consistent datetime handling
 """
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Tuple
 from zoneinfo import ZoneInfo
 from config.settings import settings
 
@@ -38,3 +39,21 @@ def format_datetime(dt: datetime, include_time: bool = True) -> str:
         return local_dt.strftime("%d/%m/%Y %I:%M %p")  # 09/10/2025 09:30 PM
     else:
         return local_dt.strftime("%d/%m/%Y")  # 09/10/2025
+
+
+def epoch_window(epoch_id: int) -> Tuple[datetime, datetime]:
+    """
+    UTC [start, end) of a betting epoch
+    Epoch format: YYYYWW ISO week (e.g. 202542 = 2025, week 42), Monday 00:00 UTC
+    """
+    year, week = divmod(epoch_id, 100)
+    start = datetime.combine(date.fromisocalendar(year, week, 1), time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=7)
+
+
+def epoch_id_for(dt: datetime) -> int:
+    """Epoch (ISO year * 100 + ISO week) containing `dt`"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    iso = dt.astimezone(timezone.utc).isocalendar()
+    return iso[0] * 100 + iso[1]